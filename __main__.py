@@ -15,14 +15,27 @@ import logging
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
-import aiohttp
-import asyncpg
 import click
 import discord
 from discord.ext import commands
 
-from config import DATABASE_CRED, TEST_TOKEN, TOKEN
+from config import (
+    DATABASE_CRED,
+    INTENTS_PROFILE,
+    METRICS_PORT,
+    POOL_MAX_INACTIVE_LIFETIME,
+    POOL_MAX_SIZE,
+    POOL_MIN_SIZE,
+    STATEMENT_TIMEOUT,
+    TEST_TOKEN,
+    TOKEN,
+)
 from utilities.bases.bot import Mafuyu
+from utilities.cluster import ClusterSupervisor, parse_shard_ids, recommended_shard_count
+from utilities.database import MafuPool
+from utilities.http import HTTPClients
+from utilities.intents import INTENT_PROFILES, get_intents_profile
+from utilities.metrics import MetricsRegistry
 
 if TYPE_CHECKING:
     from collections.abc import Generator
@@ -37,15 +50,22 @@ def setup_logging() -> Generator[Any, Any, Any]:
     yield
 
 
-async def create_bot_pool() -> asyncpg.Pool[asyncpg.Record]:
-    pool = await asyncpg.create_pool(DATABASE_CRED)
+async def create_bot_pool(bot: Mafuyu) -> MafuPool:
+    pool = await MafuPool.create(
+        DATABASE_CRED,
+        metrics=bot.metrics,
+        min_size=POOL_MIN_SIZE,
+        max_size=POOL_MAX_SIZE,
+        max_inactive_lifetime=POOL_MAX_INACTIVE_LIFETIME,
+        statement_timeout=STATEMENT_TIMEOUT,
+    )
 
     if not pool or pool.is_closing():
         msg = 'Failed to create a pool.'
         raise RuntimeError(msg)
 
-    with Path('schema.sql').open(encoding='utf-8') as file:  # noqa: ASYNC230
-        await pool.execute(file.read())
+    schema = await bot.run_blocking(Path('schema.sql').read_text, encoding='utf-8')
+    await pool.execute(schema)
 
     return pool
 
@@ -58,34 +78,83 @@ async def _callable_prefix(bot: Mafuyu, message: discord.Message) -> list[str]:
     return prefixes
 
 
+async def run_cluster(*, token: str, workers: int, shard_count: int | None, worker_args: list[str]) -> None:
+    if shard_count is None:
+        shard_count = await recommended_shard_count(token)
+
+    supervisor = ClusterSupervisor(
+        shard_count=shard_count,
+        workers=workers,
+        worker_args=worker_args,
+        dsn=DATABASE_CRED,
+        metrics_port=int(METRICS_PORT) if METRICS_PORT else None,
+    )
+    await supervisor.run()
+
+
 @click.command()
 @click.option('--production', is_flag=True)
-def run(*, production: bool) -> None:
+@click.option(
+    '--intents',
+    'intents_profile',
+    type=click.Choice(list(INTENT_PROFILES)),
+    default=INTENTS_PROFILE,
+    show_default=True,
+    help='The gateway intents and member cache profile to run with.',
+)
+@click.option(
+    '--workers',
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help='Worker processes to split the shards over. More than one runs the bot as a cluster.',
+)
+@click.option('--shard-count', type=click.IntRange(min=1), help='Total shards. Defaults to what Discord recommends.')
+@click.option('--shard-ids', hidden=True, help='The shards this process owns, as first-last. Set by the cluster.')
+@click.option('--cluster-name', hidden=True, help='The name of this worker. Set by the cluster.')
+def run(  # noqa: PLR0913
+    *,
+    production: bool,
+    intents_profile: str,
+    workers: int,
+    shard_count: int | None,
+    shard_ids: str | None,
+    cluster_name: str | None,
+) -> None:
     token = TOKEN if production else TEST_TOKEN
     with setup_logging():
+        if workers > 1:
+            worker_args = ['--intents', intents_profile, *(['--production'] if production else [])]
+            asyncio.run(run_cluster(token=token, workers=workers, shard_count=shard_count, worker_args=worker_args))
+            return
 
         async def run_bot(token: str) -> None:
-            pool = await create_bot_pool()
             allowed_mentions = discord.AllowedMentions(everyone=False, users=True, roles=False, replied_user=False)
-            intents = discord.Intents.all()
-            session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=60))
-
-            extensions = [
-                'extensions.animanga',
-                'extensions.internals',
-                'extensions.meta',
-                'extensions.utility',
-                'extensions.misc',
-            ]
+            profile = get_intents_profile(intents_profile)
+            metrics = MetricsRegistry()
+            http_clients = HTTPClients(metrics=metrics)
+
+            # Every extension relies on internals for the blacklist cache and error handling
+            extensions = {
+                'extensions.internals': (),
+                'extensions.animanga': ('extensions.internals',),
+                'extensions.meta': ('extensions.internals',),
+                'extensions.utility': ('extensions.internals',),
+                'extensions.misc': ('extensions.internals',),
+            }
 
             async with Mafuyu(
                 command_prefix=_callable_prefix,
                 extensions=extensions,
                 allowed_mentions=allowed_mentions,
-                intents=intents,
-                session=session,
+                intents_profile=profile,
+                http_clients=http_clients,
+                metrics=metrics,
+                shard_ids=parse_shard_ids(shard_ids) if shard_ids else None,
+                shard_count=shard_count,
+                cluster_name=cluster_name,
             ) as bot:
-                bot.pool = pool
+                bot.pool = await create_bot_pool(bot)
                 await bot.start(token)
 
         asyncio.run(run_bot(token=token))
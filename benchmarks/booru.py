@@ -0,0 +1,104 @@
+"""
+Measure the booru client against a local stub of danbooru.
+
+The stub answers with an ETag and honours If-None-Match, and fails a share of requests with a 429 or a 503.
+Requests cycle through a handful of queries, so most of them end up conditional.
+
+    python -m benchmarks.booru --requests 2000 --concurrency 50 --rate 200 --failure-rate 0.1
+"""
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import hashlib
+import json
+import random
+import time
+
+import aiohttp
+import click
+from aiohttp import web
+
+from utilities.booru import BooruClient
+from utilities.errors import BooruUnavailableError
+
+QUERIES = 20
+
+
+def stub_app(failure_rate: float, counts: collections.Counter[int]) -> web.Application:
+    async def autocomplete(request: web.Request) -> web.Response:
+        if random.random() < failure_rate:  # noqa: S311
+            status = random.choice((429, 503))  # noqa: S311
+            counts[status] += 1
+            return web.Response(status=status, headers={'Retry-After': '0'})
+
+        body = json.dumps([{'type': 'tag-word', 'label': request.query['search[query]'], 'value': 'x', 'category': 4}])
+        etag = f'"{hashlib.md5(body.encode()).hexdigest()}"'  # noqa: S324
+        if request.headers.get('If-None-Match') == etag:
+            counts[304] += 1
+            return web.Response(status=304, headers={'ETag': etag})
+
+        counts[200] += 1
+        return web.Response(body=body, content_type='application/json', headers={'ETag': etag})
+
+    app = web.Application()
+    app.router.add_get('/autocomplete.json', autocomplete)
+    return app
+
+
+async def run(requests: int, concurrency: int, rate: float, failure_rate: float) -> None:
+    counts: collections.Counter[int] = collections.Counter()
+    runner = web.AppRunner(stub_app(failure_rate, counts))
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = runner.addresses[0][1]
+
+    results: collections.Counter[str] = collections.Counter()
+    latencies: list[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with aiohttp.ClientSession() as session:
+        client = BooruClient(session, rate=rate, burst=concurrency)
+
+        async def one(number: int) -> None:
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(
+                        f'http://127.0.0.1:{port}/autocomplete.json',
+                        params={'search[query]': f'query{number % QUERIES}', 'search[type]': 'tag_query'},
+                    )
+                except BooruUnavailableError:
+                    results['unavailable'] += 1
+                else:
+                    results['stale' if response.stale else 'ok'] += 1
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(number) for number in range(requests)))
+        elapsed = time.perf_counter() - start
+
+    await runner.cleanup()
+
+    latencies.sort()
+    click.echo(f'{requests / elapsed:.1f} requests/s with a {rate:g}/s token bucket')
+    click.echo(
+        f'p50 {latencies[len(latencies) // 2] * 1000:.1f}ms, p99 {latencies[int(len(latencies) * 0.99)] * 1000:.1f}ms'
+    )
+    click.echo(f'client saw: {dict(results)}')
+    click.echo(f'stub answered: {dict(sorted(counts.items()))}')
+
+
+@click.command()
+@click.option('--requests', default=2000, show_default=True, help='Requests to send.')
+@click.option('--concurrency', default=50, show_default=True, help='Requests in flight at once.')
+@click.option('--rate', default=200.0, show_default=True, help='Token bucket rate, in requests per second.')
+@click.option('--failure-rate', default=0.1, show_default=True, help='Share of requests the stub fails.')
+def main(requests: int, concurrency: int, rate: float, failure_rate: float) -> None:
+    asyncio.run(run(requests, concurrency, rate, failure_rate))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Measure card rendering throughput, in process and through the worker pool at several sizes.
+
+Every card has a different title so the renderer's cache never answers.
+
+    python -m benchmarks.card_render --cards 200 --workers 1,2,4
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from io import BytesIO
+
+import click
+from PIL import Image
+
+from utilities.rendering import Card, CardRenderer, render_card
+
+
+def make_cards(count: int) -> list[Card]:
+    buffer = BytesIO()
+    Image.new('RGB', (256, 256), 'pink').save(buffer, 'PNG')
+    avatar = buffer.getvalue()
+
+    return [
+        Card(
+            title=f'Pulled cards statistics for benchmark#{number:04}',
+            lines=(
+                '1234 cards, worth 5678 blombos',
+                'R1: 600, R2: 400, R3: 200',
+                '321 pullalls since 01 Jan 2025',
+                '1.23 pullalls per day',
+            ),
+            avatar=avatar,
+        )
+        for number in range(count)
+    ]
+
+
+async def pooled(cards: list[Card], workers: int) -> float:
+    renderer = CardRenderer(workers=workers)
+    try:
+        await asyncio.gather(*(renderer.render(card) for card in make_cards(workers)))  # Start the workers up front
+
+        start = time.perf_counter()
+        await asyncio.gather(*(renderer.render(card) for card in cards))
+        return time.perf_counter() - start
+    finally:
+        renderer.close()
+
+
+@click.command()
+@click.option('--cards', 'count', default=200, show_default=True, help='Cards to render per run.')
+@click.option('--workers', default=f'1,2,{os.cpu_count() or 1}', show_default=True, help='Comma separated pool sizes.')
+def main(count: int, workers: str) -> None:
+    cards = make_cards(count)
+
+    start = time.perf_counter()
+    for card in cards:
+        render_card(card)
+    elapsed = time.perf_counter() - start
+    click.echo(f'in process: {count / elapsed:.1f} cards/s, {elapsed / count * 1000:.2f}ms per card')
+
+    for size in (int(value) for value in workers.split(',')):
+        elapsed = asyncio.run(pooled(cards, size))
+        click.echo(f'{size} workers: {count / elapsed:.1f} cards/s, {count / elapsed / size:.1f} cards/s per worker')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+Compare deleting messages one at a time against bounded-concurrency and bulk deletion, against a mocked HTTP client.
+
+The mock answers after a fixed latency and enforces a per-route bucket the way Discord does, so the numbers show
+how much of a cleanup is spent waiting on round trips versus the rate limit.
+
+    python -m benchmarks.cleanup --messages 200 --latency 0.1
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import TYPE_CHECKING, cast
+
+import click
+import discord
+
+from utilities.cleanup import delete_messages
+
+if TYPE_CHECKING:
+    import datetime
+    from collections.abc import Awaitable, Callable, Sequence
+
+    type Case = Callable[[list[discord.Message], MockHTTP], Awaitable[object]]
+
+
+class MockHTTP:
+    """Answers every request after a fixed latency, holding requests back once a route's bucket is empty."""
+
+    def __init__(self, *, latency: float, limit: int, window: float) -> None:
+        self.latency = latency
+        self.limit = limit
+        self.window = window
+
+        self.requests = 0
+        self._buckets: dict[str, tuple[float, int]] = {}  # Route to when its window started and requests made in it
+
+        super().__init__()
+
+    async def request(self, route: str) -> None:
+        while True:
+            now = time.monotonic()
+            started, used = self._buckets.get(route, (now, 0))
+            if now - started >= self.window:
+                started, used = now, 0
+
+            if used < self.limit:
+                self._buckets[route] = (started, used + 1)
+                break
+
+            await asyncio.sleep(started + self.window - now)
+
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+
+
+class MockMessage:
+    def __init__(self, http: MockHTTP, message_id: int, created_at: datetime.datetime) -> None:
+        self.http = http
+        self.id = message_id
+        self.created_at = created_at
+
+        super().__init__()
+
+    async def delete(self) -> None:
+        await self.http.request('DELETE /channels/{channel_id}/messages/{message_id}')
+
+
+class MockChannel:
+    def __init__(self, http: MockHTTP) -> None:
+        self.http = http
+
+        super().__init__()
+
+    async def delete_messages(self, messages: Sequence[object]) -> None:  # noqa: ARG002
+        await self.http.request('POST /channels/{channel_id}/messages/bulk-delete')
+
+
+async def serial(messages: list[discord.Message]) -> None:
+    # What cleanup used to do without Manage Messages
+    for message in messages:
+        await message.delete()
+
+
+async def run(count: int, latency: float, limit: int, window: float, concurrency: tuple[int, ...]) -> None:
+    now = discord.utils.utcnow()
+
+    def setup() -> tuple[MockHTTP, list[discord.Message]]:
+        http = MockHTTP(latency=latency, limit=limit, window=window)
+        messages = [cast('discord.Message', MockMessage(http, number, now)) for number in range(count)]
+        return http, messages
+
+    cases: list[tuple[str, Case]] = [('serial', lambda messages, _: serial(messages))]
+    cases.extend(
+        (f'concurrency {workers}', lambda messages, _, workers=workers: delete_messages(messages, concurrency=workers))
+        for workers in concurrency
+    )
+    cases.append((
+        'bulk',
+        lambda messages, http: delete_messages(messages, channel=cast('discord.TextChannel', MockChannel(http))),
+    ))
+
+    click.echo(f'Deleting {count} messages, {latency * 1000:.0f}ms latency, {limit} requests per {window:.1f}s per route')
+    for name, case in cases:
+        http, messages = setup()
+        start = time.perf_counter()
+        await case(messages, http)
+        elapsed = time.perf_counter() - start
+        click.echo(f'  {name}: {elapsed:.2f}s over {http.requests} requests')
+
+
+@click.command()
+@click.option('--messages', 'count', default=100, show_default=True, help='Messages to delete.')
+@click.option('--latency', default=0.1, show_default=True, help='Seconds each mocked request takes.')
+@click.option('--limit', default=5, show_default=True, help='Requests allowed per route in each window.')
+@click.option('--window', default=1.0, show_default=True, help='Length of a rate limit window in seconds.')
+@click.option('--concurrency', default='1,5,10', show_default=True, help='Comma separated worker counts to try.')
+def main(count: int, latency: float, limit: int, window: float, concurrency: str) -> None:
+    asyncio.run(run(count, latency, limit, window, tuple(int(workers) for workers in concurrency.split(','))))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Fire a burst of identical concurrent requests at a local stub of danbooru, with and without coalescing.
+
+The stub takes a while to answer, like danbooru under load, so the whole burst arrives while the first request
+is still in flight.
+
+    python -m benchmarks.coalescing --burst 1000 --latency 0.2
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import aiohttp
+import click
+import yarl
+from aiohttp import web
+
+from utilities.booru import BooruClient
+
+
+def stub_app(latency: float, hits: list[int]) -> web.Application:
+    async def random_post(_: web.Request) -> web.Response:
+        hits[0] += 1
+        await asyncio.sleep(latency)
+        return web.json_response({'id': 1, 'file_url': 'https://example.com/1.png'})
+
+    app = web.Application()
+    app.router.add_get('/posts/random.json', random_post)
+    return app
+
+
+async def burst(client: BooruClient, url: str, size: int, *, coalesce: bool) -> float:
+    params = {'tags': 'solo hatsune_miku rating:general'}
+    request_url = yarl.URL(url).update_query(params)
+
+    start = time.perf_counter()
+    if coalesce:
+        await asyncio.gather(*(client.get(url, params=params, cache=False) for _ in range(size)))
+    else:
+        await asyncio.gather(*(client._get(request_url, str(request_url), cache=False) for _ in range(size)))  # pyright: ignore[reportPrivateUsage]
+    return time.perf_counter() - start
+
+
+async def run(size: int, latency: float) -> None:
+    hits = [0]
+    runner = web.AppRunner(stub_app(latency, hits))
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    url = f'http://127.0.0.1:{runner.addresses[0][1]}/posts/random.json'
+
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        for coalesce in (False, True):
+            hits[0] = 0
+            client = BooruClient(session, rate=size * 10, burst=size)  # Never throttled, only coalescing is measured
+            elapsed = await burst(client, url, size, coalesce=coalesce)
+            label = 'coalesced' if coalesce else 'independent'
+            click.echo(f'{label}: {size} requests, {hits[0]} reached upstream, {elapsed:.3f}s')
+
+    await runner.cleanup()
+
+
+@click.command()
+@click.option('--burst', 'size', default=1000, show_default=True, help='Identical requests fired at once.')
+@click.option('--latency', default=0.2, show_default=True, help='Seconds the stub takes to answer.')
+def main(size: int, latency: float) -> None:
+    asyncio.run(run(size, latency))
+
+
+if __name__ == '__main__':
+    main()
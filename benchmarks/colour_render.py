@@ -0,0 +1,64 @@
+"""
+Compare renders per second of the colour command's thumbnail with Pillow, Pillow behind an LRU cache and the PNG template.
+
+Colours are drawn the way the command sees them: mostly a small set of popular colours, the rest random.
+
+    python -m benchmarks.colour_render --renders 20000 --popular 0.8
+"""
+
+from __future__ import annotations
+
+import functools
+import random
+import time
+from io import BytesIO
+from typing import TYPE_CHECKING
+
+import click
+from PIL import Image
+
+from utilities.images import solid_png
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+SIZE = (128, 128)
+
+
+def pillow(rgb: tuple[int, int, int]) -> bytes:
+    # What the colour command used to do on every call
+    buffer = BytesIO()
+    Image.new('RGB', SIZE, color=rgb).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def colours(count: int, popular: float) -> list[tuple[int, int, int]]:
+    rng = random.Random(0)  # noqa: S311
+    favourites = [(rng.randrange(256), rng.randrange(256), rng.randrange(256)) for _ in range(50)]
+    return [
+        rng.choice(favourites) if rng.random() < popular else (rng.randrange(256), rng.randrange(256), rng.randrange(256))
+        for _ in range(count)
+    ]
+
+
+@click.command()
+@click.option('--renders', default=20000, show_default=True, help='Thumbnails to render per renderer.')
+@click.option('--popular', default=0.8, show_default=True, help='Share of renders which use one of 50 popular colours.')
+@click.option('--cache-size', default=256, show_default=True, help='Entries kept by the cached Pillow renderer.')
+def main(renders: int, popular: float, cache_size: int) -> None:
+    inputs = colours(renders, popular)
+    renderers: list[tuple[str, Callable[[tuple[int, int, int]], bytes]]] = [
+        ('pillow', pillow),
+        (f'pillow + lru({cache_size})', functools.lru_cache(maxsize=cache_size)(pillow)),
+        ('template', functools.partial(solid_png, size=SIZE)),
+    ]
+
+    for name, render in renderers:
+        start = time.perf_counter()
+        size = sum(len(render(rgb)) for rgb in inputs)
+        elapsed = time.perf_counter() - start
+        click.echo(f'{name}: {renders / elapsed:,.0f} renders/s, {size / renders:.0f} bytes per image')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Measure how long a fresh interpreter takes to import the bot and its extensions, and fail past a budget.
+
+Every round runs in a new process, so nothing is cached in sys.modules. One more round runs with
+`-X importtime` and the modules which took the longest on their own are listed.
+
+    python -m benchmarks.import_time --budget 1000 --save importtime.log
+
+Exits with a non-zero status when the median import time is over the budget, so it can run in CI.
+"""
+
+from __future__ import annotations
+
+import os
+import statistics
+import subprocess  # noqa: S404
+import sys
+from pathlib import Path
+
+import click
+
+# What the launcher imports, plus every extension loaded on startup
+MODULES = (
+    'utilities.bases.bot',
+    'extensions.internals',
+    'extensions.animanga',
+    'extensions.meta',
+    'extensions.utility',
+    'extensions.misc',
+)
+BUDGET_MS = 1000.0
+
+TIMED_IMPORT = """
+import time
+start = time.perf_counter()
+{imports}
+print(time.perf_counter() - start)
+"""
+
+
+def run_import(modules: tuple[str, ...], *, importtime: bool = False) -> subprocess.CompletedProcess[str]:
+    env = os.environ.copy()
+    env.setdefault('OWNER_IDS', '[]')  # config.py can't be imported without it
+
+    code = TIMED_IMPORT.format(imports='\n'.join(f'import {module}' for module in modules))
+    flags = ['-X', 'importtime'] if importtime else []
+    return subprocess.run(  # noqa: S603
+        [sys.executable, *flags, '-c', code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+        cwd=Path(__file__).parent.parent,
+    )
+
+
+def slowest_modules(importtime_log: str, count: int) -> list[tuple[int, int, str]]:
+    entries: list[tuple[int, int, str]] = []
+
+    for line in importtime_log.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+
+        own, cumulative, name = line.removeprefix('import time:').split('|')
+        entries.append((int(own), int(cumulative), name.strip()))
+
+    entries.sort(reverse=True)
+    return entries[:count]
+
+
+@click.command()
+@click.option('--rounds', default=5, show_default=True, help='Fresh interpreters to time.')
+@click.option('--budget', default=BUDGET_MS, show_default=True, help='Median import time allowed, in milliseconds.')
+@click.option('--top', default=15, show_default=True, help='Slowest modules to list.')
+@click.option('--save', type=click.Path(dir_okay=False, path_type=Path), help='Write the raw -X importtime output here.')
+def main(rounds: int, budget: float, top: int, save: Path | None) -> None:
+    timings = [float(run_import(MODULES).stdout) * 1000 for _ in range(rounds)]
+
+    audit = run_import(MODULES, importtime=True).stderr
+    if save:
+        save.write_text(audit)
+
+    click.echo(f'Slowest modules (self / cumulative, of {sum(1 for _ in audit.splitlines()) - 1} imported)')
+    for own, cumulative, name in slowest_modules(audit, top):
+        click.echo(f'  {own / 1000:8.2f}ms {cumulative / 1000:8.2f}ms  {name}')
+
+    median = statistics.median(timings)
+    click.echo(f'Import time: median {median:.0f}ms, min {min(timings):.0f}ms, max {max(timings):.0f}ms')
+
+    if median > budget:
+        msg = f'Import time of {median:.0f}ms is over the {budget:.0f}ms budget'
+        raise click.ClickException(msg)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Measure what capturing a deleted message costs, under a synthetic stream of deletes across many channels.
+
+The memory budget is kept small enough that most deletes also evict from the least recently sniped channel.
+
+    python -m benchmarks.snipe --events 500000 --channels 5000 --max-bytes 4194304
+"""
+
+from __future__ import annotations
+
+import random
+import time
+
+import click
+
+from utilities.snipe import SnipedMessage, SnipeStore
+
+
+def make_messages(count: int) -> list[SnipedMessage]:
+    return [
+        SnipedMessage(
+            message_id=number,
+            author_id=number % 997,
+            author_name=f'user{number % 997}',
+            content='a' * random.randint(1, 400),  # noqa: S311
+            attachments=(),
+            created_at=time.time(),
+            edited=False,
+        )
+        for number in range(count)
+    ]
+
+
+@click.command()
+@click.option('--events', default=500_000, show_default=True, help='Deletes to capture.')
+@click.option('--channels', default=5_000, show_default=True, help='Channels the deletes are spread over.')
+@click.option('--max-bytes', default=4 * 1024 * 1024, show_default=True, help='Memory budget of the store.')
+def main(events: int, channels: int, max_bytes: int) -> None:
+    messages = make_messages(events)
+    channel_ids = [random.randrange(channels) for _ in range(events)]  # noqa: S311
+    store = SnipeStore(max_bytes=max_bytes)
+
+    start = time.perf_counter()
+    for channel_id, message in zip(channel_ids, messages, strict=True):
+        store.add(channel_id, message)
+    elapsed = time.perf_counter() - start
+
+    click.echo(f'{events / elapsed:,.0f} deletes/s, {elapsed / events * 1e9:.0f}ns per delete')
+    click.echo(
+        f'kept {len(store):,} messages in {store.size / 1024 / 1024:.2f}MiB of a {max_bytes / 1024 / 1024:.2f}MiB budget'
+    )
+
+    start = time.perf_counter()
+    for channel_id in range(channels):
+        store.get(channel_id)
+    elapsed = time.perf_counter() - start
+    click.echo(f'{elapsed / channels * 1e9:.0f}ns per snipe')
+
+
+if __name__ == '__main__':
+    main()
@@ -12,9 +12,22 @@ WEBHOOK: str = getenv('WEBHOOK')
 SUGGESTIONS_WEBHOOK_TOKEN: str = getenv('SUGGESTION_WEBHOOK')
 
 DATABASE_CRED: str = getenv('POSTGRES_URI')
+POOL_MIN_SIZE: int = int(getenv('POOL_MIN_SIZE', '2'))
+POOL_MAX_SIZE: int = int(getenv('POOL_MAX_SIZE', '10'))
+POOL_MAX_INACTIVE_LIFETIME: float = float(getenv('POOL_MAX_INACTIVE_LIFETIME', '300'))
+STATEMENT_TIMEOUT: int = int(getenv('STATEMENT_TIMEOUT', '10000'))  # Milliseconds
 
 DEFAULT_PREFIX: str = getenv('DEFAULT_PREFIX')
 
+INTENTS_PROFILE: str = getenv('INTENTS_PROFILE', 'lean')
+
+METRICS_PORT: str | None = getenv('METRICS_PORT')
+
+HTTP_CONNECTIONS: int = int(getenv('HTTP_CONNECTIONS', '30'))  # Per upstream pool, see utilities/http.py
+BOORU_CONNECTIONS: int = int(getenv('BOORU_CONNECTIONS', '10'))
+
+RENDER_WORKERS: int = int(getenv('RENDER_WORKERS', '2'))  # Processes rendering image cards
+
 OWNER_IDS: list[int] = json.loads(getenv('OWNER_IDS'))
 
 TOPGG: str = getenv('TOPGG')
@@ -5,21 +5,20 @@ from typing import TYPE_CHECKING, Literal, Self
 
 import discord
 from asyncpg.exceptions import UniqueViolationError
-from discord.ext import menus
 
 from utilities.constants import BotEmojis
 from utilities.embed import Embed
-from utilities.errors import WaifuNotFoundError
+from utilities.errors import BooruUnavailableError, WaifuNotFoundError
 from utilities.functions import fmt_str, timestamp_str
-from utilities.pagination import Paginator
+from utilities.pagination import KeysetPageSource, Paginator
+from utilities.queries import WAIFU_PASS, WAIFU_SMASH, WAIFU_SNAPSHOT
 from utilities.types import WaifuFavouriteEntry, WaifuResult
 from utilities.view import BaseView
 
 if TYPE_CHECKING:
-    from aiohttp import ClientSession
-
     from utilities.bases.bot import Mafuyu
     from utilities.bases.context import MafuContext
+    from utilities.booru import BooruClient
 
 __all__ = ('WaifuSearchView',)
 
@@ -31,7 +30,7 @@ class WaifuBase(BaseView):
     def __init__(
         self,
         ctx: MafuContext,
-        session: ClientSession,
+        booru: BooruClient,
         *,
         nsfw: bool,
         for_user: int,
@@ -39,7 +38,7 @@ class WaifuBase(BaseView):
     ) -> None:
         super().__init__()
         self.ctx = ctx
-        self.session = session
+        self.booru = booru
         self.nsfw = nsfw
         self.for_user = for_user
         self.query = query
@@ -54,7 +53,7 @@ class WaifuBase(BaseView):
     async def start(cls, ctx: MafuContext, *, query: None | str = None) -> Self | None:
         inst = cls(
             ctx,
-            ctx.bot.session,
+            ctx.bot.booru,
             for_user=ctx.author.id,
             nsfw=(
                 ctx.channel.is_nsfw()
@@ -68,7 +67,7 @@ class WaifuBase(BaseView):
         )
         try:
             data = await inst.request()
-        except KeyError:
+        except BooruUnavailableError:
             await ctx.reply('Hey! The bot got ratelimited by danbooru. Try again')
             return None
 
@@ -138,6 +137,14 @@ class WaifuBase(BaseView):
                     'You have already added this waifu in your favourites list',
                     ephemeral=True,
                 )
+            await interaction.client.pool.execute(
+                WAIFU_SNAPSHOT,
+                self.current.image_id,
+                self.current.url,
+                self.current.characters,
+                self.current.copyright,
+                self.current.rating,
+            )
             return await interaction.response.send_message(
                 (
                     f'Successfully added [#{self.current.image_id}]'
@@ -150,20 +157,12 @@ class WaifuBase(BaseView):
             self.passers.remove(interaction.user)
 
         self.smashers.add(interaction.user)
-        await interaction.client.pool.execute(
-            """
-                INSERT INTO
-                    Waifus (id, smashes, nsfw)
-                VALUES
-                    ($1, 1, $2)
-                ON CONFLICT (id) DO
-                UPDATE
-                SET
-                    smashes = Waifus.smashes + 1
-            """,
+        votes = await interaction.client.pool.fetchrow(
+            WAIFU_SMASH,
             self.current.image_id,
             self.nsfw,
         )
+        interaction.client.dispatch('waifu_vote', votes)
         await interaction.response.edit_message(embed=self.embed(self.current))
         return None
 
@@ -191,20 +190,12 @@ class WaifuBase(BaseView):
             self.smashers.remove(interaction.user)
 
         self.passers.add(interaction.user)
-        await interaction.client.pool.execute(
-            """
-                INSERT INTO
-                    Waifus (id, passes, nsfw)
-                VALUES
-                    ($1, 1, $2)
-                ON CONFLICT (id) DO
-                UPDATE
-                SET
-                    passes = Waifus.passes + 1
-                """,
+        votes = await interaction.client.pool.fetchrow(
+            WAIFU_PASS,
             self.current.image_id,
             self.nsfw,
         )
+        interaction.client.dispatch('waifu_vote', votes)
         await interaction.response.edit_message(embed=self.embed(self.current))
         return None
 
@@ -214,7 +205,7 @@ class WaifuBase(BaseView):
         self.passers.clear()
         try:
             data = await self.request()
-        except KeyError:
+        except BooruUnavailableError:
             await interaction.response.send_message('Hey! Slow down.', ephemeral=True)
             return
         await interaction.response.edit_message(embed=self.embed(data))
@@ -241,7 +232,7 @@ class WaifuBase(BaseView):
 class WaifuSearchView(WaifuBase):
     async def request(self) -> WaifuResult:
         rating = fmt_str(['explicit', 'questionable', 'sensitive'], seperator=',') if self.nsfw is True else 'general'
-        waifu = await self.session.get(
+        response = await self.booru.get(
             'https://danbooru.donmai.us/posts/random.json',
             params={
                 'tags': fmt_str(
@@ -253,11 +244,11 @@ class WaifuSearchView(WaifuBase):
                     seperator=' ',
                 ),
             },
+            cache=False,
         )
-        data = await waifu.json()
+        data = response.data
 
-        success = 200
-        if waifu.status != success or not data:
+        if not response.ok or not data:
             raise WaifuNotFoundError(self.query, json=data)
 
         current = WaifuResult(
@@ -267,30 +258,88 @@ class WaifuSearchView(WaifuBase):
             source=data['source'],
             characters=data['tag_string_character'],
             copyright=data['tag_string_copyright'],
+            rating=data['rating'],
         )
         self.current = current
 
         return self.current
 
 
-class WaifuPageSource(menus.ListPageSource):
-    def __init__(self, bot: Mafuyu, entries: list[WaifuFavouriteEntry]) -> None:
+class WaifuPageSource(KeysetPageSource[WaifuFavouriteEntry, tuple[datetime.datetime, int]]):
+    def __init__(self, bot: Mafuyu, *, user: discord.User, show_nsfw: bool) -> None:
         self.bot = bot
-        super().__init__(entries, per_page=1)
+        self.user = user
+        self.show_nsfw = show_nsfw
+        super().__init__(per_page=1)
+
+    async def count(self) -> int:
+        return await self.bot.pool.fetchval(
+            """SELECT COUNT(*) FROM WaifuFavourites WHERE user_id = $1 AND (NOT nsfw OR $2)""",
+            self.user.id,
+            self.show_nsfw,
+        )
 
-    async def format_page(self, _: Paginator, entry: WaifuFavouriteEntry) -> Embed:
-        post_url = f'https://danbooru.donmai.us/posts/{entry.id}.json'
-        post_res = await self.bot.session.get(post_url)
-        post_data = await post_res.json()
+    async def fetch(
+        self, after: tuple[datetime.datetime, int] | None, *, offset: int, limit: int
+    ) -> list[WaifuFavouriteEntry]:
+        tm, waifu_id = after or (None, None)
+        records = await self.bot.pool.fetch(
+            """
+            SELECT f.*, w.file_url, w.characters, w.copyright, w.rating
+            FROM WaifuFavourites f JOIN Waifus w ON w.id = f.id
+            WHERE f.user_id = $1 AND (NOT f.nsfw OR $2) AND ($3::TIMESTAMP IS NULL OR (f.tm, f.id) > ($3, $4))
+            ORDER BY f.tm, f.id
+            LIMIT $5 OFFSET $6
+            """,
+            self.user.id,
+            self.show_nsfw,
+            tm,
+            waifu_id,
+            limit,
+            offset,
+        )
+        return [
+            WaifuFavouriteEntry(
+                id=e['id'],
+                user_id=self.user,
+                nsfw=e['nsfw'],
+                tm=e['tm'],
+                post=WaifuResult(
+                    image_id=e['id'],
+                    url=e['file_url'],
+                    characters=e['characters'] or '',
+                    copyright=e['copyright'] or '',
+                    rating=e['rating'],
+                )
+                if e['file_url']
+                else None,
+            )
+            for e in records
+        ]
+
+    def key(self, entry: WaifuFavouriteEntry) -> tuple[datetime.datetime, int]:
+        return (entry.tm, entry.id)
+
+    async def fetch_post(self, post_id: int) -> WaifuResult:
+        # Only for favourites made before posts were snapshotted, which the refresher didn't get to yet
+        response = await self.bot.booru.get(f'https://danbooru.donmai.us/posts/{post_id}.json')
+        if not response.ok:
+            raise WaifuNotFoundError(json=response.data)
+        post_data = response.data
 
         post = WaifuResult(
             image_id=post_data['id'],
             url=post_data['file_url'],
             characters=post_data['tag_string_character'],
             copyright=post_data['tag_string_copyright'],
+            rating=post_data['rating'],
         )
+        await self.bot.pool.execute(WAIFU_SNAPSHOT, post_id, post.url, post.characters, post.copyright, post.rating)
+        return post
 
-        # We have the post and user's favourite data, basically everything
+    async def format_page(self, _: Paginator, entry: WaifuFavouriteEntry) -> Embed:
+        post_url = f'https://danbooru.donmai.us/posts/{entry.id}.json'
+        post = entry.post or await self.fetch_post(entry.id)
 
         embed = Embed(
             title=f'#{post.image_id} {"[NSFW]" if entry.nsfw is True else ""}',
@@ -331,15 +380,17 @@ class RemoveFavButton(discord.ui.Button[Paginator]):
             item.id,  # pyright: ignore[reportUnknownMemberType]
             interaction.user.id,
         )
-        if hasattr(self.view.source, 'entries'):
-            self.view.source.entries.pop(self.view.current_page)  # pyright: ignore[reportUnknownMemberType,reportAttributeAccessIssue]
+        source = self.view.source
+        if isinstance(source, WaifuPageSource):
+            await source.refresh()
+            self.view.invalidate()
 
-            if self.view.source.entries:  # pyright: ignore[reportUnknownMemberType,reportAttributeAccessIssue]
+            if source.total:
                 self.view.clear_items()
                 self.view.fill_items()
                 self.view.add_item(self)
 
-                await self.view.show_checked_page(interaction, self.view.current_page)
+                await self.view.show_checked_page(interaction, min(self.view.current_page, source.get_max_pages() - 1))
                 return
         await interaction.response.edit_message(content='No waifu favourite entries', embed=None, view=None)
         self.view.stop()
@@ -1,45 +1,68 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+import datetime
+import logging
+from typing import TYPE_CHECKING, Literal
 
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 
 from utilities.bases.cog import MafuCog
-from utilities.errors import WaifuNotFoundError
+from utilities.embed import Embed
+from utilities.errors import BooruUnavailableError, WaifuNotFoundError
+from utilities.functions import fmt_str
+from utilities.leaderboard import TopK, wilson_lower_bound
 from utilities.pagination import Paginator
-from utilities.types import WaifuFavouriteEntry
+from utilities.queries import WAIFU_SNAPSHOT
 
 from .views import RemoveFavButton, WaifuPageSource, WaifuSearchView
 
 if TYPE_CHECKING:
-    import aiohttp
+    import asyncpg
 
     from utilities.bases.bot import Mafuyu
     from utilities.bases.context import MafuContext
+    from utilities.booru import BooruClient
 
 
 __all__ = ('Waifu',)
 
+log = logging.getLogger(__name__)
+
 TAG_ALLOWED_TYPES = [3, 4]
 
+SYNC_BATCH = 100  # The most posts danbooru returns for one request
+SYNC_BATCHES = 10  # Per run of the refresher, so it never hogs the booru rate limit
+SYNC_AFTER = datetime.timedelta(days=7)
+
+LEADERBOARD_SIZE = 10
+
+type LeaderboardKind = Literal['smashed', 'passed', 'ratio']
+
+# The ORDER BY of each leaderboard, each matches one of the indexes on Waifus so only the first rows get read
+LEADERBOARD_ORDER: dict[LeaderboardKind, str] = {
+    'smashed': 'smashes',
+    'passed': 'passes',
+    'ratio': 'wilson_lower_bound(smashes, smashes + passes)',
+}
+
 
-async def get_waifu(session: aiohttp.ClientSession, waifu: str) -> list[tuple[str, str]]:
-    req = await session.get(
+async def get_waifu(booru: BooruClient, waifu: str) -> list[tuple[str, str]]:
+    response = await booru.get(
         'https://safebooru.donmai.us/autocomplete.json',
         params={
             'search[query]': waifu,
             'search[type]': 'tag_query',
         },
     )
-    data = await req.json()
+    data = response.data if response.ok else None
     characters = [
         (str(obj['label']), str(obj['value']))
-        for obj in data
+        for obj in data or ()
         if obj['type'] == 'tag-word' and obj.get('category') in TAG_ALLOWED_TYPES
     ]
-    if req.status != 200 or not data or not characters:
+    if not characters:
         raise WaifuNotFoundError(waifu)
     return characters
 
@@ -49,13 +72,127 @@ async def waifu_autocomplete(
     current: str,
 ) -> list[app_commands.Choice[str]]:
     try:
-        characters = await get_waifu(interaction.client.session, current)
-    except WaifuNotFoundError:
+        characters = await get_waifu(interaction.client.booru, current)
+    except (WaifuNotFoundError, BooruUnavailableError):
         return []
     return [app_commands.Choice(name=char[0].title(), value=char[1]) for char in characters]
 
 
+def leaderboard_score(kind: LeaderboardKind, smashes: int, passes: int) -> float:
+    if kind == 'smashed':
+        return smashes
+    if kind == 'passed':
+        return passes
+    return wilson_lower_bound(smashes, smashes + passes)
+
+
 class Waifu(MafuCog):
+    async def cog_load(self) -> None:
+        self.leaderboards: dict[tuple[LeaderboardKind, bool], TopK] = {
+            (kind, nsfw): TopK(LEADERBOARD_SIZE) for kind in LEADERBOARD_ORDER for nsfw in (False, True)
+        }
+        self.sync_favourites.start()
+        self.refresh_leaderboards.start()
+
+    def cog_unload(self) -> None:
+        self.sync_favourites.cancel()
+        self.refresh_leaderboards.cancel()
+
+    @tasks.loop(minutes=15)
+    async def refresh_leaderboards(self) -> None:
+        # Votes are applied as they come in, this only catches posts which fell out and climbed back up
+        for (kind, nsfw), leaderboard in self.leaderboards.items():
+            records = await self.bot.pool.fetch(
+                f"""
+                SELECT id, smashes, passes FROM Waifus
+                WHERE nsfw = $1
+                ORDER BY {LEADERBOARD_ORDER[kind]} DESC, id
+                LIMIT $2
+                """,  # noqa: S608
+                nsfw,
+                leaderboard.capacity,
+            )
+            leaderboard.replace([
+                (record['id'], leaderboard_score(kind, record['smashes'], record['passes'])) for record in records
+            ])
+
+    @commands.Cog.listener('on_waifu_vote')
+    async def update_leaderboards(self, votes: asyncpg.Record) -> None:
+        for kind in LEADERBOARD_ORDER:
+            self.leaderboards[kind, votes['nsfw']].update(
+                votes['id'], leaderboard_score(kind, votes['smashes'], votes['passes'])
+            )
+
+    @tasks.loop(minutes=30)
+    async def sync_favourites(self) -> None:
+        for _ in range(SYNC_BATCHES):
+            records = await self.bot.pool.fetch(
+                """
+                SELECT id FROM Waifus
+                WHERE
+                    id IN (SELECT id FROM WaifuFavourites)
+                    AND (synced_at IS NULL OR synced_at < CURRENT_TIMESTAMP - $1::INTERVAL)
+                ORDER BY synced_at NULLS FIRST
+                LIMIT $2
+                """,
+                SYNC_AFTER,
+                SYNC_BATCH,
+            )
+            if not records:
+                return
+
+            try:
+                synced = await self.sync_posts([record['id'] for record in records])
+            except BooruUnavailableError:
+                log.warning('Danbooru is unavailable, favourites will be synced on the next run')
+                return
+
+            if not synced:
+                break  # The same posts would be asked for again, the next run retries them
+
+    async def sync_posts(self, post_ids: list[int]) -> bool:
+        """
+        Snapshot the metadata of posts with a single request to danbooru.
+
+        Parameters
+        ----------
+        post_ids : list[int]
+            The posts, at most `SYNC_BATCH` of them
+
+        Returns
+        -------
+        bool
+            If danbooru answered. When it didn't, nothing was changed.
+
+        """
+        response = await self.bot.booru.get(
+            'https://danbooru.donmai.us/posts.json',
+            params={'tags': f'id:{",".join(map(str, post_ids))}', 'limit': str(len(post_ids))},
+            cache=False,
+        )
+        if not response.ok:
+            log.warning('Could not sync %s favourited posts, danbooru answered %s', len(post_ids), response.status)
+            return False
+
+        # Posts danbooru no longer returns keep their last snapshot, and are only tried again once it is stale.
+        # Both go in one transaction, posts are never marked as synced without their snapshot.
+        async with self.bot.pool.acquire() as con, con.transaction():
+            await con.execute("""UPDATE Waifus SET synced_at = CURRENT_TIMESTAMP WHERE id = ANY($1)""", post_ids)
+            await con.executemany(
+                WAIFU_SNAPSHOT.sql,
+                [
+                    (
+                        post['id'],
+                        post.get('file_url'),
+                        post.get('tag_string_character'),
+                        post.get('tag_string_copyright'),
+                        post.get('rating'),
+                    )
+                    for post in response.data
+                ],
+            )
+        return True
+
     @commands.hybrid_group(name='waifu', help='Get waifu images with an option to smash or pass', fallback='get')
     @app_commands.allowed_contexts(guilds=True, dms=True, private_channels=True)
     @app_commands.allowed_installs(guilds=True, users=True)
@@ -63,7 +200,7 @@ class Waifu(MafuCog):
     async def waifu(self, ctx: MafuContext, *, waifu: str | None) -> None:
         if waifu:
             waifu = waifu.replace(' ', '_')
-            characters = await get_waifu(ctx.bot.session, waifu)
+            characters = await get_waifu(ctx.bot.booru, waifu)
             waifu = characters[0][1]  # Points to the value of the first result
         await WaifuSearchView.start(ctx, query=waifu)
 
@@ -78,26 +215,44 @@ class Waifu(MafuCog):
             else False
         )
 
-        query = """SELECT * FROM WaifuFavourites WHERE user_id = $1""" + (' AND nsfw = $2' if show_nsfw is False else '')  # noqa: S608
-        args = [
-            user.id,
-        ]
-
-        if show_nsfw is False:
-            args.append(show_nsfw)
-        fav_entries = await self.bot.pool.fetch(
-            query,
-            *args,
-        )
-
-        if not fav_entries:
+        source = WaifuPageSource(self.bot, user=user, show_nsfw=show_nsfw)
+        await source.prepare()
+        if not source.total:
             await ctx.reply(
                 'No waifu favourites entry found.\n-# You can favourite a waifu by pressing the smash button twice'
             )
             return
 
-        fav_parsed = [WaifuFavouriteEntry(id=e['id'], user_id=user, nsfw=e['nsfw'], tm=e['tm']) for e in fav_entries]
-
-        paginate = Paginator(WaifuPageSource(self.bot, entries=fav_parsed), ctx=ctx)
+        paginate = Paginator(source, ctx=ctx)
         paginate.add_item(RemoveFavButton())
         await paginate.start()
+
+    @waifu.command(name='leaderboard', help='Get the most smashed, passed or best rated waifus', aliases=['top', 'lb'])
+    async def waifu_leaderboard(self, ctx: MafuContext, kind: LeaderboardKind = 'smashed', *, nsfw: bool = False) -> None:
+        if nsfw and (
+            isinstance(ctx.channel, discord.DMChannel | discord.GroupChannel | discord.PartialMessageable)
+            or not ctx.channel.is_nsfw()
+        ):
+            await ctx.reply('The NSFW leaderboards can only be seen in NSFW channels.')
+            return
+
+        entries = self.leaderboards[kind, nsfw].top()
+        if not entries:
+            await ctx.reply('Nobody has smashed or passed any waifus yet.')
+            return
+
+        def score(value: float) -> str:
+            return f'{value:.0%} smash rate, at worst' if kind == 'ratio' else f'{value:.0f} {LEADERBOARD_ORDER[kind]}'
+
+        embed = Embed(
+            title=f'Most {kind} waifus' if kind != 'ratio' else 'Best rated waifus',
+            description=fmt_str(
+                [
+                    f'{rank}. [#{post_id}](https://danbooru.donmai.us/posts/{post_id}) - {score(value)}'
+                    for rank, (post_id, value) in enumerate(entries, start=1)
+                ],
+                seperator='\n',
+            ),
+        )
+        embed.set_footer(text='NSFW posts' if nsfw else 'SFW posts')
+        await ctx.reply(embed=embed)
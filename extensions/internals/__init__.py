@@ -12,7 +12,7 @@ from discord.ext import commands
 
 from .blacklist import Blacklist
 from .dev import Developer
-from .error_handler import ErrorHandler
+from .error_handler import ERROR_VIEW_ITEMS, ErrorHandler
 from .guild import Guild
 
 
@@ -37,4 +37,9 @@ class Internals(Blacklist, Developer, ErrorHandler, Guild, name='Developer'):
 
 
 async def setup(bot: Mafuyu) -> None:
+    bot.add_dynamic_items(*ERROR_VIEW_ITEMS)
     await bot.add_cog(Internals(bot))
+
+
+async def teardown(bot: Mafuyu) -> None:
+    bot.remove_dynamic_items(*ERROR_VIEW_ITEMS)
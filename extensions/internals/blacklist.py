@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import datetime
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 import discord
 from discord.ext import commands
@@ -42,6 +42,26 @@ class Blacklist(MafuCog):
 
         # Filled cache
 
+        self.bot.notifications.subscribe('blacklist', self.on_blacklist_changed)
+
+    async def cog_unload(self) -> None:
+        self.bot.notifications.unsubscribe('blacklist', self.on_blacklist_changed)
+
+    async def on_blacklist_changed(self, payload: dict[str, Any]) -> None:
+        # Another process added or removed this entry
+        snowflake = payload['snowflake']
+        entry = await self.bot.pool.fetchrow("""SELECT * FROM Blacklists WHERE snowflake = $1""", snowflake)
+
+        if entry is None:
+            self.bot.blacklists.pop(snowflake, None)
+            return
+
+        self.bot.blacklists[snowflake] = BlacklistData(
+            reason=entry['reason'],
+            lasts_until=entry['lasts_until'],
+            blacklist_type=entry['blacklist_type'],
+        )
+
     @commands.group(
         name='blacklist',
         aliases=['bl'],
@@ -302,6 +322,8 @@ class Blacklist(MafuCog):
             lasts_until=lasts_until,
             blacklist_type=blacklist_type,
         )
+        await self.bot.notifications.publish('blacklist', snowflake=snowflake.id)
+
         return {snowflake.id: self.bot.blacklists[snowflake.id]}
 
     async def remove(self, snowflake: discord.User | discord.Member | discord.Guild | int) -> dict[int, BlacklistData]:
@@ -337,6 +359,8 @@ class Blacklist(MafuCog):
         )
 
         item_removed = self.bot.blacklists.pop(obj)
+        await self.bot.notifications.publish('blacklist', snowflake=obj)
+
         return {obj: item_removed}
 
     def _timestamp_wording(self, dt: datetime.datetime | None) -> str:
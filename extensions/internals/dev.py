@@ -1,12 +1,13 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Literal
 
+import discord
 from discord.ext import commands
 
 from utilities.bases.cog import MafuCog
 from utilities.constants import BotEmojis
-from utilities.functions import format_tb
+from utilities.functions import fmt_str, format_tb
 
 if TYPE_CHECKING:
     from discord import Message
@@ -15,11 +16,69 @@ if TYPE_CHECKING:
 
 
 class Developer(MafuCog):
-    @commands.command(name='reload', aliases=['re'], hidden=True)
-    async def reload_cogs(self, ctx: MafuContext) -> None | Message:
+    @commands.command(
+        name='reload',
+        aliases=['re'],
+        help='Reload the extensions which changed, `reload force` reloads all of them',
+        hidden=True,
+    )
+    async def reload_cogs(self, ctx: MafuContext, force: Literal['force'] | None = None) -> None | Message:
         try:
-            await self.bot.reload_extensions(self.bot.initial_extensions)
+            reloaded = await self.bot.reload_extensions(self.bot.initial_extensions, force=force is not None)
         except commands.ExtensionError as error:
             return await ctx.reply(format_tb(error))
         else:
+            if not reloaded:
+                return await ctx.reply('No extension has changed.')
             return await ctx.message.add_reaction(BotEmojis.GREEN_TICK)
+
+    @commands.command(name='lag', hidden=True)
+    async def loop_lag(self, ctx: MafuContext) -> Message:
+        monitor = self.bot.lag_monitor
+        spans = monitor.worst
+
+        return await ctx.reply(
+            fmt_str(
+                [
+                    f'- **Current lag:** `{monitor.latest * 1000:.2f}ms`',
+                    f'- **Worst blocking spans** (over `{monitor.threshold * 1000:.0f}ms`):' if spans else None,
+                    *(f'  - `{span.lag * 1000:.2f}ms` {discord.utils.format_dt(span.when, "R")}' for span in spans),
+                ],
+                seperator='\n',
+            )
+        )
+
+    @commands.command(name='metrics', hidden=True)
+    async def metrics_summary(self, ctx: MafuContext, name: str | None = None) -> Message:
+        histograms = self.bot.metrics.histograms
+        families = {name: histograms[name]} if name and name in histograms else histograms
+
+        lines: list[str] = []
+        for family_name, family in families.items():
+            lines.append(family_name)
+            for labels, histogram in sorted(family.items(), key=lambda item: item[1].sum, reverse=True):
+                label_str = ' '.join(f'{k}={v}' for k, v in labels) or '-'
+                summary = (
+                    f'  {label_str}: n={histogram.count} mean={histogram.mean * 1000:.2f}ms '
+                    f'p95<={histogram.quantile(0.95) * 1000:.0f}ms'
+                )
+                lines.append(summary)
+
+        if not lines:
+            return await ctx.reply('Nothing has been recorded yet.')
+        return await ctx.send('```\n' + '\n'.join(lines) + '\n```')
+
+    @commands.command(name='queries', hidden=True)
+    async def query_report(self, ctx: MafuContext, flag: str | None = None) -> None | Message:
+        profiler = self.bot.pool.profiler
+        if flag == 'reset':
+            profiler.reset()
+            return await ctx.message.add_reaction(BotEmojis.GREEN_TICK)
+
+        misses = self.bot.pool.statements.misses
+        return await ctx.send(f'```\n{profiler.report()}\n\nPrepared statement misses: {misses}\n```')
+
+    @commands.command(name='startup', hidden=True)
+    async def startup_report(self, ctx: MafuContext) -> Message:
+        lines = self.bot.startup.report()
+        return await ctx.send('```\n' + '\n'.join(lines) + '\n```')
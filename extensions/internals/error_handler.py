@@ -5,22 +5,22 @@ import datetime
 import difflib
 import inspect
 import logging
-import operator
 from typing import TYPE_CHECKING, Any, Self
 
 import discord
-from discord.ext import commands, menus
+from asyncpg import Record
+from discord.ext import commands
 
 from utilities.bases.cog import MafuCog
 from utilities.constants import ERROR_COLOUR, BotEmojis
 from utilities.embed import Embed
-from utilities.errors import MafuyuError, WaifuNotFoundError
+from utilities.errors import BooruUnavailableError, MafuyuError, WaifuNotFoundError
 from utilities.functions import fmt_str, format_tb, get_command_signature
-from utilities.pagination import Paginator
+from utilities.pagination import KeysetPageSource, Paginator
 from utilities.view import BaseView
 
 if TYPE_CHECKING:
-    from asyncpg import Record
+    import re
 
     from utilities.bases.bot import Mafuyu
     from utilities.bases.context import MafuContext
@@ -248,24 +248,35 @@ class MissingArgumentHandler(discord.ui.View):
         return interaction.user == self.ctx.author
 
 
-class ErrorView(BaseView):
-    def __init__(self, error_record: Record, ctx: MafuContext) -> None:
-        self.error_record = error_record
-        self.ctx = ctx
-        super().__init__()
+class ErrorInfoButton(discord.ui.DynamicItem[discord.ui.Button[BaseView]], template=r'error:info:(?P<id>[0-9]+)'):
+    def __init__(self, error_id: int) -> None:
+        self.error_id = error_id
+        super().__init__(
+            discord.ui.Button(label='Wanna know more?', style=discord.ButtonStyle.grey, custom_id=f'error:info:{error_id}')
+        )
+
+    @classmethod
+    async def from_custom_id(
+        cls, _: discord.Interaction[Mafuyu], __: discord.ui.Button[BaseView], match: re.Match[str], /
+    ) -> Self:
+        return cls(int(match['id']))
+
+    async def callback(self, interaction: discord.Interaction[Mafuyu]) -> None:
+        error_record = await interaction.client.pool.fetchrow("""SELECT * FROM Errors WHERE id = $1""", self.error_id)
+        if not error_record:
+            await interaction.response.send_message('This error no longer exists.', ephemeral=True)
+            return
 
-    @discord.ui.button(label='Wanna know more?', style=discord.ButtonStyle.grey)
-    async def inform_button(self, interaction: discord.Interaction[Mafuyu], _: discord.ui.Button[Self]) -> None:
         embed = Embed(
-            description=f'```py\n{self.error_record["error"]}```',
+            description=f'```py\n{error_record["error"]}```',
             colour=ERROR_COLOUR,
         )
-        error_timestamp: datetime.datetime = self.error_record['occured_when']
-        is_fixed = 'is not' if self.error_record['fixed'] is False else 'is'
+        error_timestamp: datetime.datetime = error_record['occured_when']
+        is_fixed = 'is not' if error_record['fixed'] is False else 'is'
         embed.add_field(
             value=(
                 f'The error was discovered **{discord.utils.format_dt(error_timestamp, "R")}** '
-                f'in the **{self.error_record["command"]}** command and **{is_fixed}** fixed'
+                f'in the **{error_record["command"]}** command and **{is_fixed}** fixed'
             )
         )
         embed.set_footer(
@@ -273,24 +284,37 @@ class ErrorView(BaseView):
             icon_url=interaction.user.display_avatar.url,
         )
         embed.set_author(
-            name=f'Error #{self.error_record["id"]}',
+            name=f'Error #{error_record["id"]}',
             icon_url=BotEmojis.RED_CROSS.url,
         )
 
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
-    @discord.ui.button(label='Get notified', style=discord.ButtonStyle.green)
-    async def notified_button(self, interaction: discord.Interaction[Mafuyu], _: discord.ui.Button[Self]) -> None:
+
+class ErrorNotifyButton(discord.ui.DynamicItem[discord.ui.Button[BaseView]], template=r'error:notify:(?P<id>[0-9]+)'):
+    def __init__(self, error_id: int) -> None:
+        self.error_id = error_id
+        super().__init__(
+            discord.ui.Button(label='Get notified', style=discord.ButtonStyle.green, custom_id=f'error:notify:{error_id}')
+        )
+
+    @classmethod
+    async def from_custom_id(
+        cls, _: discord.Interaction[Mafuyu], __: discord.ui.Button[BaseView], match: re.Match[str], /
+    ) -> Self:
+        return cls(int(match['id']))
+
+    async def callback(self, interaction: discord.Interaction[Mafuyu]) -> None:
         is_user_present = await interaction.client.pool.fetchrow(
             """SELECT * FROM ErrorReminders WHERE id = $1 AND user_id = $2""",
-            self.error_record['id'],
+            self.error_id,
             interaction.user.id,
         )
 
         if is_user_present:
             await interaction.client.pool.execute(
                 """DELETE FROM ErrorReminders WHERE id = $1 AND user_id = $2""",
-                self.error_record['id'],
+                self.error_id,
                 interaction.user.id,
             )
             await interaction.response.send_message(
@@ -301,17 +325,46 @@ class ErrorView(BaseView):
 
         await interaction.client.pool.execute(
             """INSERT INTO ErrorReminders (id, user_id) VALUES ($1, $2)""",
-            self.error_record['id'],
+            self.error_id,
             interaction.user.id,
         )
         await interaction.response.send_message('You will now be notified when this error is fixed', ephemeral=True)
 
 
-class ErrorPageSource(menus.ListPageSource):
-    def __init__(self, bot: Mafuyu, entries: list[Record]) -> None:
+ERROR_VIEW_ITEMS = (ErrorInfoButton, ErrorNotifyButton)
+
+
+class ErrorView(BaseView):
+    """
+    Buttons under an error message, which keep working after a restart.
+
+    The ID of the error is all the state they need and lives in their custom IDs, so the view is never stored.
+    """
+
+    def __init__(self, error_id: int) -> None:
+        super().__init__(timeout=None)
+        self.add_item(ErrorInfoButton(error_id))
+        self.add_item(ErrorNotifyButton(error_id))
+
+
+class ErrorPageSource(KeysetPageSource[Record, int]):
+    def __init__(self, bot: Mafuyu) -> None:
         self.bot = bot
-        entries = sorted(entries, key=operator.itemgetter('id'))
-        super().__init__(entries, per_page=1)
+        super().__init__(per_page=1)
+
+    async def count(self) -> int:
+        return await self.bot.pool.fetchval("""SELECT COUNT(*) FROM Errors""")
+
+    async def fetch(self, after: int | None, *, offset: int, limit: int) -> list[Record]:
+        return await self.bot.pool.fetch(
+            """SELECT * FROM Errors WHERE id > $1 ORDER BY id LIMIT $2 OFFSET $3""",
+            after or 0,
+            limit,
+            offset,
+        )
+
+    def key(self, entry: Record) -> int:
+        return entry['id']
 
     async def format_page(self, _: Paginator, entry: Record) -> Embed:
         embed = await Embed.logger(self.bot, entry)
@@ -570,13 +623,12 @@ class ErrorHandler(MafuCog):
                 guild=ctx.guild,
             )
 
-        view = ErrorView(record, ctx)
-        view.message = await ctx.reply(
+        await ctx.reply(
             embed=Embed.error(
                 title='Error occured',
                 description='The command borked.',
             ),
-            view=view,
+            view=ErrorView(record['id']),
         )
 
         return None
@@ -590,6 +642,9 @@ class ErrorHandler(MafuCog):
         ):
             return None
 
+        if isinstance(error, BooruUnavailableError):
+            return await ctx.reply(str(error), delete_after=error.retry_after)
+
         if isinstance(error, WaifuNotFoundError):
             return await ctx.reply(
                 content=(
@@ -617,10 +672,13 @@ class ErrorHandler(MafuCog):
             embed = await Embed.logger(self.bot, error_record)
             await ctx.reply(embed=embed)
             return
-        errors = await self.bot.pool.fetch(
-            """SELECT * FROM Errors""",
-        )
-        paginate = Paginator(ErrorPageSource(self.bot, errors), ctx=ctx)
+        source = ErrorPageSource(self.bot)
+        await source.prepare()
+        if not source.total:
+            await ctx.reply('No errors have been logged.')
+            return
+
+        paginate = Paginator(source, ctx=ctx)
         await paginate.start()
 
     @errorcmd_base.command(name='fix', description='Mark an error as fixed')
@@ -22,6 +22,8 @@ BOT_FARM_COLOUR = discord.Colour.from_str('#fff5e8')
 def bot_farm_check(guild: discord.Guild) -> bool:
     bots = len([_ for _ in guild.members if _.bot is True])
     members = len(guild.members)
+    if not members:
+        return False  # Nothing cached to judge with
     return (bots / members) * 100 > BOT_FARM_THRESHOLD
 
 
@@ -63,6 +65,8 @@ def find_base_channel(channels: Sequence[discord.abc.GuildChannel]) -> discord.a
 class Guild(MafuCog):
     @commands.Cog.listener('on_guild_join')
     async def guild_join(self, guild: discord.Guild) -> None:
+        await self.bot.ensure_chunked(guild)
+
         is_blacklisted = self.bot.is_blacklisted(guild)
         is_bot_farm = bot_farm_check(guild)
 
@@ -6,11 +6,10 @@ from typing import TYPE_CHECKING
 
 import discord
 from discord.ext import commands
-from jishaku.functools import executor_function
-from PIL import Image
 
 from utilities.embed import Embed
 from utilities.functions import fmt_str
+from utilities.images import solid_png
 
 if TYPE_CHECKING:
     from utilities.bases.bot import Mafuyu
@@ -23,13 +22,9 @@ from .userinfo import Userinfo
 THUMBNAIL_SIZE = (128, 128)
 
 
-@executor_function
 def make_image(colour: discord.Colour) -> BytesIO:
-    thumbnail = Image.new('RGB', THUMBNAIL_SIZE, color=colour.to_rgb())
-    buffer = BytesIO()
-    thumbnail.save(buffer, 'PNG')
-    buffer.seek(0)
-    return buffer
+    # Takes microseconds, so neither a thread nor a cache is worth it
+    return BytesIO(solid_png(colour.to_rgb(), THUMBNAIL_SIZE))
 
 
 class Meta(BotInformation, Userinfo, ServerInfo, name='Meta'):
@@ -59,7 +54,7 @@ class Meta(BotInformation, Userinfo, ServerInfo, name='Meta'):
             colour=colour,
         )
 
-        image = await make_image(colour)
+        image = make_image(colour)
         _ = discord.File(image, filename='colour.png')
         embed.set_thumbnail(url='attachment://colour.png')
 
@@ -3,24 +3,166 @@ from __future__ import annotations
 import datetime
 import pathlib
 import platform
+from collections import Counter
 from typing import TYPE_CHECKING
 
 import discord
-import git
 import psutil
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 from jishaku.math import natural_size
 
 from utilities.bases.cog import MafuCog
 from utilities.embed import Embed
 from utilities.functions import fmt_str, timestamp_str
+from utilities.lazy import lazy_import
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    import git
+
+    from utilities.bases.bot import Mafuyu
     from utilities.bases.context import MafuContext
+else:
+    git = lazy_import('git')
+
+TEXT_CHANNEL_TYPES = {discord.ChannelType.text, discord.ChannelType.news}
+VOICE_CHANNEL_TYPES = {discord.ChannelType.voice, discord.ChannelType.stage_voice}
+
+
+def _channel_counts(channels: Iterable[discord.abc.GuildChannel]) -> Counter[str]:
+    counts: Counter[str] = Counter()
+    for channel in channels:
+        if channel.type in TEXT_CHANNEL_TYPES:
+            counts['text'] += 1
+        elif channel.type in VOICE_CHANNEL_TYPES:
+            counts['voice'] += 1
+        counts['total'] += 1
+    return counts
+
+
+class StatisticsSnapshot:
+    """Counters shown in the about command, kept up to date from gateway events instead of recounted per call."""
+
+    def __init__(self) -> None:
+        self.commits: str = ''
+
+        # What each guild added to the totals. A guild leaving takes away exactly that, no matter what was cached since.
+        # Members are memberships, someone in two servers is counted twice. Bots are only known from cached members.
+        self._guilds: dict[int, Counter[str]] = {}
+        self._totals: Counter[str] = Counter()
+
+        super().__init__()
+
+    @property
+    def guilds(self) -> int:
+        return len(self._guilds)
+
+    @property
+    def members(self) -> int:
+        return self._totals['members']
+
+    @property
+    def bots(self) -> int:
+        return self._totals['bots']
+
+    @property
+    def channels(self) -> dict[str, int]:
+        return {kind: self._totals[kind] for kind in ('voice', 'text', 'total')}
+
+    def rebuild(self, bot: Mafuyu) -> None:
+        self._guilds.clear()
+        self._totals.clear()
+
+        for guild in bot.guilds:
+            if not guild.unavailable:
+                self.add_guild(guild)
+
+    def add_guild(self, guild: discord.Guild) -> None:
+        self.remove_guild(guild)  # A guild coming back replaces whatever it added before
+
+        counts = _channel_counts(guild.channels)
+        counts['members'] = guild.member_count or 0
+        counts['bots'] = sum(1 for member in guild.members if member.bot)
+
+        self._guilds[guild.id] = counts
+        self._totals.update(counts)
+
+    def remove_guild(self, guild: discord.Guild) -> None:
+        if (counts := self._guilds.pop(guild.id, None)) is not None:
+            self._totals.subtract(counts)
+
+    def _apply(self, guild: discord.Guild, counts: Counter[str], *, delta: int) -> None:
+        if (guild_counts := self._guilds.get(guild.id)) is None:
+            return  # Not counted yet, it is counted as a whole once it is added
+        for key, value in counts.items():
+            guild_counts[key] += delta * value
+            self._totals[key] += delta * value
+
+    def add_member(self, member: discord.Member, *, delta: int = 1) -> None:
+        self._apply(member.guild, Counter(members=1, bots=int(member.bot)), delta=delta)
+
+    def add_channel(self, channel: discord.abc.GuildChannel, *, delta: int = 1) -> None:
+        self._apply(channel.guild, _channel_counts((channel,)), delta=delta)
 
 
 class BotInformation(MafuCog):
+    stats: StatisticsSnapshot
+
+    async def cog_load(self) -> None:
+        self.stats = StatisticsSnapshot()
+        # Git history only changes with a deploy, so it is read once here instead of per invocation.
+        # GitPython reads objects lazily, so the formatting has to happen off the loop as well.
+        self.stats.commits = await self.bot.run_blocking(
+            lambda: '\n'.join([self.format_commit(c) for c in self.get_commits()]),
+        )
+
+        if self.bot.is_ready():
+            self.stats.rebuild(self.bot)  # The cog was reloaded, on_ready won't fire again
+
+        self.reconcile_stats.start()
+
+    async def cog_unload(self) -> None:
+        self.reconcile_stats.cancel()
+
+    @tasks.loop(hours=6)
+    async def reconcile_stats(self) -> None:
+        # The listeners keep everything up to date, this only catches whatever they missed, like members joining
+        # while the members intent is off
+        if self.bot.is_ready():
+            self.stats.rebuild(self.bot)
+
+    @commands.Cog.listener('on_ready')
+    async def stats_ready(self) -> None:
+        self.stats.rebuild(self.bot)
+
+    @commands.Cog.listener('on_guild_join')
+    @commands.Cog.listener('on_guild_available')
+    async def stats_guild_join(self, guild: discord.Guild) -> None:
+        self.stats.add_guild(guild)
+
+    @commands.Cog.listener('on_guild_remove')
+    @commands.Cog.listener('on_guild_unavailable')
+    async def stats_guild_remove(self, guild: discord.Guild) -> None:
+        self.stats.remove_guild(guild)
+
+    @commands.Cog.listener('on_guild_channel_create')
+    async def stats_channel_create(self, channel: discord.abc.GuildChannel) -> None:
+        self.stats.add_channel(channel)
+
+    @commands.Cog.listener('on_guild_channel_delete')
+    async def stats_channel_delete(self, channel: discord.abc.GuildChannel) -> None:
+        self.stats.add_channel(channel, delta=-1)
+
+    @commands.Cog.listener('on_member_join')
+    async def stats_member_join(self, member: discord.Member) -> None:
+        self.stats.add_member(member)
+
+    @commands.Cog.listener('on_member_remove')
+    async def stats_member_remove(self, member: discord.Member) -> None:
+        self.stats.add_member(member, delta=-1)
+
     def get_commits(self, count: int = 5) -> list[git.Commit]:
         repo = git.Repo(pathlib.Path.cwd())
         return list(repo.iter_commits(repo.active_branch, max_count=count))
@@ -46,18 +188,11 @@ class BotInformation(MafuCog):
         ctx: MafuContext,
     ) -> None:
         bot = self.bot
-
-        channels = {'voice': 0, 'text': 0, 'total': 0}
-        for channel in bot.get_all_channels():
-            if channel.type in {discord.ChannelType.text, discord.ChannelType.news}:
-                channels['text'] += 1
-            elif channel.type in {discord.ChannelType.voice, discord.ChannelType.stage_voice}:
-                channels['voice'] += 1
-            channels['total'] += 1
+        stats = self.stats
 
         embed = Embed(
             title=str(bot.user.name),
-            description='\n'.join([self.format_commit(c) for c in self.get_commits()]),
+            description=stats.commits or None,
         )
 
         embed.set_author(
@@ -74,8 +209,12 @@ class BotInformation(MafuCog):
             name='Internal Statistics',
             value=fmt_str(
                 [
-                    f'- **Servers :** `{len(bot.guilds)}`',
-                    f'- **Users :** `{len(bot.users)}` (`{len([_ for _ in bot.users if _.bot is True])} bots`)',
+                    f'- **Servers :** `{stats.guilds}`',
+                    (
+                        f'- **Channels :** `{stats.channels["total"]}` '
+                        f'(`{stats.channels["text"]} text`, `{stats.channels["voice"]} voice`)'
+                    ),
+                    f'- **Members :** `{stats.members}` (`{stats.bots} bots`)',
                     (
                         f'  - **Installed by :** {self.bot.appinfo.approximate_user_install_count} users'
                         if self.bot.appinfo.approximate_user_install_count
@@ -68,6 +68,7 @@ class ServerInfo(MafuCog):
         )
 
         if guild.premium_subscription_count:
+            await self.bot.ensure_chunked(guild)
             boosters = [
                 str(a.mention)
                 for a in sorted(
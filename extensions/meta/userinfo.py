@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import functools
 from typing import TYPE_CHECKING
 
 import discord
@@ -8,8 +9,9 @@ from discord.ext import commands
 
 from utilities.bases.cog import MafuCog
 from utilities.embed import Embed
-from utilities.functions import fmt_str, timestamp_str
-from utilities.view import PermissionView
+from utilities.functions import avatar_bytes, fmt_str, timestamp_str
+from utilities.rendering import MAX_LINES, Card
+from utilities.view import BaseView, PermissionView, ShareCardButton
 
 if TYPE_CHECKING:
     from utilities.bases.context import MafuContext
@@ -18,6 +20,26 @@ if TYPE_CHECKING:
 USER_DATA_OBJECT_COUNT = 5
 
 
+async def profile_card(user: discord.Member | discord.User, *, mutual_guilds: int | None = None) -> Card:
+    lines = [f'ID {user.id}', f'Created {user.created_at:%d %b %Y}']
+    if isinstance(user, discord.Member) and user.joined_at:
+        lines.append(f'Joined {user.guild.name} {user.joined_at:%d %b %Y}')
+
+    # Roles and mutual servers share the last line, the card has room for MAX_LINES
+    counts = [
+        f'{len(user.roles) - 1} roles' if isinstance(user, discord.Member) else None,  # Without @everyone
+        f'{mutual_guilds} mutual servers' if mutual_guilds else None,
+    ]
+    if last := fmt_str(counts, seperator=', '):
+        lines.append(last)
+
+    return Card(
+        title=f'{user.global_name or user.name} ({user})',
+        lines=tuple(lines[:MAX_LINES]),
+        avatar=await avatar_bytes(user),
+    )
+
+
 class Userinfo(MafuCog):
     @commands.hybrid_command(name='whois', description='Get information about a user', aliases=['userinfo', 'who'])
     @app_commands.allowed_contexts(guilds=True, dms=True, private_channels=True)
@@ -34,13 +56,18 @@ class Userinfo(MafuCog):
 
         name = f'{user.global_name or user.name} '
 
+        if ctx.guild:
+            await self.bot.ensure_chunked(ctx.guild)
+        # Other guilds are only chunked on demand under the lighter intents profiles, so the count would be too low
+        mutual_guilds = user.mutual_guilds if self.bot.intents_profile.chunk_guilds_at_startup else None
+
         user_info: list[str | None] = [
-            f'-# **Mutual Servers:** {len(user.mutual_guilds)}' if user.mutual_guilds else None,
+            f'-# **Mutual Servers:** {len(mutual_guilds)}' if mutual_guilds else None,
             f'- **ID:** `{user.id}`',
             f'- **Created:** {timestamp_str(user.created_at, with_time=True)}',
         ]
 
-        view = None
+        view: BaseView | None = None
 
         if isinstance(user, discord.Member):
             is_guild_ok = bool(user.guild and user.guild.roles)  # When the guild is there, the guild will have @everyone
@@ -78,6 +105,12 @@ class Userinfo(MafuCog):
         embed.set_thumbnail(url=user.display_avatar.url)
         embed.set_image(url=user.banner.url if user.banner else None)
 
-        msg = await ctx.reply(embed=embed, view=view)
-        if view:
-            view.message = msg
+        view = view or BaseView()
+        view.add_item(
+            ShareCardButton(
+                functools.partial(profile_card, user, mutual_guilds=len(mutual_guilds) if mutual_guilds else None),
+                author=ctx.author,
+            )
+        )
+
+        view.message = await ctx.reply(embed=embed, view=view)
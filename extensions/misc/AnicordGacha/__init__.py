@@ -134,33 +134,10 @@ class AniCordGacha(MafuCog):
         ctx: MafuContext,
         user: discord.User | discord.Member = commands.Author,
     ) -> None:
-        pull_records = await self.bot.pool.fetch(
-            """
-            SELECT
-                message_id,
-                card_id,
-                card_name,
-                rarity
-            FROM
-                GachaPulledCards
-            WHERE
-                user_id = $1
-            """,
-            user.id,
-        )
-        if not pull_records:
+        pulls = await PulledCard.fetch_pulls(self.bot.pool, user_id=user.id)
+        if not pulls:
             raise commands.BadArgument("You don't have any pulls syncronised with me.")
 
-        pulls = [
-            PulledCard(
-                p['card_id'],
-                p['card_name'],
-                p['rarity'],
-                p['message_id'],
-            )
-            for p in pull_records
-        ]
-
         await GachaStatisticsView.start(ctx, pulls=pulls, user=user)
 
     @commands.hybrid_command(name='nextpull', description='Tells you when you can pull again', aliases=['np'])
@@ -5,12 +5,15 @@ from dataclasses import dataclass
 from typing import TYPE_CHECKING, Self
 
 from extensions.misc.AnicordGacha.constants import PULL_LINE_REGEX, RARITY_EMOJIS
+from utilities.queries import GACHA_PULL_INSERT, GACHA_USER_UPSERT
 from utilities.timers import ReservedTimerType, Timer
 
 if TYPE_CHECKING:
-    from asyncpg import Pool, Record
+    from asyncpg import Record
     from discord import Member, Message, User
 
+    from utilities.database import MafuPool
+
 
 class GachaUser:
     def __init__(self, user: User | Member, *, timer: Timer | None, config_data: Record) -> None:
@@ -22,7 +25,7 @@ class GachaUser:
     @classmethod
     async def from_fetched_record(
         cls,
-        pool: Pool[Record],
+        pool: MafuPool,
         *,
         user: User | Member,
     ) -> Self:
@@ -32,46 +35,26 @@ class GachaUser:
             reserved_type=ReservedTimerType.ANICORD_GACHA,
         )
 
-        record = await pool.fetchrow(
-            """
-            INSERT INTO
-                GachaData (user_id)
-            VALUES
-                ($1)
-            ON CONFLICT (user_id) DO
-            UPDATE
-            SET
-                user_id = GachaData.user_id
-            RETURNING
-                *
-            """,
-            user.id,
-        )
+        record = await pool.fetchrow(GACHA_USER_UPSERT, user.id)
         assert record is not None
 
         return cls(user, timer=timer, config_data=record)
 
     async def add_card(
         self,
-        pool: Pool[Record],
+        pool: MafuPool,
         *,
         card: PulledCard,
         pull_message: Message,
     ) -> None:
-        query = """
-            INSERT INTO
-                GachaPulledCards (user_id, message_id, card_id, card_name, rarity)
-            VALUES
-                ($1, $2, $3, $4, $5);
-            """
-        args = (
+        await pool.execute(
+            GACHA_PULL_INSERT,
             self.user.id,
             pull_message.id,
             card.id,
             card.name,
             card.rarity,
         )
-        await pool.execute(query, *args)
 
 
 @dataclass
@@ -82,6 +65,24 @@ class PulledCard:
     message_id: int | None = None
     user: User | None = None
 
+    @classmethod
+    async def fetch_pulls(cls, pool: MafuPool, *, user_id: int) -> list[Self]:
+        records = await pool.fetch(
+            """
+            SELECT
+                message_id,
+                card_id,
+                card_name,
+                rarity
+            FROM
+                GachaPulledCards
+            WHERE
+                user_id = $1
+            """,
+            user_id,
+        )
+        return [cls(p['card_id'], p['card_name'], p['rarity'], p['message_id']) for p in records]
+
     @classmethod
     def parse_from_str(cls, s: str, /) -> None | Self:
         parsed = re.finditer(PULL_LINE_REGEX, s)
@@ -14,10 +14,11 @@ from extensions.misc.AnicordGacha.utils import get_burn_worths
 from utilities.bases.bot import Mafuyu
 from utilities.constants import BotEmojis
 from utilities.embed import Embed
-from utilities.functions import fmt_str, timestamp_str
+from utilities.functions import avatar_bytes, fmt_str, timestamp_str
 from utilities.pagination import Paginator
+from utilities.rendering import Card
 from utilities.timers import ReservedTimerType
-from utilities.view import BaseView
+from utilities.view import BaseView, ShareCardButton
 
 if TYPE_CHECKING:
     from utilities.bases.bot import Mafuyu
@@ -290,7 +291,6 @@ class GachaPersonalCardsSorter(menus.ListPageSource):
 
 
 class GachaStatisticsView(BaseView):
-    current: list[PulledCard]
     query: datetime.timedelta | tuple[datetime.datetime | None, datetime.datetime | None] | None
 
     sort_type: int | None
@@ -299,16 +299,17 @@ class GachaStatisticsView(BaseView):
 
     def __init__(
         self,
-        pulls: list[PulledCard],
+        ctx: MafuContext,
         user: discord.User | discord.Member,
     ) -> None:
-        self.pulls = pulls
+        self.ctx = ctx
         self.user = user
         self.query = None
         self.sort_type = None
         super().__init__()
         self.clear_items()
         self.add_item(self.view_select)
+        self.add_item(ShareCardButton(self.card, author=ctx.author))
 
     @classmethod
     async def start(
@@ -318,16 +319,26 @@ class GachaStatisticsView(BaseView):
         pulls: list[PulledCard],
         user: discord.User | discord.Member,
     ) -> None:
-        c = cls(pulls, user)
-        c.ctx = ctx
-        c.current = pulls
+        c = cls(ctx, user)
+        ctx.bot.view_state.put(c.state_key, pulls)
 
-        embed = c.embed()
+        embed = c.embed(pulls)
 
         c.message = await ctx.reply(embed=embed, view=c)
 
-    def embed(self) -> Embed:
-        burn_worths = get_burn_worths(self.current)
+    @property
+    def state_key(self) -> tuple[str, int]:
+        return ('gacha_pulls', self.user.id)
+
+    async def get_pulls(self) -> list[PulledCard]:
+        # The pulls live in the bot's view state, so idle views don't each keep a user's whole pull history around
+        return await self.ctx.bot.view_state.get_or_load(
+            self.state_key,
+            lambda: PulledCard.fetch_pulls(self.ctx.bot.pool, user_id=self.user.id),
+        )
+
+    def embed(self, pulls: list[PulledCard]) -> Embed:
+        burn_worths = get_burn_worths(pulls)
 
         embed = Embed(title=f'Pulled cards statistics for {self.user}', colour=self.user.color)
         embed.set_thumbnail(url=self.user.display_avatar.url)
@@ -336,36 +347,18 @@ class GachaStatisticsView(BaseView):
         for k, v in burn_worths.items():
             p_s.append(f'`{k}` {RARITY_EMOJIS[k]} `[{int(v / (5 * k))}]`: `{v}` blombos')
 
-        p_s.append(f'> Total `[{len(self.current)}]`: `{sum(burn_worths.values())}` blombos')
+        p_s.append(f'> Total `[{len(pulls)}]`: `{sum(burn_worths.values())}` blombos')
 
         embed.add_field(
             value=fmt_str(p_s, seperator='\n'),
         )
 
-        if (first_sync_time := self._get_first_pull(self.pulls)) and first_sync_time and first_sync_time.message_id:
-            messages: list[int] = []
-            for p in self.pulls:
-                if p.message_id and p.message_id not in messages:
-                    messages.append(p.message_id)
-
-            times_pulled = len(messages)
-
-            days = (
-                datetime.datetime.now(tz=datetime.UTC) - discord.utils.snowflake_time(first_sync_time.message_id)
-            ).total_seconds() / 86400
-
-            rate = times_pulled / days
-            if days <= 1:
-                rate = times_pulled
-
+        if pull_rate := self._pull_rate(pulls):
+            synced_since, times_pulled, rate = pull_rate
             embed.add_field(
                 value=fmt_str(
                     (
-                        '- **Syncing Since:** '
-                        + timestamp_str(
-                            discord.utils.snowflake_time(first_sync_time.message_id),
-                            with_time=True,
-                        ),
+                        '- **Syncing Since:** ' + timestamp_str(synced_since, with_time=True),
                         f'  - **Rate :** {rate:.2f} pullall(s) per day',
                         f'  - **Total :** {times_pulled} pullall(s)',
                     ),
@@ -375,6 +368,48 @@ class GachaStatisticsView(BaseView):
 
         return embed
 
+    async def card(self) -> Card:
+        pulls = await self.get_pulls()
+        burn_worths = get_burn_worths(pulls)
+
+        lines = [
+            f'{len(pulls)} cards, worth {sum(burn_worths.values())} blombos',
+            ', '.join(f'R{k}: {int(v / (5 * k))}' for k, v in burn_worths.items()),
+        ]
+        if pull_rate := self._pull_rate(pulls):
+            synced_since, times_pulled, rate = pull_rate
+            lines.extend((
+                f'{times_pulled} pullalls since {synced_since:%d %b %Y}',
+                f'{rate:.2f} pullalls per day',
+            ))
+
+        return Card(
+            title=f'Pulled cards statistics for {self.user}',
+            lines=tuple(lines),
+            avatar=await avatar_bytes(self.user),
+        )
+
+    def _pull_rate(self, pulls: list[PulledCard]) -> tuple[datetime.datetime, int, float] | None:
+        first_sync_time = self._get_first_pull(pulls)
+        if not first_sync_time or not first_sync_time.message_id:
+            return None
+
+        messages: list[int] = []
+        for p in pulls:
+            if p.message_id and p.message_id not in messages:
+                messages.append(p.message_id)
+
+        times_pulled = len(messages)
+        synced_since = discord.utils.snowflake_time(first_sync_time.message_id)
+
+        days = (datetime.datetime.now(tz=datetime.UTC) - synced_since).total_seconds() / 86400
+
+        rate = times_pulled / days
+        if days <= 1:
+            rate = times_pulled
+
+        return synced_since, times_pulled, rate
+
     def _get_first_pull(self, pulls: list[PulledCard]) -> PulledCard | None:
         return next(
             (
@@ -413,7 +448,7 @@ class GachaStatisticsView(BaseView):
         if s.values:
             match int(s.values[0]):
                 case 1:
-                    return await interaction.response.edit_message(embed=self.embed(), view=self)
+                    return await interaction.response.edit_message(embed=self.embed(await self.get_pulls()), view=self)
                 case 2:
                     await interaction.response.defer()
 
@@ -422,7 +457,7 @@ class GachaStatisticsView(BaseView):
                     v = Paginator(
                         GachaPersonalCardsSorter(
                             interaction.client,
-                            self.current,
+                            await self.get_pulls(),
                             sort_type=self.sort_type,
                             user=self.user,
                         ),
@@ -463,7 +498,7 @@ class GachaStatisticsView(BaseView):
         v = Paginator(
             GachaPersonalCardsSorter(
                 interaction.client,
-                self.current,
+                await self.get_pulls(),
                 sort_type=self.sort_type,
                 user=self.user,
             ),
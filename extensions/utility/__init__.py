@@ -1,71 +1,116 @@
 from __future__ import annotations
 
+import asyncio
 import operator
 import pathlib
-import random
 from collections import Counter
 from typing import TYPE_CHECKING
 
 import discord
 from discord.ext import commands, tasks
 
+from utilities.assets import AvatarAssets
 from utilities.bases.bot import Mafuyu
-from utilities.bases.cog import MafuCog
+from utilities.cleanup import BULK_DELETABLE_CHANNELS, delete_messages
+from utilities.constants import BotEmojis
+from utilities.features import Features
+
+from .snipe import Snipe
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+
     from utilities.bases.bot import Mafuyu
     from utilities.bases.context import MafuContext
 
+AVATAR_DIRECTORY = pathlib.Path('assets/images/Mafuyu')
+CLEANUP_PROGRESS_THRESHOLD = 25  # Smaller cleanups finish before a progress message would be worth it
 
-class Utility(MafuCog, name='Utility'):
+
+class Utility(Snipe, name='Utility'):
     """Some useful utility commands."""
 
     def __init__(self, bot: Mafuyu) -> None:
         super().__init__(bot)
 
+        self.avatars = AvatarAssets(AVATAR_DIRECTORY)
+
+    async def cog_load(self) -> None:
+        await super().cog_load()
+        await self.bot.run_blocking(self.avatars.index)
         self.avatar_rotation.start()
 
     def cog_unload(self) -> None:
+        super().cog_unload()
         self.avatar_rotation.stop()
 
     @tasks.loop(hours=12)
     async def avatar_rotation(self) -> None:
-        files = list(pathlib.Path('assets/images/Mafuyu').iterdir())
-        avatar = random.choice(files)  # noqa: S311
+        avatar = await self.bot.run_blocking(self.avatars.pick)
+        if avatar is None:
+            return
+
+        await self.bot.user.edit(avatar=avatar)
+
+    async def _collect_messages(
+        self, ctx: MafuContext, search: int, check: Callable[[discord.Message], bool]
+    ) -> list[discord.Message]:
+        return [msg async for msg in ctx.history(limit=search, before=ctx.message) if check(msg)]
+
+    async def _delete_messages(self, ctx: MafuContext, messages: list[discord.Message], *, bulk: bool) -> Counter[str]:
+        status: discord.Message | None = None
+        shown = 0
+        # Deletes run concurrently, so reports can arrive while an earlier one is still editing the message
+        lock = asyncio.Lock()
+
+        async def report(done: int, total: int) -> None:
+            nonlocal status, shown
+            async with lock:
+                if done <= shown:
+                    return  # A later count was shown already
+                shown = done
+
+                content = f'Deleting messages... {done}/{total}'
+                if status is None:
+                    status = await ctx.send(content)
+                else:
+                    await status.edit(content=content)
+
+        channel = ctx.channel if bulk and isinstance(ctx.channel, BULK_DELETABLE_CHANNELS) else None
+        try:
+            deleted = await delete_messages(
+                messages,
+                channel=channel,
+                progress=report if len(messages) > CLEANUP_PROGRESS_THRESHOLD else None,
+            )
+        finally:
+            if status:
+                await status.delete()
 
-        await self.bot.user.edit(avatar=avatar.read_bytes())
+        return Counter(m.author.display_name for m in deleted)
+
+    async def _basic_cleanup_strategy(self, ctx: MafuContext, search: int) -> Counter[str]:
+        def check(m: discord.Message) -> bool:
+            return m.author == ctx.me and not (m.mentions or m.role_mentions)
 
-    async def _basic_cleanup_strategy(self, ctx: MafuContext, search: int) -> dict[str, int]:
-        count = 0
-        async for msg in ctx.history(limit=search, before=ctx.message):
-            if msg.author == ctx.me and not (msg.mentions or msg.role_mentions):
-                await msg.delete()
-                count += 1
-        return {'Bot': count}
+        # Without Manage Messages the bot can only delete its own messages, and only one at a time
+        return await self._delete_messages(ctx, await self._collect_messages(ctx, search, check), bulk=False)
 
-    async def _complex_cleanup_strategy(self, ctx: MafuContext, search: int) -> None | Counter[str]:
+    async def _complex_cleanup_strategy(self, ctx: MafuContext, search: int) -> Counter[str]:
         prefixes = tuple(self.bot.get_prefixes(ctx.guild))  # thanks startswith
 
         def check(m: discord.Message) -> bool:
             return m.author == ctx.me or m.content.startswith(prefixes)
 
-        if isinstance(ctx.channel, discord.DMChannel | discord.PartialMessageable | discord.GroupChannel):
-            return None
+        return await self._delete_messages(ctx, await self._collect_messages(ctx, search, check), bulk=True)
 
-        deleted = await ctx.channel.purge(limit=search, check=check, before=ctx.message)
-        return Counter(m.author.display_name for m in deleted)
-
-    async def _regular_user_cleanup_strategy(self, ctx: MafuContext, search: int) -> None | Counter[str]:
+    async def _regular_user_cleanup_strategy(self, ctx: MafuContext, search: int) -> Counter[str]:
         prefixes = tuple(self.bot.get_prefixes(ctx.guild))
 
         def check(m: discord.Message) -> bool:
             return (m.author == ctx.me or m.content.startswith(prefixes)) and not (m.mentions or m.role_mentions)
 
-        if isinstance(ctx.channel, discord.DMChannel | discord.PartialMessageable | discord.GroupChannel):
-            return None
-
-        deleted = await ctx.channel.purge(limit=search, check=check, before=ctx.message)
-        return Counter(m.author.display_name for m in deleted)
+        return await self._delete_messages(ctx, await self._collect_messages(ctx, search, check), bulk=True)
 
     @commands.command()
     @commands.guild_only()
@@ -91,6 +136,50 @@ class Utility(MafuCog, name='Utility'):
 
         await ctx.send('\n'.join(messages), delete_after=10)
 
+    @commands.group(
+        name='features',
+        aliases=['feature'],
+        invoke_without_command=True,
+        description='See which features are enabled in this server',
+    )
+    @commands.guild_only()
+    async def features_cmd(self, ctx: MafuContext) -> None:
+        if not ctx.guild:
+            msg = 'Guild not found'
+            raise commands.GuildNotFound(msg)
+
+        lines: list[str] = []
+        for feature in Features:
+            switch = (
+                BotEmojis.ON_SWITCH if self.bot.features.is_enabled(feature, guild_id=ctx.guild.id) else BotEmojis.OFF_SWITCH
+            )
+            lines.append(f'{switch} `{feature.type_name}`')
+        await ctx.reply('\n'.join(lines))
+
+    @features_cmd.command(name='enable', description='Enable a feature in this server')
+    @commands.has_guild_permissions(manage_guild=True)
+    async def features_enable(self, ctx: MafuContext, feature: str) -> None:
+        await self._set_feature(ctx, feature, allowed=True)
+
+    @features_cmd.command(name='disable', description='Disable a feature in this server')
+    @commands.has_guild_permissions(manage_guild=True)
+    async def features_disable(self, ctx: MafuContext, feature: str) -> None:
+        await self._set_feature(ctx, feature, allowed=False)
+
+    async def _set_feature(self, ctx: MafuContext, name: str, *, allowed: bool) -> None:
+        if not ctx.guild:
+            msg = 'Guild not found'
+            raise commands.GuildNotFound(msg)
+
+        try:
+            feature = Features[name.upper()]
+        except KeyError:
+            msg = f'There is no feature called {name}. Available: {", ".join(f.type_name for f in Features)}'
+            raise commands.BadArgument(msg) from None
+
+        await self.bot.features.set(feature, allowed=allowed, guild_id=ctx.guild.id)
+        await ctx.message.add_reaction(BotEmojis.GREEN_TICK)
+
 
 async def setup(bot: Mafuyu) -> None:
     await bot.add_cog(Utility(bot))
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import datetime
+from typing import TYPE_CHECKING
+
+from discord.ext import commands, tasks
+
+from utilities.bases.cog import MafuCog
+from utilities.embed import Embed
+from utilities.features import Features, feature_enabled
+from utilities.snipe import SnipedMessage, SnipeStore
+
+if TYPE_CHECKING:
+    import discord
+
+    from utilities.bases.context import MafuContext
+
+
+class Snipe(MafuCog):
+    snipes: SnipeStore
+
+    async def cog_load(self) -> None:
+        self.snipes = SnipeStore()
+        self.expire_snipes.start()
+
+    def cog_unload(self) -> None:
+        self.expire_snipes.cancel()
+
+    @tasks.loop(minutes=5)
+    async def expire_snipes(self) -> None:
+        self.snipes.expire()
+
+    def _should_snipe(self, message: discord.Message) -> bool:
+        return (
+            message.guild is not None
+            and not message.author.bot
+            and self.bot.features.is_enabled(Features.SNIPE, guild_id=message.guild.id)
+        )
+
+    @commands.Cog.listener('on_message_delete')
+    async def snipe_delete(self, message: discord.Message) -> None:
+        if self._should_snipe(message):
+            self.snipes.add(message.channel.id, SnipedMessage.from_message(message))
+
+    @commands.Cog.listener('on_message_edit')
+    async def snipe_edit(self, before: discord.Message, after: discord.Message) -> None:
+        if before.content != after.content and self._should_snipe(before):
+            self.snipes.add(before.channel.id, SnipedMessage.from_message(before, edited=True))
+
+    def snipe_embed(self, sniped: SnipedMessage) -> Embed:
+        embed = Embed(description=sniped.content or None)
+        embed.timestamp = datetime.datetime.fromtimestamp(sniped.created_at, tz=datetime.UTC)
+        embed.set_author(name=f'{sniped.author_name} {"edited" if sniped.edited else "deleted"} a message')
+        if sniped.attachments:
+            embed.add_field(name='Attachments', value='\n'.join(sniped.attachments))
+        return embed
+
+    @commands.group(
+        name='snipe',
+        invoke_without_command=True,
+        description='See the latest deleted message in this channel',
+    )
+    @commands.guild_only()
+    @feature_enabled(Features.SNIPE)
+    async def snipe(self, ctx: MafuContext, index: int = 1) -> None:
+        sniped = self.snipes.get(ctx.channel.id, edited=False, index=max(index, 1) - 1)
+        if sniped is None:
+            await ctx.reply('There is nothing to snipe here.')
+            return
+
+        await ctx.reply(embed=self.snipe_embed(sniped))
+
+    @snipe.command(name='edit', aliases=['edits'], description='See the original of the latest edited message')
+    @commands.guild_only()
+    @feature_enabled(Features.SNIPE)
+    async def snipe_edits(self, ctx: MafuContext, index: int = 1) -> None:
+        sniped = self.snipes.get(ctx.channel.id, edited=True, index=max(index, 1) - 1)
+        if sniped is None:
+            await ctx.reply('There is nothing to snipe here.')
+            return
+
+        await ctx.reply(embed=self.snipe_embed(sniped))
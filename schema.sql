@@ -27,6 +27,28 @@ CREATE TABLE IF NOT EXISTS Waifus (
     nsfw BOOLEAN NOT NUll
 );
 
+-- Metadata of the post, snapshotted when it gets favourited and kept fresh by the favourites refresher
+ALTER TABLE Waifus
+    ADD COLUMN IF NOT EXISTS file_url TEXT,
+    ADD COLUMN IF NOT EXISTS characters TEXT,
+    ADD COLUMN IF NOT EXISTS copyright TEXT,
+    ADD COLUMN IF NOT EXISTS rating TEXT,
+    ADD COLUMN IF NOT EXISTS synced_at TIMESTAMP;
+
+-- Wilson score lower bound at 95% confidence, the same as utilities.leaderboard.wilson_lower_bound
+CREATE OR REPLACE FUNCTION wilson_lower_bound(positive INTEGER, total INTEGER) RETURNS DOUBLE PRECISION
+    LANGUAGE SQL IMMUTABLE PARALLEL SAFE AS $$
+        SELECT CASE WHEN total = 0 THEN 0 ELSE (
+            positive::DOUBLE PRECISION / total + 1.9208 / total
+            - 1.96 * SQRT(positive::DOUBLE PRECISION * (total - positive) / total + 0.9604) / total
+        ) / (1 + 3.8416 / total) END
+    $$;
+
+-- Leaderboards read the first rows of these, never the whole table
+CREATE INDEX IF NOT EXISTS waifus_smashes_idx ON Waifus (nsfw, smashes DESC, id);
+CREATE INDEX IF NOT EXISTS waifus_passes_idx ON Waifus (nsfw, passes DESC, id);
+CREATE INDEX IF NOT EXISTS waifus_ratio_idx ON Waifus (nsfw, wilson_lower_bound(smashes, smashes + passes) DESC, id);
+
 CREATE TABLE IF NOT EXISTS WaifuFavourites (
     id BIGINT references Waifus (id),
     user_id BIGINT NOT NULL,
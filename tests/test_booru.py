@@ -0,0 +1,163 @@
+"""
+Tests for the booru client, against a local stub of danbooru.
+
+    python -m pytest tests
+"""
+
+from __future__ import annotations
+
+import time
+from collections import deque
+from typing import TYPE_CHECKING
+
+import pytest
+from aiohttp import web
+
+from utilities.booru import BREAKER_THRESHOLD, BooruClient, TokenBucket
+from utilities.errors import BooruUnavailableError
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+    from aiohttp.test_utils import TestClient
+
+POST = {'id': 1, 'file_url': 'https://example.com/1.png'}
+ETAG = '"post-1"'
+
+
+class StubBooru:
+    """Answers with the failures it is told to, in order, and with the post once they ran out."""
+
+    def __init__(self) -> None:
+        self.failures: deque[tuple[int, dict[str, str]]] = deque()
+        self.hits = 0
+        self.conditional = 0
+
+        super().__init__()
+
+    def fail(self, status: int, times: int = 1, *, retry_after: str | None = None) -> None:
+        headers = {'Retry-After': retry_after} if retry_after is not None else {}
+        self.failures.extend((status, headers) for _ in range(times))
+
+    async def post(self, request: web.Request) -> web.Response:
+        self.hits += 1
+        if self.failures:
+            status, headers = self.failures.popleft()
+            return web.Response(status=status, headers=headers)
+
+        if request.headers.get('If-None-Match') == ETAG:
+            self.conditional += 1
+            return web.Response(status=304, headers={'ETag': ETAG})
+        return web.json_response(POST, headers={'ETag': ETAG})
+
+    async def missing(self, _: web.Request) -> web.Response:
+        self.hits += 1
+        return web.Response(status=503)
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get('/posts/1.json', self.post)
+        app.router.add_get('/posts/2.json', self.missing)
+        return app
+
+
+type StubClient = TestClient[web.Request, web.Application]
+
+
+@pytest.fixture
+def stub() -> StubBooru:
+    return StubBooru()
+
+
+@pytest.fixture
+async def server(stub: StubBooru, aiohttp_client: Callable[[web.Application], Awaitable[StubClient]]) -> StubClient:
+    return await aiohttp_client(stub.app())
+
+
+def make_client(server: StubClient, *, rate: float = 1000, burst: int = 100, retries: int = 2) -> BooruClient:
+    return BooruClient(server.session, rate=rate, burst=burst, retries=retries)
+
+
+async def test_token_bucket_bursts_then_keeps_its_rate() -> None:
+    bucket = TokenBucket(rate=20, capacity=5)
+
+    start = time.monotonic()
+    for _ in range(5):
+        await bucket.acquire()
+    assert time.monotonic() - start < 0.05
+
+    start = time.monotonic()
+    for _ in range(4):
+        await bucket.acquire()
+    assert time.monotonic() - start >= 4 / 20 - 0.01
+
+
+async def test_requests_are_rate_limited(server: StubClient) -> None:
+    client = make_client(server, rate=20, burst=1)
+
+    start = time.monotonic()
+    for _ in range(5):
+        await client.get(str(server.make_url('/posts/1.json')), cache=False)
+    assert time.monotonic() - start >= 4 / 20 - 0.01
+
+
+async def test_rate_limit_is_retried_after_retry_after(stub: StubBooru, server: StubClient) -> None:
+    stub.fail(429, retry_after='0')
+
+    response = await make_client(server).get(str(server.make_url('/posts/1.json')))
+    assert response.ok
+    assert response.data == POST
+    assert stub.hits == 2
+
+
+async def test_server_errors_are_retried(stub: StubBooru, server: StubClient) -> None:
+    stub.fail(503, times=2)
+
+    response = await make_client(server).get(str(server.make_url('/posts/1.json')))
+    assert response.ok
+    assert not response.stale
+    assert stub.hits == 3
+
+
+async def test_etag_round_trip(stub: StubBooru, server: StubClient) -> None:
+    client = make_client(server)
+    first = await client.get(str(server.make_url('/posts/1.json')))
+    second = await client.get(str(server.make_url('/posts/1.json')))
+
+    assert first.etag == ETAG
+    assert stub.conditional == 1
+    assert second.data == first.data
+    assert not second.stale
+
+
+async def test_open_breaker_serves_stale_cache(stub: StubBooru, server: StubClient) -> None:
+    client = make_client(server, retries=0)
+    url = str(server.make_url('/posts/1.json'))
+    await client.get(url)
+
+    stub.fail(503, times=BREAKER_THRESHOLD)
+    for _ in range(BREAKER_THRESHOLD):
+        assert (await client.get(url)).stale
+    assert client.breaker(server.host).is_open
+
+    hits = stub.hits
+    response = await client.get(url)
+    assert response.stale
+    assert response.data == POST
+    assert stub.hits == hits  # Answered without asking the host
+
+
+async def test_unavailable_without_cache(stub: StubBooru, server: StubClient) -> None:
+    client = make_client(server, retries=0)
+    url = str(server.make_url('/posts/2.json'))
+
+    for _ in range(BREAKER_THRESHOLD):
+        with pytest.raises(BooruUnavailableError):
+            await client.get(url)
+
+    hits = stub.hits
+    with pytest.raises(BooruUnavailableError) as raised:
+        await client.get(url)
+    assert stub.hits == hits
+    assert raised.value.host == server.host
+    assert raised.value.retry_after is not None
@@ -0,0 +1,106 @@
+"""
+Tests for the in-memory leaderboards.
+
+    python -m pytest tests
+"""
+
+from __future__ import annotations
+
+import pathlib
+import re
+
+import pytest
+
+from utilities.leaderboard import WILSON_Z, TopK, wilson_lower_bound
+
+SCHEMA = pathlib.Path(__file__).parent.parent / 'schema.sql'
+
+
+def test_scores_are_kept_in_order() -> None:
+    board = TopK(3)
+    for item, score in ((1, 5), (2, 9), (3, 7)):
+        board.update(item, score)
+
+    assert board.top() == [(2, 9), (3, 7), (1, 5)]
+
+
+def test_ties_go_to_the_lowest_id() -> None:
+    board = TopK(3)
+    for item in (30, 10, 20):
+        board.update(item, 1)
+
+    assert [item for item, _ in board.top()] == [10, 20, 30]
+
+
+def test_rescoring_moves_an_item() -> None:
+    board = TopK(3)
+    for item, score in ((1, 5), (2, 9), (3, 7)):
+        board.update(item, score)
+
+    board.update(1, 10)
+    board.update(2, 1)
+
+    assert board.top() == [(1, 10), (3, 7), (2, 1)]
+    assert len(board) == 3
+
+
+def test_spare_capacity_replaces_an_item_falling_out() -> None:
+    board = TopK(2, spare=1)
+    for item, score in ((1, 9), (2, 8), (3, 7)):
+        board.update(item, score)
+
+    board.update(1, 0)  # Re-scored below the cut-off, the spare takes its place
+
+    assert board.top() == [(2, 8), (3, 7)]
+
+
+def test_lowest_is_evicted_past_capacity() -> None:
+    board = TopK(2, spare=1)
+    for item, score in ((1, 5), (2, 6), (3, 7), (4, 8)):
+        board.update(item, score)
+
+    assert len(board) == board.capacity == 3
+    board.update(1, 100)  # Evicted, so it comes back as a new item
+    board.update(5, 1)  # Below everything kept, so it is not kept
+
+    assert len(board) == 3
+    assert board.top(3) == [(1, 100), (4, 8)]
+
+
+def test_top_is_capped_at_size() -> None:
+    board = TopK(3)
+    for item in range(10):
+        board.update(item, item)
+
+    assert len(board) == 6  # The spare defaults to the size
+    assert [item for item, _ in board.top()] == [9, 8, 7]
+    assert [item for item, _ in board.top(2)] == [9, 8]
+    assert len(board.top(100)) == 3
+
+
+def test_replace_keeps_the_best_up_to_capacity() -> None:
+    board = TopK(2, spare=0)
+    board.update(99, 1000)
+
+    board.replace([(1, 1), (2, 3), (3, 2), (4, 3)])
+
+    assert board.top() == [(2, 3), (4, 3)]
+    board.update(3, 5)  # Dropped by the replace, so it comes back as a new item
+    assert board.top() == [(3, 5), (2, 3)]
+
+
+@pytest.mark.parametrize(
+    ('positive', 'total', 'expected'),
+    [(0, 0, 0.0), (0, 10, 0.0), (1, 1, 0.2065), (5, 5, 0.5655), (50, 100, 0.4038), (90, 100, 0.8256)],
+)
+def test_wilson_lower_bound(positive: int, total: int, expected: float) -> None:
+    assert wilson_lower_bound(positive, total) == pytest.approx(expected, abs=1e-4)
+
+
+def test_wilson_lower_bound_matches_the_schema() -> None:
+    # The SQL function has z, z²/2, z² and z²/4 inlined, they have to be the same z as the python one
+    function = re.search(r'FUNCTION wilson_lower_bound.*?\$\$(.*?)\$\$', SCHEMA.read_text(), re.DOTALL)
+    assert function is not None
+    constants = {float(value) for value in re.findall(r'\d+\.\d+', function.group(1))}
+
+    assert constants == {round(value, 6) for value in (WILSON_Z, WILSON_Z**2 / 2, WILSON_Z**2, WILSON_Z**2 / 4)}
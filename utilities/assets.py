@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import logging
+import random
+from dataclasses import dataclass
+from io import BytesIO
+from typing import TYPE_CHECKING
+
+from utilities.lazy import lazy_import
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from PIL import Image
+else:
+    Image = lazy_import('PIL.Image')
+
+__all__ = ('AvatarAsset', 'AvatarAssets')
+
+log = logging.getLogger(__name__)
+
+AVATAR_SIZE = 1024
+MAX_AVATAR_BYTES = 10 * 1024 * 1024  # Discord rejects larger avatar uploads
+SUPPORTED_FORMATS = frozenset({'PNG', 'JPEG', 'GIF', 'WEBP'})
+
+
+@dataclass(slots=True)
+class AvatarAsset:
+    path: Path
+    mtime: float
+    data: bytes
+
+
+class AvatarAssets:
+    """
+    Index of the images the bot rotates its avatar through.
+
+    Every image is validated, resized and encoded to PNG once, then kept until its file changes.
+    Everything here does file IO and image work, so it is meant to be run through `Mafuyu.run_blocking`.
+    """
+
+    def __init__(self, directory: Path, *, size: int = AVATAR_SIZE, max_bytes: int = MAX_AVATAR_BYTES) -> None:
+        self.directory = directory
+        self.size = size
+        self.max_bytes = max_bytes
+
+        self.assets: dict[Path, AvatarAsset] = {}
+        self._rejected: dict[Path, float] = {}  # Files which failed to encode, retried once their mtime changes
+
+        super().__init__()
+
+    def index(self) -> None:
+        """Encode every new or changed image in the directory and forget the ones which were removed."""
+        if not self.directory.is_dir():
+            log.warning('Avatar directory %s does not exist, avatar rotation has nothing to pick from', self.directory)
+            return
+
+        paths = {path for path in self.directory.iterdir() if path.is_file()}
+        for path in sorted(paths):
+            self.load(path)
+
+        for path in self.assets.keys() - paths:
+            del self.assets[path]
+        for path in self._rejected.keys() - paths:
+            del self._rejected[path]
+
+        log.info('Indexed %s avatars, %s rejected', len(self.assets), len(self._rejected))
+
+    def load(self, path: Path) -> AvatarAsset | None:
+        """
+        Get the encoded image for a file, encoding it again only if the file changed.
+
+        Parameters
+        ----------
+        path : Path
+            The image file
+
+        Returns
+        -------
+        AvatarAsset | None
+            The encoded image, or None when the file is not a usable avatar
+
+        """
+        try:
+            mtime = path.stat().st_mtime
+        except FileNotFoundError:
+            self.assets.pop(path, None)
+            return None
+
+        cached = self.assets.get(path)
+        if cached and cached.mtime == mtime:
+            return cached
+        if self._rejected.get(path) == mtime:
+            return None
+
+        try:
+            data = self.encode(path)
+        except (OSError, ValueError, Image.DecompressionBombError) as error:
+            log.warning('Skipping avatar %s: %s', path.name, error)
+            self.assets.pop(path, None)
+            self._rejected[path] = mtime
+            return None
+
+        self.assets[path] = asset = AvatarAsset(path, mtime, data)
+        return asset
+
+    def encode(self, path: Path) -> bytes:
+        with Image.open(path) as image:
+            if image.format not in SUPPORTED_FORMATS:
+                msg = f'{image.format} is not a supported avatar format'
+                raise ValueError(msg)
+
+            converted = image.convert('RGBA')
+            converted.thumbnail((self.size, self.size))
+
+            buffer = BytesIO()
+            converted.save(buffer, 'PNG', optimize=True)
+
+        data = buffer.getvalue()
+        if len(data) > self.max_bytes:
+            msg = f'Encoded avatar is {len(data)} bytes, over the {self.max_bytes} byte limit'
+            raise ValueError(msg)
+
+        return data
+
+    def pick(self) -> bytes | None:
+        """
+        Pick a random avatar.
+
+        Returns
+        -------
+        bytes | None
+            The encoded image, or None when there is no usable avatar
+
+        """
+        while self.assets:
+            if asset := self.load(random.choice(list(self.assets))):  # noqa: S311
+                return asset.data
+
+        return None
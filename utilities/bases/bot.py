@@ -1,103 +1,314 @@
 from __future__ import annotations
 
+import asyncio
 import datetime
+import functools
+import hashlib
 import logging
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import TYPE_CHECKING, Self
 
+import asyncpg
 import discord
-import jishaku
-import mystbin
+import psutil
+import yarl
 from discord.ext import commands
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable
+    from collections.abc import Callable, Iterable, Mapping
 
-    from aiohttp import ClientSession
-    from asyncpg import Pool, Record
+    import jishaku.math
+    import mystbin
+    from asyncpg.pool import PoolConnectionProxy
 
+    from utilities.database import MafuPool
+    from utilities.http import HTTPClients
+    from utilities.intents import IntentsProfile
+    from utilities.metrics import MetricsRegistry
     from utilities.types import BlacklistData
 
-from config import DEFAULT_PREFIX, OWNER_IDS, WEBHOOK
+from config import DATABASE_CRED, DEFAULT_PREFIX, METRICS_PORT, OWNER_IDS, RENDER_WORKERS, WEBHOOK
 from utilities.bases.context import MafuContext
+from utilities.booru import BooruClient
+from utilities.cluster import HEARTBEAT_INTERVAL
 from utilities.constants import BASE_COLOUR
+from utilities.database import query_scope
+from utilities.extensions import dependency_levels, source_hash
+from utilities.features import FeatureManager
+from utilities.lazy import lazy_import
+from utilities.metrics import MetricsServer, http_trace_config
+from utilities.monitoring import LagMonitor
+from utilities.notifications import NotificationListener
+from utilities.persistent import ViewStateStore
+from utilities.rendering import CardRenderer
+from utilities.singleflight import SingleFlight
+from utilities.startup import StartupTimeline
 from utilities.timers import TimerManager
 
+if not TYPE_CHECKING:
+    # Both are only needed once the bot is running, keep them out of the launcher's and the cluster supervisor's imports
+    jishaku = lazy_import('jishaku')
+    mystbin = lazy_import('mystbin')
+
 log = logging.getLogger('Mafuyu')
 
 __all__ = ('Mafuyu',)
 
-jishaku.Flags.FORCE_PAGINATOR = True
-jishaku.Flags.HIDE = True
-jishaku.Flags.NO_DM_TRACEBACK = True
-jishaku.Flags.NO_UNDERSCORE = True
+BLOCKING_EXECUTOR_WORKERS = 8
+IDENTIFY_INTERVAL = 5.0
+IDENTIFY_POLL_INTERVAL = 0.5
+IDENTIFY_LOCK_SPACE = 0x4D414655  # First key of the advisory locks on identify buckets, the second being the bucket
 
 
-class Mafuyu(commands.AutoShardedBot):
-    pool: Pool[Record]
+class Mafuyu(commands.AutoShardedBot):  # noqa: PLR0904
+    pool: MafuPool
     user: discord.ClientUser
     timer_manager: TimerManager
-
-    def __init__(
+    notifications: NotificationListener
+    lag_monitor: LagMonitor
+    renderer: CardRenderer
+    features: FeatureManager
+    metrics_server: MetricsServer | None = None
+    _heartbeat_task: asyncio.Task[None] | None = None
+
+    def __init__(  # noqa: PLR0913
         self,
         *,
         command_prefix: commands.bot.PrefixType[Self],
-        extensions: list[str],
-        intents: discord.Intents,
+        extensions: dict[str, tuple[str, ...]],
+        intents_profile: IntentsProfile,
         allowed_mentions: discord.AllowedMentions,
-        session: ClientSession,
+        http_clients: HTTPClients,
+        metrics: MetricsRegistry,
+        shard_ids: list[int] | None = None,
+        shard_count: int | None = None,
+        cluster_name: str | None = None,
     ) -> None:
         super().__init__(
             command_prefix=command_prefix,
             case_insensitive=True,
             strip_after_prefix=True,
-            intents=intents,
+            intents=intents_profile.intents,
+            member_cache_flags=intents_profile.member_cache_flags,
+            chunk_guilds_at_startup=intents_profile.chunk_guilds_at_startup,
             allowed_mentions=allowed_mentions,
             enable_debug_events=True,
             help_command=commands.MinimalHelpCommand(),
+            http_trace=http_trace_config(metrics),
+            shard_ids=shard_ids,  # pyright: ignore[reportArgumentType] # None is accepted at runtime, meaning every shard
+            shard_count=shard_count,
         )
 
+        self.metrics = metrics
+        self.metrics.describe('command_phase_seconds', 'Time taken by each phase of a command invocation')
+        self.metrics.describe('event_loop_lag_seconds', 'How late the event loop woke up a sleeping task')
+        self.metrics.describe('extension_load_seconds', 'Time taken to load each extension')
+        self.before_invoke(self._record_checks_phase)
+        self.after_invoke(self._record_callback_phase)
+
         self.prefixes: dict[int, list[str]] = {}
         self.blacklists: dict[int, BlacklistData] = {}
+        self.view_state = ViewStateStore()
 
-        self.session = session
-        self.mystbin = mystbin.Client(session=self.session)
+        self.http_clients = http_clients
+        self.session = http_clients.default
+        self.booru = BooruClient(http_clients.booru, metrics=metrics)
+        self._paste_flights: SingleFlight[mystbin.Paste] = SingleFlight('mystbin', metrics=metrics)
         self.start_time = datetime.datetime.now()
         self.colour = self.color = BASE_COLOUR
         self.initial_extensions = extensions
+        self._extension_hashes: dict[str, str | None] = {}
+        self.intents_profile = intents_profile
+        self.cluster_name = cluster_name
+
+        self.executor = ThreadPoolExecutor(max_workers=BLOCKING_EXECUTOR_WORKERS, thread_name_prefix='mafuyu-blocking')
+
+        self.startup = StartupTimeline(metrics=metrics)
+        self.cold_start: float | None = None
+        self._max_concurrency = 1
+        self._identify_locks: dict[int, asyncio.Lock] = {}
+        self._identify_holds: set[asyncio.Task[None]] = set()
+        self._chunk_requests: dict[int, asyncio.Task[list[discord.Member]]] = {}
 
     async def setup_hook(self) -> None:
-        self.timer_manager = TimerManager(self.loop, self)
+        # Anything using the default executor (to_thread, executor_function) shares the same bounded pool
+        self.loop.set_default_executor(self.executor)
+
+        self.lag_monitor = LagMonitor(self.loop, metrics=self.metrics)
+        self.renderer = CardRenderer(workers=RENDER_WORKERS, metrics=self.metrics)
+
+        self.notifications = NotificationListener(self.loop, dsn=DATABASE_CRED, pool=self.pool, origin=self.cluster_name)
+        if self.cluster_name:
+            self._heartbeat_task = self.loop.create_task(self._send_heartbeats())
 
-        await self.refresh_vars()
+        self.timer_manager = TimerManager(self.loop, self)
+        self.notifications.subscribe('timers', self.timer_manager.on_timers_changed)
+
+        self.features = FeatureManager(self)
+        self.notifications.subscribe('features', self.features.on_features_changed)
+
+        if METRICS_PORT:
+            self.metrics_server = MetricsServer(self.metrics, port=int(METRICS_PORT))
+            await self.metrics_server.start()
+
+        self.startup.mark('setup_hook')
+        # None of these depend on each other, so the REST round trips overlap with importing the extensions
+        await asyncio.gather(
+            self.startup.stage('rest_warmup', self.refresh_vars()),
+            self.startup.stage('prefixes', self.refresh_prefixes()),
+            self.startup.stage('features', self.features.load()),
+            self.startup.stage('extensions', self._load_startup_extensions()),
+        )
+        self.startup.mark('setup_hook_done')
 
+    async def _load_startup_extensions(self) -> None:
         await self.load_extensions(self.initial_extensions)
+
+        jishaku.Flags.FORCE_PAGINATOR = True
+        jishaku.Flags.HIDE = True
+        jishaku.Flags.NO_DM_TRACEBACK = True
+        jishaku.Flags.NO_UNDERSCORE = True
         await self.load_extension('jishaku')
 
+    async def launch_shards(self) -> None:
+        if self.is_closed():
+            return
+
+        shard_count, gateway_url, session_limit = await self.http.get_bot_gateway()
+        self.shard_count = self.shard_count or shard_count  # Set beforehand when running as part of a cluster
+        self._max_concurrency = session_limit['max_concurrency']
+
+        self._connection.shard_count = self.shard_count
+        shard_ids = self.shard_ids or list(range(self.shard_count))
+        self._connection.shard_ids = shard_ids
+
+        self.startup.mark('shards_launching')
+        gateway = yarl.URL(gateway_url)
+
+        # Consecutive shard ids fall in different identify rate limit buckets, so each group can connect at once
+        for start in range(0, len(shard_ids), self._max_concurrency):
+            group = shard_ids[start : start + self._max_concurrency]
+            await asyncio.gather(
+                *(self.launch_shard(gateway, shard_id, initial=shard_id == shard_ids[0]) for shard_id in group)
+            )
+
+    async def before_identify_hook(self, shard_id: int | None, *, initial: bool = False) -> None:  # noqa: ARG002
+        # Discord allows one IDENTIFY per rate limit bucket every 5 seconds, with max_concurrency buckets.
+        # The buckets are shared by every worker of a cluster, so each one is an advisory lock, held for the 5 seconds
+        # after this shard identifies. The local lock keeps shards of this process from each taking a connection to wait.
+        bucket = (shard_id or 0) % self._max_concurrency
+        lock = self._identify_locks.setdefault(bucket, asyncio.Lock())
+        await lock.acquire()
+        try:
+            con = await self.pool.acquire()
+            try:
+                # Polled, as the statement timeout would cancel a pg_advisory_lock waiting on other workers
+                while True:
+                    if await con.fetchval('SELECT pg_try_advisory_lock($1, $2)', IDENTIFY_LOCK_SPACE, bucket):
+                        break
+                    await asyncio.sleep(IDENTIFY_POLL_INTERVAL)
+            except BaseException:
+                await self.pool.release(con)
+                raise
+        except BaseException:
+            lock.release()
+            raise
+
+        task = asyncio.create_task(self._hold_identify_bucket(con, lock, bucket))
+        self._identify_holds.add(task)
+        task.add_done_callback(self._identify_holds.discard)
+
+    async def _hold_identify_bucket(self, con: PoolConnectionProxy[asyncpg.Record], lock: asyncio.Lock, bucket: int) -> None:
+        try:
+            await asyncio.sleep(IDENTIFY_INTERVAL)
+            await con.execute('SELECT pg_advisory_unlock($1, $2)', IDENTIFY_LOCK_SPACE, bucket)
+        finally:
+            # Releasing the connection unlocks everything it still holds anyway
+            await self.pool.release(con)
+            lock.release()
+
+    async def on_shard_ready(self, shard_id: int) -> None:
+        self.startup.shard_ready(shard_id)
+
+    async def on_ready(self) -> None:
+        if self.cold_start is not None:
+            return  # Only the first READY is a cold start
+
+        self.startup.mark('ready')
+        self.cold_start = self.startup.marks['ready']
+        memory = psutil.Process().memory_info().rss
+
+        log.info(
+            'Ready in %.2fs using the %s intents profile. Resident memory: %s',
+            self.cold_start,
+            self.intents_profile.name,
+            jishaku.math.natural_size(memory),
+        )
+
     async def get_context(
         self, origin: discord.Message | discord.Interaction, *, cls: type[MafuContext] = MafuContext
     ) -> MafuContext:
-        return await super().get_context(origin, cls=cls)
+        start = time.perf_counter()
+        ctx = await super().get_context(origin, cls=cls)
+        ctx.started_at = start
+        ctx.phase_started = ctx.record_phase('parse', start)
+        return ctx
+
+    async def invoke(self, ctx: MafuContext, /) -> None:
+        ctx.phase_started = time.perf_counter()
+        if ctx.command:
+            query_scope.set(ctx.command.qualified_name)
+            self.startup.mark('first_command')
+        await super().invoke(ctx)
+
+    async def _record_checks_phase(self, ctx: MafuContext) -> None:
+        # Runs once checks and argument conversion have passed
+        ctx.phase_started = ctx.record_phase('checks', ctx.phase_started)
+
+    async def _record_callback_phase(self, ctx: MafuContext) -> None:
+        ctx.record_phase('callback', ctx.phase_started)
 
     async def is_owner(self, user: discord.abc.User) -> bool:
         return bool(user.id in OWNER_IDS)
 
-    async def load_extensions(self, extensions: Iterable[str]) -> None:
+    async def load_extensions(self, extensions: Mapping[str, tuple[str, ...]]) -> None:
         """
         Load all extensions for the bot.
 
+        Extensions are loaded after the ones they depend on. Those which don't depend on each other load concurrently.
+
         Parameters
         ----------
-        extensions : Iterable[str]
-            The list of extensions to be loaded
+        extensions : Mapping[str, tuple[str, ...]]
+            The extensions to be loaded, with the extensions each one depends on
 
         """
-        for extension in extensions:
-            try:
-                await self.load_extension(extension)
-            except commands.ExtensionFailed as exc:
-                log.exception('An exception occured while loading extension: %s', extension, exc_info=exc)
-            else:
-                log.info('Loaded %s', extension)
+        failed: set[str] = set()
+        for level in dependency_levels(extensions):
+            await asyncio.gather(*(self._load_extension_timed(name, extensions[name], failed) for name in level))
+
+    async def _load_extension_timed(self, extension: str, dependencies: tuple[str, ...], failed: set[str]) -> None:
+        if broken := failed.intersection(dependencies):
+            log.error('Skipped loading %s as it depends on %s, which failed to load', extension, ', '.join(broken))
+            failed.add(extension)
+            return
+
+        digest = await self.run_blocking(source_hash, extension)
+
+        start = time.perf_counter()
+        try:
+            await self.load_extension(extension)
+        except commands.ExtensionFailed as exc:
+            failed.add(extension)
+            log.exception('An exception occured while loading extension: %s', extension, exc_info=exc)
+            return
+
+        duration = time.perf_counter() - start
+        self._extension_hashes[extension] = digest
+        self.metrics.set_gauge('extension_load_seconds', duration, extension=extension)
+        log.info('Loaded %s in %.0fms', extension, duration * 1000)
 
     async def unload_extensions(self, extensions: Iterable[str]) -> None:
         """
@@ -112,18 +323,36 @@ class Mafuyu(commands.AutoShardedBot):
         for extension in extensions:
             await self.unload_extension(extension)
 
-    async def reload_extensions(self, extensions: Iterable[str]) -> None:
+    async def reload_extensions(self, extensions: Iterable[str], *, force: bool = False) -> list[str]:
         """
-        Reload all extensions for the bot.
+        Reload the extensions whose source changed since they were loaded.
 
         Parameters
         ----------
         extensions : Iterable[str]
-            The list of extensions to be reloaded
+            The extensions to be reloaded
+        force : bool, optional
+            Whether to reload every extension, changed or not, by default False
+
+        Returns
+        -------
+        list[str]
+            The extensions which were reloaded
 
         """
+        reloaded: list[str] = []
+
         for extension in extensions:
+            digest = await self.run_blocking(source_hash, extension)
+            if not force and digest is not None and digest == self._extension_hashes.get(extension):
+                continue
+
+            # Unloading also drops the extension's submodules from sys.modules, so they are imported fresh
             await self.reload_extension(extension)
+            self._extension_hashes[extension] = digest
+            reloaded.append(extension)
+
+        return reloaded
 
     def get_prefixes(self, guild: discord.Guild | None) -> list[str]:
         """
@@ -163,10 +392,64 @@ class Mafuyu(commands.AutoShardedBot):
         """
         return self.blacklists.get(snowflake if isinstance(snowflake, int) else snowflake.id, None)
 
+    async def run_blocking[**P, T](self, func: Callable[P, T], /, *args: P.args, **kwargs: P.kwargs) -> T:
+        """
+        Run a blocking function in the bot's thread pool without blocking the event loop.
+
+        Parameters
+        ----------
+        func : Callable[P, T]
+            The blocking function
+        *args : P.args
+            Positional arguments passed to the function
+        **kwargs : P.kwargs
+            Keyword arguments passed to the function
+
+        Returns
+        -------
+        T
+            Whatever the function returned
+
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    async def ensure_chunked(self, guild: discord.Guild) -> bool:
+        """
+        Make sure the member list of a guild is cached, requesting it from the gateway if it isn't.
+
+        Concurrent calls for the same guild share one chunk request.
+
+        Parameters
+        ----------
+        guild : discord.Guild
+            The guild whose members are needed
+
+        Returns
+        -------
+        bool
+            If the guild's members are now cached. This is False when the members intent is disabled.
+
+        """
+        if guild.chunked:
+            return True
+        if not self.intents.members:
+            return False
+
+        task = self._chunk_requests.get(guild.id)
+        if task is None:
+            task = self._chunk_requests[guild.id] = asyncio.create_task(guild.chunk(cache=True))
+            task.add_done_callback(lambda _: self._chunk_requests.pop(guild.id, None))
+
+        await asyncio.shield(task)
+        return True
+
     async def create_paste(self, filename: str, content: str) -> mystbin.Paste:
         """
         Create a mystbin paste.
 
+        Identical pastes requested while one is still being created share it.
+
         Parameters
         ----------
         filename : str
@@ -180,14 +463,37 @@ class Mafuyu(commands.AutoShardedBot):
             The created paste
 
         """
-        file = mystbin.File(filename=filename, content=content)
-        return await self.mystbin.create_paste(files=[file])
+        key = (filename, hashlib.blake2b(content.encode()).digest())
+        return await self._paste_flights.do(
+            key, lambda: self.mystbin.create_paste(files=[mystbin.File(filename=filename, content=content)])
+        )
+
+    async def refresh_prefixes(self) -> None:
+        """Load the custom prefixes of every guild from the database."""
+        records = await self.pool.fetch("""SELECT guild, array_agg(prefix) AS prefixes FROM Prefixes GROUP BY guild""")
+        self.prefixes = {record['guild']: record['prefixes'] for record in records}
+
+    async def _send_heartbeats(self) -> None:
+        # Lets the cluster supervisor tell a hung worker apart from a healthy one
+        while True:
+            latency = self.latency  # NaN until the first gateway heartbeat is acknowledged
+            try:
+                await self.notifications.publish(
+                    'heartbeat',
+                    shards=list(self.shard_ids or []),
+                    guilds=len(self.guilds),
+                    latency=None if math.isnan(latency) else round(latency * 1000),
+                )
+            except (OSError, asyncpg.PostgresError) as error:
+                log.warning('Could not send a heartbeat: %s', error)
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
 
     async def refresh_vars(self) -> None:
         """Set values to some bot constants."""
-        self._support_invite = await self.fetch_invite('https://discord.gg/MZNYBatnNU')
-
-        self.appinfo = await self.application_info()
+        self._support_invite, self.appinfo = await asyncio.gather(
+            self.fetch_invite('https://discord.gg/MZNYBatnNU'),
+            self.application_info(),
+        )
 
     @property
     def owner(self) -> discord.TeamMember | discord.User:
@@ -215,6 +521,19 @@ class Mafuyu(commands.AutoShardedBot):
         """
         return discord.Webhook.from_url(WEBHOOK, session=self.session)
 
+    @discord.utils.cached_property
+    def mystbin(self) -> mystbin.Client:
+        """
+        Return the mystbin client, created the first time a paste is made.
+
+        Returns
+        -------
+        mystbin.Client
+            The client, which uses the mystbin connection pool
+
+        """
+        return mystbin.Client(session=self.http_clients.mystbin)
+
     @property
     def support_invite(self) -> discord.Invite:
         """
@@ -246,7 +565,18 @@ class Mafuyu(commands.AutoShardedBot):
     async def close(self) -> None:
         if hasattr(self, 'pool'):
             await self.pool.close()
-        if hasattr(self, 'session'):
-            await self.session.close()
-        self.timer_manager.close()
+        await self.http_clients.close()
+        if hasattr(self, 'timer_manager'):
+            self.timer_manager.close()
+        if hasattr(self, 'lag_monitor'):
+            self.lag_monitor.close()
+        if hasattr(self, 'notifications'):
+            self.notifications.close()
+        if hasattr(self, 'renderer'):
+            self.renderer.close()
+        if self._heartbeat_task:
+            self._heartbeat_task.cancel()
+        if self.metrics_server:
+            await self.metrics_server.close()
+        self.executor.shutdown(wait=False, cancel_futures=True)
         await super().close()
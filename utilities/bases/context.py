@@ -1,18 +1,56 @@
 from __future__ import annotations
 
+import time
 from typing import TYPE_CHECKING, Any
 
 import discord
-import mystbin
 from discord.ext import commands
 
+from utilities.overflow import MESSAGE_LIMIT, Overflow, send_overflow
+
 if TYPE_CHECKING:
-    from asyncpg import Pool, Record
+    import mystbin
 
     from utilities.bases.bot import Mafuyu  # noqa: F401
+    from utilities.database import MafuPool
 
 
 class MafuContext(commands.Context['Mafuyu']):
+    def __init__(self, **attrs: Any) -> None:
+        super().__init__(**attrs)
+        self.started_at = time.perf_counter()
+        self.phase_started = self.started_at
+        self.responded = False
+
+    def record_phase(self, phase: str, since: float) -> float:
+        """
+        Record the time a phase of this command's invocation took.
+
+        Nothing is recorded when no command was invoked.
+
+        Parameters
+        ----------
+        phase : str
+            The name of the phase i.e. parse, checks, callback or first_response
+        since : float
+            The `time.perf_counter` value the phase started at
+
+        Returns
+        -------
+        float
+            The `time.perf_counter` value the phase ended at
+
+        """
+        now = time.perf_counter()
+        if self.command:
+            self.bot.metrics.observe(
+                'command_phase_seconds',
+                now - since,
+                command=self.command.qualified_name,
+                phase=phase,
+            )
+        return now
+
     @discord.utils.copy_doc(commands.Context['Mafuyu'].reply)
     async def reply(self, content: str | None = None, **kwargs: Any) -> discord.Message:
         try:
@@ -24,22 +62,26 @@ class MafuContext(commands.Context['Mafuyu']):
     async def send(
         self,
         content: None | str = None,
+        *,
+        overflow: Overflow = Overflow.FILE,
         **kwargs: Any,
     ) -> discord.Message:
-        if content and (c := str(content)) and len(c) > 1990:  # 2000 sounds a bit extreme to edge, safe at 1990
-            paste = await self.bot.create_paste(f'Requested by {self.author}', content=content)
-            content = (
-                'The response which was supposed to be here was too big. I have posted it to MystBin instead\n'
-                f'-# Link: {paste.url}'
-            )
+        if content and len(c := str(content)) > MESSAGE_LIMIT:
+            return await send_overflow(self, c, overflow, **kwargs)
 
-        return await super().send(
+        message = await super().send(
             content=content,
             **kwargs,
         )
 
+        if not self.responded:
+            self.responded = True
+            self.record_phase('first_response', self.started_at)
+
+        return message
+
     @property
-    def pool(self) -> Pool[Record]:
+    def pool(self) -> MafuPool:
         """
         Return the asyncpg Pool used in the bot.
 
@@ -47,7 +89,7 @@ class MafuContext(commands.Context['Mafuyu']):
 
         Returns
         -------
-        Pool[Record]
+        MafuPool
             The asynpg pool used in the bot.
 
         """
@@ -72,5 +114,4 @@ class MafuContext(commands.Context['Mafuyu']):
             The created paste
 
         """
-        file = mystbin.File(filename=filename, content=content)
-        return await self.bot.mystbin.create_paste(files=[file])
+        return await self.bot.create_paste(filename, content)
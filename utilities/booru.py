@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+import aiohttp
+import yarl
+
+from utilities.errors import BooruUnavailableError
+from utilities.singleflight import SingleFlight
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+    from utilities.metrics import MetricsRegistry
+
+__all__ = ('BooruClient', 'BooruResponse', 'CircuitBreaker', 'TokenBucket')
+
+log = logging.getLogger(__name__)
+
+# Danbooru allows anonymous clients around 10 reads a second, stay well under it per host
+DEFAULT_RATE = 5.0
+DEFAULT_BURST = 10
+
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=10, sock_connect=3)
+RETRIES = 2
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
+
+BREAKER_THRESHOLD = 5  # Failed requests in a row before a host is left alone
+BREAKER_RESET = 30.0  # Seconds before a host is tried again
+
+CACHED_RESPONSES = 512
+
+
+class TokenBucket:
+    """Lets requests through at a steady rate, with bursts of up to `capacity` after a quiet period."""
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+        super().__init__()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> None:
+        # Waiters queue on the lock, so tokens are handed out in the order they were asked for
+        async with self._lock:
+            self._refill()
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests to a host after enough of them failed in a row.
+
+    Once `reset_after` seconds passed requests are let through again. The first failure after that opens the circuit
+    right away, the first success closes it.
+    """
+
+    def __init__(self, *, threshold: int = BREAKER_THRESHOLD, reset_after: float = BREAKER_RESET) -> None:
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at: float | None = None
+
+        super().__init__()
+
+    @property
+    def retry_after(self) -> float:
+        if self.opened_at is None:
+            return 0.0
+        return max(self.opened_at + self.reset_after - time.monotonic(), 0.0)
+
+    @property
+    def is_open(self) -> bool:
+        return self.retry_after > 0
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+
+
+@dataclass(frozen=True, slots=True)
+class BooruResponse:
+    status: int
+    data: Any
+    etag: str | None = None
+    stale: bool = False  # Served from the cache because the host is failing
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+
+class BooruClient:
+    """
+    Every request to danbooru and safebooru goes through here.
+
+    Identical requests made while one is in flight wait on it rather than being sent again.
+    Each host gets a token bucket and a circuit breaker. Rate limited and failed requests are retried with backoff,
+    and JSON responses are kept, least recently used first out, so repeated requests are conditional on their ETag
+    and can still be answered while the host is failing.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        session: aiohttp.ClientSession,
+        *,
+        rate: float = DEFAULT_RATE,
+        burst: int = DEFAULT_BURST,
+        timeout: aiohttp.ClientTimeout = REQUEST_TIMEOUT,
+        retries: int = RETRIES,
+        cache_size: int = CACHED_RESPONSES,
+        metrics: MetricsRegistry | None = None,
+    ) -> None:
+        self.session = session
+        self.rate = rate
+        self.burst = burst
+        self.timeout = timeout
+        self.retries = retries
+        self.cache_size = cache_size
+
+        self._buckets: dict[str, TokenBucket] = {}
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._cache: OrderedDict[str, BooruResponse] = OrderedDict()
+        self._flights: SingleFlight[BooruResponse] = SingleFlight('booru', metrics=metrics)
+
+        super().__init__()
+
+    def bucket(self, host: str) -> TokenBucket:
+        if (bucket := self._buckets.get(host)) is None:
+            bucket = self._buckets[host] = TokenBucket(self.rate, self.burst)
+        return bucket
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        if (breaker := self._breakers.get(host)) is None:
+            breaker = self._breakers[host] = CircuitBreaker()
+        return breaker
+
+    def _remember(self, key: str, response: BooruResponse) -> None:
+        self._cache[key] = response
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _backoff(self, attempt: int, retry_after: str | None) -> float:
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), BACKOFF_MAX)
+        return min(BACKOFF_BASE * 2**attempt, BACKOFF_MAX) * random.uniform(0.5, 1.0)  # noqa: S311
+
+    async def get(self, url: str, *, params: Mapping[str, str] | None = None, cache: bool = True) -> BooruResponse:
+        """
+        Send a GET request and decode its JSON.
+
+        `BooruUnavailableError` is raised when the host kept failing or its circuit is open, and there is no cached
+        response to fall back to.
+
+        Parameters
+        ----------
+        url : str
+            The URL to request
+        params : Mapping[str, str] | None, optional
+            The query parameters, by default None
+        cache : bool, optional
+            Whether the response may be reused, by default True. Endpoints returning something different every
+            time, like a random post, should not be cached.
+
+        Returns
+        -------
+        BooruResponse
+            The response. Client errors like a 404 are returned as they are, only rate limits, server errors and
+            timeouts are retried.
+
+        """
+        request_url = yarl.URL(url).update_query(params or {})
+        key = str(request_url)
+        return await self._flights.do((key, cache), lambda: self._get(request_url, key, cache=cache))
+
+    async def _get(self, request_url: yarl.URL, key: str, *, cache: bool) -> BooruResponse:
+        host = request_url.host or ''
+        cached = self._cache.get(key) if cache else None
+        breaker = self.breaker(host)
+
+        if breaker.is_open:
+            if cached:
+                return BooruResponse(cached.status, cached.data, cached.etag, stale=True)
+            raise BooruUnavailableError(host, retry_after=breaker.retry_after)
+
+        headers = {'If-None-Match': cached.etag} if cached and cached.etag else {}
+        for attempt in range(self.retries + 1):
+            await self.bucket(host).acquire()
+            retry_after = None
+            try:
+                async with self.session.get(request_url, headers=headers, timeout=self.timeout) as resp:
+                    if resp.status == 304 and cached:
+                        breaker.record_success()
+                        self._remember(key, cached)
+                        return cached
+
+                    if resp.status == 429 or resp.status >= 500:
+                        log.debug('%s answered %s, attempt %s', host, resp.status, attempt + 1)
+                        retry_after = resp.headers.get('Retry-After')
+                    else:
+                        data = await resp.json(content_type=None)
+                        response = BooruResponse(resp.status, data, resp.headers.get('ETag'))
+                        breaker.record_success()
+                        if cache and response.ok:
+                            self._remember(key, response)
+                        return response
+            except (aiohttp.ClientError, TimeoutError, ValueError) as err:
+                log.debug('Request to %s failed, attempt %s: %s', host, attempt + 1, err)
+
+            if attempt < self.retries:
+                await asyncio.sleep(self._backoff(attempt, retry_after))
+
+        breaker.record_failure()
+        if cached:
+            return BooruResponse(cached.status, cached.data, cached.etag, stale=True)
+        raise BooruUnavailableError(host, retry_after=breaker.retry_after or None)
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
+import logging
+import time
+from typing import TYPE_CHECKING, Any
+
+import discord
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Coroutine, Sequence
+
+__all__ = ('BULK_DELETABLE_CHANNELS', 'BulkDeletableChannel', 'delete_messages')
+
+log = logging.getLogger(__name__)
+
+BULK_DELETE_LIMIT = 100
+# Discord refuses to bulk delete messages older than two weeks, the minute keeps clear of the edge
+BULK_DELETE_MAX_AGE = datetime.timedelta(days=14) - datetime.timedelta(minutes=1)
+# Single deletes share one rate limit bucket per channel, more than this only queues up inside discord.py
+DELETE_CONCURRENCY = 5
+PROGRESS_INTERVAL = 2.0
+
+BULK_DELETABLE_CHANNELS = (discord.TextChannel, discord.Thread, discord.VoiceChannel, discord.StageChannel)
+type BulkDeletableChannel = discord.TextChannel | discord.Thread | discord.VoiceChannel | discord.StageChannel
+type ProgressCallback = Callable[[int, int], Coroutine[Any, Any, None]]
+
+
+class _ProgressReporter:
+    def __init__(self, callback: ProgressCallback | None, total: int) -> None:
+        self.callback = callback
+        self.total = total
+        self.last = 0.0
+
+        super().__init__()
+
+    async def update(self, done: int) -> None:
+        # Reporting is throttled since it usually edits a message, which has a rate limit of its own
+        now = time.monotonic()
+        if self.callback is None or (done < self.total and now - self.last < PROGRESS_INTERVAL):
+            return
+
+        self.last = now
+        await self.callback(done, self.total)
+
+
+async def delete_messages(
+    messages: Sequence[discord.Message],
+    *,
+    channel: BulkDeletableChannel | None = None,
+    concurrency: int = DELETE_CONCURRENCY,
+    progress: ProgressCallback | None = None,
+) -> list[discord.Message]:
+    """
+    Delete messages, in bulk where possible and otherwise one by one with a few deletes in flight.
+
+    Parameters
+    ----------
+    messages : Sequence[discord.Message]
+        The messages to delete
+    channel : BulkDeletableChannel | None, optional
+        The channel the messages are in. Only given when bulk deleting is permitted there, by default None
+    concurrency : int, optional
+        How many single deletes may be in flight at once, by default DELETE_CONCURRENCY
+    progress : ProgressCallback | None, optional
+        Called with the number of deleted messages and the total as deletion goes, by default None
+
+    Returns
+    -------
+    list[discord.Message]
+        The messages which were deleted
+
+    """
+    deleted: list[discord.Message] = []
+    reporter = _ProgressReporter(progress, len(messages))
+    singles = list(messages)
+
+    if channel is not None:
+        cutoff = discord.utils.utcnow() - BULK_DELETE_MAX_AGE
+        recent = [message for message in messages if message.created_at > cutoff]
+        singles = [message for message in messages if message.created_at <= cutoff]
+
+        for chunk in discord.utils.as_chunks(recent, BULK_DELETE_LIMIT):
+            await channel.delete_messages(chunk)
+            deleted.extend(chunk)
+            await reporter.update(len(deleted))
+
+    pending = iter(singles)
+    denied = asyncio.Event()
+
+    async def worker() -> None:
+        # Every worker takes the next message from the same iterator, so each message is deleted once
+        for message in pending:
+            if denied.is_set():
+                return
+
+            try:
+                await message.delete()
+            except discord.NotFound:
+                continue
+            except discord.Forbidden:
+                denied.set()
+                return
+            except discord.HTTPException as error:
+                log.warning('Could not delete message %s: %s', message.id, error)
+                continue
+
+            deleted.append(message)
+            await reporter.update(len(deleted))
+
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, len(singles)))))
+    return deleted
@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import os
+import signal
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+import aiohttp
+
+from utilities.notifications import NotificationListener
+
+if TYPE_CHECKING:
+    from asyncio.subprocess import Process
+
+__all__ = ('ClusterSupervisor', 'Worker', 'parse_shard_ids', 'recommended_shard_count', 'shard_ranges')
+
+log = logging.getLogger(__name__)
+
+HEARTBEAT_INTERVAL = 30.0
+HEARTBEAT_TIMEOUT = 120.0  # A worker which has not sent a heartbeat for this long is considered hung
+HEALTH_INTERVAL = 60.0
+MAX_RESTART_DELAY = 60.0
+STABLE_AFTER = 300.0  # Seconds a worker has to stay up for its restart backoff to reset
+
+
+def shard_ranges(shard_count: int, workers: int) -> list[list[int]]:
+    """
+    Split shard ids into contiguous ranges, one per worker.
+
+    Parameters
+    ----------
+    shard_count : int
+        The total number of shards
+    workers : int
+        The number of worker processes
+
+    Returns
+    -------
+    list[list[int]]
+        The shard ids of every worker. Earlier workers get one extra shard when it doesn't divide evenly.
+
+    """
+    size, extra = divmod(shard_count, workers)
+    ranges: list[list[int]] = []
+
+    start = 0
+    for index in range(workers):
+        end = start + size + (1 if index < extra else 0)
+        ranges.append(list(range(start, end)))
+        start = end
+
+    return [shard_ids for shard_ids in ranges if shard_ids]
+
+
+def parse_shard_ids(value: str) -> list[int]:
+    """
+    Parse shard ids given as `first-last`, both inclusive.
+
+    Parameters
+    ----------
+    value : str
+        The shard range
+
+    Returns
+    -------
+    list[int]
+        The shard ids
+
+    """
+    first, _, last = value.partition('-')
+    return list(range(int(first), int(last or first) + 1))
+
+
+async def recommended_shard_count(token: str) -> int:
+    """
+    Ask Discord how many shards the bot should run with.
+
+    Parameters
+    ----------
+    token : str
+        The bot token
+
+    Returns
+    -------
+    int
+        The recommended shard count
+
+    """
+    async with (
+        aiohttp.ClientSession() as session,
+        session.get('https://discord.com/api/v10/gateway/bot', headers={'Authorization': f'Bot {token}'}) as resp,
+    ):
+        resp.raise_for_status()
+        data = await resp.json()
+        return data['shards']
+
+
+@dataclass
+class Worker:
+    name: str
+    shard_ids: list[int]
+    metrics_port: int | None = None
+
+    process: Process | None = None
+    restarts: int = 0
+    started: float = 0.0
+    last_heartbeat: float | None = None
+    health: dict[str, Any] = field(default_factory=dict[str, Any])
+
+    @property
+    def shard_range(self) -> str:
+        return f'{self.shard_ids[0]}-{self.shard_ids[-1]}'
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+
+class ClusterSupervisor:
+    """
+    Runs the bot as several worker processes, each owning a contiguous range of shards.
+
+    Crashed workers are restarted with an increasing delay. Workers send a heartbeat through postgres,
+    those which stop sending one are killed and restarted too.
+    """
+
+    def __init__(
+        self,
+        *,
+        shard_count: int,
+        workers: int,
+        worker_args: list[str],
+        dsn: str,
+        metrics_port: int | None = None,
+    ) -> None:
+        self.shard_count = shard_count
+        self.worker_args = worker_args
+        self.dsn = dsn
+
+        self.workers = [
+            Worker(
+                name=f'cluster-{index}',
+                shard_ids=shard_ids,
+                metrics_port=metrics_port + index if metrics_port is not None else None,
+            )
+            for index, shard_ids in enumerate(shard_ranges(shard_count, workers))
+        ]
+
+        self._stopping = asyncio.Event()
+
+        super().__init__()
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, self._stopping.set)
+
+        listener = NotificationListener(loop, dsn=self.dsn, origin='supervisor')
+        listener.subscribe('heartbeat', self.on_heartbeat)
+
+        supervisors = [loop.create_task(self.supervise(worker)) for worker in self.workers]
+        health = loop.create_task(self.check_health())
+
+        log.info('Running %s shards over %s workers', self.shard_count, len(self.workers))
+
+        try:
+            await self._stopping.wait()
+        finally:
+            health.cancel()
+            listener.close()
+            await asyncio.gather(*(self.stop(worker) for worker in self.workers))
+            for task in supervisors:
+                task.cancel()
+
+    async def spawn(self, worker: Worker) -> Process:
+        env = os.environ.copy()
+        if worker.metrics_port is not None:
+            env['METRICS_PORT'] = str(worker.metrics_port)
+
+        return await asyncio.create_subprocess_exec(
+            sys.executable,
+            sys.argv[0],
+            *self.worker_args,
+            '--shard-ids',
+            worker.shard_range,
+            '--shard-count',
+            str(self.shard_count),
+            '--cluster-name',
+            worker.name,
+            env=env,
+        )
+
+    async def supervise(self, worker: Worker) -> None:
+        delay = 1.0
+
+        while not self._stopping.is_set():
+            worker.process = await self.spawn(worker)
+            worker.started = time.monotonic()
+            worker.last_heartbeat = None
+            log.info('Started %s (pid %s) with shards %s', worker.name, worker.process.pid, worker.shard_range)
+
+            code = await worker.process.wait()
+            if self._stopping.is_set():
+                return
+
+            uptime = time.monotonic() - worker.started
+            delay = 1.0 if uptime >= STABLE_AFTER else min(delay * 2, MAX_RESTART_DELAY)
+            worker.restarts += 1
+
+            log.warning('%s exited with code %s after %.0fs, restarting in %.0fs', worker.name, code, uptime, delay)
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._stopping.wait(), timeout=delay)
+
+    async def stop(self, worker: Worker) -> None:
+        process = worker.process
+        if process is None or process.returncode is not None:
+            return
+
+        process.terminate()
+        try:
+            await asyncio.wait_for(process.wait(), timeout=30)
+        except TimeoutError:
+            process.kill()
+
+    async def on_heartbeat(self, payload: dict[str, Any]) -> None:
+        worker = next((worker for worker in self.workers if worker.name == payload['origin']), None)
+        if worker is None:
+            return
+
+        worker.last_heartbeat = time.monotonic()
+        worker.health = payload
+
+    async def check_health(self) -> None:
+        while True:
+            await asyncio.sleep(HEALTH_INTERVAL)
+            now = time.monotonic()
+
+            lines: list[str] = []
+            for worker in self.workers:
+                seen = worker.last_heartbeat or worker.started
+                if worker.alive and worker.process and now - seen > HEARTBEAT_TIMEOUT:
+                    log.warning('%s has not sent a heartbeat in %.0fs, killing it', worker.name, now - seen)
+                    worker.process.kill()
+
+                status = (
+                    f'{worker.name}: {"up" if worker.alive else "down"}, '
+                    f'guilds={worker.health.get("guilds", "?")}, latency={worker.health.get("latency", "?")}, '
+                    f'restarts={worker.restarts}'
+                )
+                lines.append(status)
+
+            log.info('Cluster health\n%s', '\n'.join(lines))
@@ -0,0 +1,350 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import functools
+import json
+import logging
+import re
+import time
+import weakref
+from collections import Counter, deque
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, Self
+
+import asyncpg
+
+from utilities.queries import Query, StatementRegistry
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator, Iterable
+
+    from asyncpg.pool import PoolConnectionProxy
+
+    from utilities.metrics import MetricsRegistry
+
+    _Pool = asyncpg.Pool[asyncpg.Record]
+else:
+    _Pool = asyncpg.Pool
+
+__all__ = ('MafuPool', 'QueryProfiler', 'StatementStats', 'normalise_statement', 'query_scope', 'register_codecs')
+
+log = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r'\s+')
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'(?<![$\w])\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.IGNORECASE)
+
+# Only tasks spawned for a single gateway event, view interaction or app command are checked for N+1 patterns.
+# Long running tasks, like the timer dispatcher, repeat statements by design.
+SCOPED_TASK_PREFIXES = ('discord.py: ', 'discord-ui-', 'CommandTree-invoker')
+N_PLUS_ONE_THRESHOLD = 5
+SAMPLE_SIZE = 512
+# Raw SQL is mostly the same handful of strings, the bound keeps queries with inlined values from growing it forever
+NORMALISED_CACHE_SIZE = 1024
+
+query_scope: ContextVar[str | None] = ContextVar('query_scope', default=None)
+
+
+@functools.lru_cache(maxsize=NORMALISED_CACHE_SIZE)
+def normalise_statement(query: str) -> str:
+    """
+    Normalise a query so the same statement is always keyed the same way.
+
+    Whitespace is collapsed, inline literals are replaced with `?` and literal IN lists are folded into one.
+    Bound parameters ($1, $2, ...) are left as they are.
+
+    Parameters
+    ----------
+    query : str
+        The SQL query
+
+    Returns
+    -------
+    str
+        The normalised statement
+
+    """
+    statement = _STRING_LITERAL.sub('?', query)
+    statement = _NUMBER_LITERAL.sub('?', statement)
+    statement = _IN_LIST.sub('IN (?...)', statement)
+    return _WHITESPACE.sub(' ', statement).strip().rstrip(';').rstrip()
+
+
+class StatementStats:
+    __slots__ = ('calls', 'rows', 'samples', 'total')
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.rows = 0
+        self.total = 0.0
+        self.samples: deque[float] = deque(maxlen=SAMPLE_SIZE)
+        super().__init__()
+
+    def record(self, duration: float, rows: int) -> None:
+        self.calls += 1
+        self.rows += rows
+        self.total += duration
+        self.samples.append(duration)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.calls if self.calls else 0.0
+
+    @property
+    def p99(self) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+
+
+class QueryProfiler:
+    """Aggregates statement timings and flags statements repeated within one interaction."""
+
+    def __init__(self) -> None:
+        self.statements: dict[str, StatementStats] = {}
+        self.n_plus_one: dict[tuple[str, str], int] = {}
+        self._scopes: weakref.WeakKeyDictionary[asyncio.Task[Any], Counter[str]] = weakref.WeakKeyDictionary()
+
+        super().__init__()
+
+    def record(self, statement: str, duration: float, rows: int) -> None:
+        stats = self.statements.get(statement)
+        if stats is None:
+            stats = self.statements[statement] = StatementStats()
+        stats.record(duration, rows)
+
+        task = asyncio.current_task()
+        if task is None or not task.get_name().startswith(SCOPED_TASK_PREFIXES):
+            return
+
+        counter = self._scopes.setdefault(task, Counter())
+        counter[statement] += 1
+        repeats = counter[statement]
+
+        if repeats < N_PLUS_ONE_THRESHOLD:
+            return
+
+        key = (query_scope.get() or task.get_name(), statement)
+        if key not in self.n_plus_one:
+            log.warning('Possible N+1: %r ran %s times in %s', statement, repeats, key[0])
+        self.n_plus_one[key] = max(repeats, self.n_plus_one.get(key, 0))
+
+    def reset(self) -> None:
+        self.statements.clear()
+        self.n_plus_one.clear()
+
+    def report(self, *, limit: int = 10) -> str:
+        """
+        Build a plain text report of the statements taking the most time.
+
+        Parameters
+        ----------
+        limit : int, optional
+            How many statements are listed, by default 10
+
+        Returns
+        -------
+        str
+            The report
+
+        """
+        lines: list[str] = []
+
+        ranked = sorted(self.statements.items(), key=lambda item: item[1].total, reverse=True)
+        for statement, stats in ranked[:limit]:
+            lines.extend((
+                statement if len(statement) <= 100 else statement[:97] + '...',
+                (
+                    f'  calls={stats.calls} total={stats.total * 1000:.1f}ms mean={stats.mean * 1000:.2f}ms '
+                    f'p99={stats.p99 * 1000:.2f}ms rows={stats.rows}'
+                ),
+            ))
+
+        if self.n_plus_one:
+            lines.extend(('', 'Possible N+1 patterns:'))
+            lines.extend(f'  {scope}: {statement} (x{repeats})' for (scope, statement), repeats in self.n_plus_one.items())
+
+        return '\n'.join(lines) or 'No statements recorded yet.'
+
+
+async def register_codecs(con: asyncpg.Connection[asyncpg.Record]) -> None:
+    for type_name in ('json', 'jsonb'):
+        await con.set_type_codec(type_name, schema='pg_catalog', encoder=json.dumps, decoder=json.loads, format='text')
+
+
+class _QueryTimer:
+    __slots__ = ('rows',)
+
+    def __init__(self) -> None:
+        self.rows = 0
+        super().__init__()
+
+
+class MafuPool(_Pool):
+    """
+    An asyncpg pool which records how long acquiring a connection and every statement takes.
+
+    Only the query helpers on the pool itself are timed. Connections acquired manually are not.
+    The helpers take either raw SQL or a named Query from utilities.queries, which is prepared on every
+    connection as soon as it opens.
+    """
+
+    metrics: MetricsRegistry
+    profiler: QueryProfiler
+    statements: StatementRegistry
+
+    @classmethod
+    async def create(  # noqa: PLR0913
+        cls,
+        dsn: str,
+        *,
+        metrics: MetricsRegistry,
+        min_size: int = 2,
+        max_size: int = 10,
+        max_inactive_lifetime: float = 300.0,
+        statement_timeout: int = 10000,
+    ) -> Self:
+        """
+        Create and initialise a pool.
+
+        Parameters
+        ----------
+        dsn : str
+            The postgres connection URI
+        metrics : MetricsRegistry
+            The registry timings are recorded in
+        min_size : int, optional
+            The number of connections the pool is initialised with, by default 2
+        max_size : int, optional
+            The maximum number of connections in the pool, by default 10
+        max_inactive_lifetime : float, optional
+            Seconds an idle connection is kept open for, by default 300.0
+        statement_timeout : int, optional
+            Milliseconds a statement may run for before postgres cancels it, by default 10000
+
+        Returns
+        -------
+        MafuPool
+            The initialised pool
+
+        """
+        statements = StatementRegistry(metrics=metrics)
+
+        async def init(con: asyncpg.Connection[asyncpg.Record]) -> None:
+            # Changing codecs drops the statement cache, so they have to be registered before anything is prepared
+            await register_codecs(con)
+            await statements.prepare(con)
+
+        pool = cls(
+            dsn,
+            min_size=min_size,
+            max_size=max_size,
+            max_queries=50000,
+            max_inactive_connection_lifetime=max_inactive_lifetime,
+            setup=None,
+            init=init,
+            loop=None,
+            connection_class=asyncpg.Connection,
+            record_class=asyncpg.Record,
+            server_settings={'statement_timeout': str(statement_timeout), 'timezone': 'UTC'},
+        )
+        pool.metrics = metrics
+        pool.profiler = QueryProfiler()
+        pool.statements = statements
+        metrics.describe('db_acquire_seconds', 'Time spent waiting for a pool connection')
+        metrics.describe('db_query_seconds', 'Time spent executing a statement, per statement')
+        metrics.describe('db_pool_connections', 'Pool connections by state')
+
+        return await pool
+
+    def record_saturation(self) -> None:
+        size = self.get_size()
+        idle = self.get_idle_size()
+
+        self.metrics.set_gauge('db_pool_connections', size - idle, state='in_use')
+        self.metrics.set_gauge('db_pool_connections', idle, state='idle')
+        self.metrics.set_gauge('db_pool_connections', self.get_max_size(), state='max')
+
+    @contextlib.asynccontextmanager
+    async def _timed(
+        self, query: str | Query
+    ) -> AsyncGenerator[tuple[PoolConnectionProxy[asyncpg.Record], str, _QueryTimer]]:
+        start = time.perf_counter()
+        async with self.acquire() as con:
+            acquired = time.perf_counter()
+            self.metrics.observe('db_acquire_seconds', acquired - start)
+            self.record_saturation()
+
+            if isinstance(query, Query):
+                self.statements.check(con, query)
+                sql, statement = query.sql, query.name
+            else:
+                sql, statement = query, normalise_statement(query)
+
+            timer = _QueryTimer()
+            try:
+                yield con, sql, timer
+            finally:
+                duration = time.perf_counter() - acquired
+                self.metrics.observe('db_query_seconds', duration, statement=statement)
+                self.profiler.record(statement, duration, timer.rows)
+
+    async def execute(
+        self,
+        query: str | Query,
+        *args: object,
+        timeout: float | None = None,  # noqa: ASYNC109
+    ) -> str:
+        async with self._timed(query) as (con, sql, timer):
+            status = await con.execute(sql, *args, timeout=timeout)
+            # The status looks like `INSERT 0 1` or `UPDATE 3`, the last part being the affected row count
+            count = status.rpartition(' ')[2]
+            timer.rows = int(count) if count.isdigit() else 0
+            return status
+
+    async def executemany(
+        self,
+        command: str | Query,
+        args: Iterable[Any],
+        *,
+        timeout: float | None = None,  # noqa: ASYNC109
+    ) -> None:
+        async with self._timed(command) as (con, sql, _):
+            return await con.executemany(sql, args, timeout=timeout)
+
+    async def fetch(
+        self,
+        query: str | Query,
+        *args: object,
+        timeout: float | None = None,  # noqa: ASYNC109
+    ) -> list[asyncpg.Record]:
+        async with self._timed(query) as (con, sql, timer):
+            records = await con.fetch(sql, *args, timeout=timeout)
+            timer.rows = len(records)
+            return records
+
+    async def fetchrow(
+        self,
+        query: str | Query,
+        *args: object,
+        timeout: float | None = None,  # noqa: ASYNC109
+    ) -> asyncpg.Record | None:
+        async with self._timed(query) as (con, sql, timer):
+            record = await con.fetchrow(sql, *args, timeout=timeout)
+            timer.rows = int(record is not None)
+            return record
+
+    async def fetchval(
+        self,
+        query: str | Query,
+        *args: object,
+        column: int = 0,
+        timeout: float | None = None,  # noqa: ASYNC109
+    ) -> Any:  # noqa: ANN401
+        async with self._timed(query) as (con, sql, timer):
+            value = await con.fetchval(sql, *args, column=column, timeout=timeout)
+            timer.rows = int(value is not None)
+            return value
@@ -11,6 +11,7 @@ if TYPE_CHECKING:
 
 __all__ = (
     'AlreadyBlacklistedError',
+    'BooruUnavailableError',
     'FeatureDisabledError',
     'MafuyuError',
     'NotBlacklistedError',
@@ -82,4 +83,11 @@ class WaifuNotFoundError(commands.CommandError, MafuyuError):
             super().__init__(message=f'Could not find any results\n{json}')
 
 
+class BooruUnavailableError(commands.CommandError, MafuyuError):
+    def __init__(self, host: str, *, retry_after: float | None = None) -> None:
+        self.host = host
+        self.retry_after = retry_after
+        super().__init__(f'{host} is not responding right now, try again in a bit.')
+
+
 # TODO(Depreca1ed): All of these are not supposed to be CommandError. Change them to actual errors
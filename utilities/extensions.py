@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import hashlib
+import importlib.util
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+__all__ = ('dependency_levels', 'source_hash')
+
+
+def dependency_levels(extensions: Mapping[str, tuple[str, ...]]) -> list[list[str]]:
+    """
+    Group extensions so that every extension comes after everything it depends on.
+
+    Extensions in the same group don't depend on each other and can be loaded at the same time.
+
+    Parameters
+    ----------
+    extensions : Mapping[str, tuple[str, ...]]
+        Every extension and the extensions it depends on
+
+    Returns
+    -------
+    list[list[str]]
+        The groups, in the order they should be loaded
+
+    Raises
+    ------
+    ValueError
+        Raised when an extension depends on one which isn't given, or the dependencies form a cycle
+
+    """
+    remaining = dict(extensions)
+    for name, dependencies in remaining.items():
+        if missing := [dependency for dependency in dependencies if dependency not in remaining]:
+            msg = f'{name} depends on {", ".join(missing)}, which is not being loaded'
+            raise ValueError(msg)
+
+    levels: list[list[str]] = []
+    done: set[str] = set()
+
+    while remaining:
+        level = [name for name, dependencies in remaining.items() if done.issuperset(dependencies)]
+        if not level:
+            msg = f'Circular extension dependencies between: {", ".join(remaining)}'
+            raise ValueError(msg)
+
+        levels.append(level)
+        done.update(level)
+        for name in level:
+            del remaining[name]
+
+    return levels
+
+
+def source_hash(name: str) -> str | None:
+    """
+    Hash the source of an extension, including every file in its package.
+
+    Parameters
+    ----------
+    name : str
+        The extension's module name
+
+    Returns
+    -------
+    str | None
+        The hash, or None when the extension's source can't be found
+
+    """
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.origin is None:
+        return None
+
+    origin = Path(spec.origin)
+    # A package covers every module under its directory, so new and removed files count as changes too
+    files = sorted(origin.parent.rglob('*.py')) if spec.submodule_search_locations else [origin]
+
+    digest = hashlib.blake2b()
+    for file in files:
+        digest.update(str(file.relative_to(origin.parent)).encode())
+        digest.update(file.read_bytes())
+    return digest.hexdigest()
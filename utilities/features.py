@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import enum
+from typing import TYPE_CHECKING, Any
+
+from discord.ext import commands
+
+from utilities.errors import FeatureDisabledError
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    import asyncpg
+
+    from utilities.bases.bot import Mafuyu
+    from utilities.bases.context import MafuContext
+
+__all__ = ('FeatureManager', 'Features', 'feature_enabled')
+
+type Scope = tuple[int | None, int | None]  # (guild_id, user_id), either may be None
+
+
+class Features(enum.IntFlag):
+    """Every value of the FeatureTypes enum in the schema, as one bit each."""
+
+    SNIPE = enum.auto()
+
+    @property
+    def type_name(self) -> str:
+        return (self.name or '').lower()
+
+
+class FeatureManager:
+    """
+    Keeps every row of the Feature table in memory, so checking a feature never touches the database.
+
+    Rows are folded into two bitsets per scope: which features the scope sets, and whether each is allowed.
+    A row for a member of a guild wins over one for the user, which wins over one for the whole guild.
+    """
+
+    def __init__(self, bot: Mafuyu) -> None:
+        self.bot = bot
+        self._scopes: dict[Scope, tuple[int, int]] = {}  # Scope to (features set, features allowed)
+
+        super().__init__()
+
+    @staticmethod
+    def _fold(records: list[asyncpg.Record]) -> dict[Scope, tuple[int, int]]:
+        scopes: dict[Scope, tuple[int, int]] = {}
+        for record in records:
+            feature = Features[record['feature_type'].upper()]
+            scope = (record['guild_id'], record['user_id'])
+            mask, allowed = scopes.get(scope, (0, 0))
+            scopes[scope] = (mask | feature, allowed | feature if record['allowed'] else allowed & ~feature)
+        return scopes
+
+    async def load(self) -> None:
+        self._scopes = self._fold(await self.bot.pool.fetch("""SELECT * FROM Feature"""))
+
+    async def refresh(self, guild_id: int | None, user_id: int | None) -> None:
+        records = await self.bot.pool.fetch(
+            """SELECT * FROM Feature WHERE guild_id IS NOT DISTINCT FROM $1 AND user_id IS NOT DISTINCT FROM $2""",
+            guild_id,
+            user_id,
+        )
+        scope = (guild_id, user_id)
+        self._scopes.pop(scope, None)
+        self._scopes.update(self._fold(records))
+
+    async def on_features_changed(self, payload: dict[str, Any]) -> None:
+        await self.refresh(payload['guild_id'], payload['user_id'])
+
+    def is_enabled(self, feature: Features, *, guild_id: int | None = None, user_id: int | None = None) -> bool:
+        """
+        Check whether a feature is enabled, without any IO.
+
+        Parameters
+        ----------
+        feature : Features
+            The feature to check
+        guild_id : int | None, optional
+            The guild it is being used in, by default None
+        user_id : int | None, optional
+            The user using it, by default None
+
+        Returns
+        -------
+        bool
+            Whether the feature is enabled. Features nothing was set for are disabled.
+
+        """
+        for scope in ((guild_id, user_id), (None, user_id), (guild_id, None)):
+            if scope == (None, None) or scope not in self._scopes:
+                continue
+
+            mask, allowed = self._scopes[scope]
+            if mask & feature:
+                return bool(allowed & feature)
+
+        return False
+
+    async def set(
+        self, feature: Features, *, allowed: bool, guild_id: int | None = None, user_id: int | None = None
+    ) -> None:
+        """
+        Allow or disallow a feature for a guild, a user or a member of a guild.
+
+        Parameters
+        ----------
+        feature : Features
+            The feature to set
+        allowed : bool
+            Whether the feature is allowed
+        guild_id : int | None, optional
+            The guild to set it for, by default None
+        user_id : int | None, optional
+            The user to set it for, by default None
+
+        """
+        async with self.bot.pool.acquire() as con, con.transaction():
+            await con.execute(
+                """
+                DELETE FROM Feature
+                WHERE feature_type = $1 AND guild_id IS NOT DISTINCT FROM $2 AND user_id IS NOT DISTINCT FROM $3
+                """,
+                feature.type_name,
+                guild_id,
+                user_id,
+            )
+            await con.execute(
+                """INSERT INTO Feature (feature_type, guild_id, user_id, allowed) VALUES ($1, $2, $3, $4)""",
+                feature.type_name,
+                guild_id,
+                user_id,
+                allowed,
+            )
+
+        scope = (guild_id, user_id)
+        mask, bits = self._scopes.get(scope, (0, 0))
+        self._scopes[scope] = (mask | feature, bits | feature if allowed else bits & ~feature)
+
+        await self.bot.notifications.publish('features', guild_id=guild_id, user_id=user_id)
+
+
+def feature_enabled[T](feature: Features) -> Callable[[T], T]:
+    """
+    Only allow a command to run where a feature is enabled.
+
+    Parameters
+    ----------
+    feature : Features
+        The feature the command belongs to
+
+    Returns
+    -------
+    Callable[[T], T]
+        The check decorator
+
+    """
+
+    def predicate(ctx: MafuContext) -> bool:
+        if not ctx.bot.features.is_enabled(feature, guild_id=ctx.guild.id if ctx.guild else None, user_id=ctx.author.id):
+            raise FeatureDisabledError
+        return True
+
+    return commands.check(predicate)
@@ -15,6 +15,7 @@ if TYPE_CHECKING:
 
 
 __all__ = (
+    'avatar_bytes',
     'fmt_str',
     'format_tb',
     'get_command_signature',
@@ -46,6 +47,29 @@ def timestamp_str(dt: datetime, *, with_time: bool = False) -> str:
     return f'{discord.utils.format_dt(dt, "D" if with_time is False else "f")} ({discord.utils.format_dt(dt, "R")})'
 
 
+async def avatar_bytes(user: discord.abc.User, *, size: int = 256) -> bytes | None:
+    """
+    Download a user's avatar as a still PNG.
+
+    Parameters
+    ----------
+    user : discord.abc.User
+        The user whose avatar to download
+    size : int, optional
+        The size to download the avatar at, by default 256
+
+    Returns
+    -------
+    bytes | None
+        The avatar, or None when it could not be downloaded
+
+    """
+    try:
+        return await user.display_avatar.replace(size=size, format='png').read()
+    except discord.HTTPException:
+        return None
+
+
 def format_tb(error: Exception) -> str:
     return ''.join(traceback.format_exception(type(error), error, error.__traceback__))
 
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import aiohttp
+
+from config import BOORU_CONNECTIONS, HTTP_CONNECTIONS
+from utilities.metrics import http_trace_config
+
+if TYPE_CHECKING:
+    from types import SimpleNamespace
+
+    from utilities.metrics import MetricsRegistry
+
+__all__ = ('UPSTREAMS', 'HTTPClients', 'Upstream')
+
+DNS_CACHE_TTL = 300  # Seconds a resolved address is reused for
+
+
+@dataclass(frozen=True, slots=True)
+class Upstream:
+    """How the bot connects to one upstream, each gets a connection pool of its own."""
+
+    name: str
+    limit: int  # Connections open at once, further requests queue for one
+    keepalive: float  # Seconds an idle connection is kept for the next request
+    timeout: aiohttp.ClientTimeout  # Default for every request, unless the request sets its own
+
+
+UPSTREAMS = (
+    # danbooru and safebooru, two hosts sharing the pool
+    Upstream('booru', BOORU_CONNECTIONS, keepalive=30, timeout=aiohttp.ClientTimeout(total=15, sock_connect=3)),
+    Upstream('mystbin', 4, keepalive=15, timeout=aiohttp.ClientTimeout(total=30, sock_connect=5)),
+    # Webhooks, avatars and everything else
+    Upstream('default', HTTP_CONNECTIONS, keepalive=15, timeout=aiohttp.ClientTimeout(total=60, sock_connect=5)),
+)
+
+
+class _PoolUsage:
+    __slots__ = ('in_flight', 'queued')
+
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.queued = 0
+        super().__init__()
+
+
+class HTTPClients:
+    """
+    One client session per upstream, so a slow upstream can only ever use up its own connections.
+
+    Every session has a connector with its own connection limit, keep-alive and DNS cache. How busy each pool is,
+    is exported as gauges.
+    """
+
+    def __init__(self, *, metrics: MetricsRegistry, upstreams: tuple[Upstream, ...] = UPSTREAMS) -> None:
+        self.metrics = metrics
+        self.upstreams = {upstream.name: upstream for upstream in upstreams}
+        self.usage = {name: _PoolUsage() for name in self.upstreams}
+
+        metrics.describe('http_pool_limit', 'Connections an upstream pool may open at once')
+        metrics.describe(
+            'http_pool_in_flight', 'Requests sent through an upstream pool and not answered yet, queued ones included'
+        )
+        metrics.describe('http_pool_queued', 'Requests waiting for a connection of an upstream pool')
+        metrics.describe(
+            'http_pool_connections_total', 'Connections taken from an upstream pool, by whether they were reused'
+        )
+
+        self.sessions = {name: self._create_session(upstream) for name, upstream in self.upstreams.items()}
+
+        super().__init__()
+
+    def _create_session(self, upstream: Upstream) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=upstream.limit,
+            limit_per_host=upstream.limit,
+            keepalive_timeout=upstream.keepalive,
+            ttl_dns_cache=DNS_CACHE_TTL,
+            enable_cleanup_closed=True,
+        )
+        self.metrics.set_gauge('http_pool_limit', upstream.limit, upstream=upstream.name)
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=upstream.timeout,
+            trace_configs=[http_trace_config(self.metrics), self._pool_trace_config(upstream.name)],
+        )
+
+    def _pool_trace_config(self, name: str) -> aiohttp.TraceConfig:
+        usage = self.usage[name]
+
+        def publish() -> None:
+            self.metrics.set_gauge('http_pool_in_flight', usage.in_flight, upstream=name)
+            self.metrics.set_gauge('http_pool_queued', usage.queued, upstream=name)
+
+        async def on_request_start(*_: object) -> None:
+            usage.in_flight += 1
+            publish()
+
+        async def on_request_done(_: aiohttp.ClientSession, ctx: SimpleNamespace, __: object) -> None:
+            usage.in_flight -= 1
+            # aiohttp only ends the wait for a connection once one was given, not when the request timed out or was
+            # cancelled while waiting
+            if getattr(ctx, 'queued', False):
+                ctx.queued = False
+                usage.queued -= 1
+            publish()
+
+        async def on_queued_start(_: aiohttp.ClientSession, ctx: SimpleNamespace, __: object) -> None:
+            ctx.queued = True
+            usage.queued += 1
+            publish()
+
+        async def on_queued_end(_: aiohttp.ClientSession, ctx: SimpleNamespace, __: object) -> None:
+            ctx.queued = False
+            usage.queued -= 1
+            publish()
+
+        async def on_connection_create_end(*_: object) -> None:
+            self.metrics.inc('http_pool_connections_total', upstream=name, reused='false')
+
+        async def on_connection_reuseconn(*_: object) -> None:
+            self.metrics.inc('http_pool_connections_total', upstream=name, reused='true')
+
+        trace = aiohttp.TraceConfig()
+        trace.on_request_start.append(on_request_start)
+        trace.on_request_end.append(on_request_done)
+        trace.on_request_exception.append(on_request_done)
+        trace.on_connection_queued_start.append(on_queued_start)
+        trace.on_connection_queued_end.append(on_queued_end)
+        trace.on_connection_create_end.append(on_connection_create_end)
+        trace.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace
+
+    @property
+    def booru(self) -> aiohttp.ClientSession:
+        return self.sessions['booru']
+
+    @property
+    def mystbin(self) -> aiohttp.ClientSession:
+        return self.sessions['mystbin']
+
+    @property
+    def default(self) -> aiohttp.ClientSession:
+        return self.sessions['default']
+
+    async def close(self) -> None:
+        for session in self.sessions.values():
+            await session.close()
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import functools
+import struct
+import zlib
+
+__all__ = ('solid_png',)
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+PALETTE_HEADER = struct.pack('>I', 3) + b'PLTE'
+PALETTE_CRC = zlib.crc32(b'PLTE')
+
+
+def _chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+
+@functools.cache
+def _template(width: int, height: int) -> tuple[bytes, bytes]:
+    # A 1 bit palette image where every pixel is palette entry 0, so the palette is all that differs between colours
+    header = struct.pack('>IIBBBBB', width, height, 1, 3, 0, 0, 0)
+    rows = (b'\x00' + bytes((width + 7) // 8)) * height
+    return PNG_SIGNATURE + _chunk(b'IHDR', header), _chunk(b'IDAT', zlib.compress(rows, 9)) + _chunk(b'IEND', b'')
+
+
+def solid_png(rgb: tuple[int, int, int], size: tuple[int, int]) -> bytes:
+    """
+    Encode a PNG filled with a single colour.
+
+    Every image of a size shares the same encoded pixels, only the palette and its checksum are written per colour.
+
+    Parameters
+    ----------
+    rgb : tuple[int, int, int]
+        The colour to fill the image with
+    size : tuple[int, int]
+        The width and height of the image
+
+    Returns
+    -------
+    bytes
+        The encoded PNG
+
+    """
+    head, tail = _template(*size)
+    palette = bytes(rgb)
+    return b''.join((head, PALETTE_HEADER, palette, struct.pack('>I', zlib.crc32(palette, PALETTE_CRC)), tail))
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import discord
+
+__all__ = ('INTENT_PROFILES', 'IntentsProfile', 'get_intents_profile')
+
+
+@dataclass(frozen=True)
+class IntentsProfile:
+    name: str
+    intents: discord.Intents
+    member_cache_flags: discord.MemberCacheFlags
+    chunk_guilds_at_startup: bool
+
+
+def _full() -> IntentsProfile:
+    # Everything the gateway offers, every guild chunked on connect. This is how the bot used to run.
+    return IntentsProfile(
+        name='full',
+        intents=discord.Intents.all(),
+        member_cache_flags=discord.MemberCacheFlags.all(),
+        chunk_guilds_at_startup=True,
+    )
+
+
+def _lean() -> IntentsProfile:
+    # Members are received but only chunked per guild once a feature asks for them. Presences are never received.
+    intents = discord.Intents.default()
+    intents.members = True
+    intents.message_content = True
+    intents.presences = False
+
+    return IntentsProfile(
+        name='lean',
+        intents=intents,
+        member_cache_flags=discord.MemberCacheFlags.from_intents(intents),
+        chunk_guilds_at_startup=False,
+    )
+
+
+def _minimal() -> IntentsProfile:
+    # No privileged intents apart from message content. Member dependent features work off whatever is cached.
+    intents = discord.Intents.default()
+    intents.message_content = True
+    intents.presences = False
+
+    return IntentsProfile(
+        name='minimal',
+        intents=intents,
+        member_cache_flags=discord.MemberCacheFlags.from_intents(intents),
+        chunk_guilds_at_startup=False,
+    )
+
+
+INTENT_PROFILES = {
+    'full': _full,
+    'lean': _lean,
+    'minimal': _minimal,
+}
+
+
+def get_intents_profile(name: str) -> IntentsProfile:
+    """
+    Build the intents and member cache profile of the given name.
+
+    Parameters
+    ----------
+    name : str
+        The name of the profile. One of `full`, `lean` or `minimal`
+
+    Returns
+    -------
+    IntentsProfile
+        The profile with freshly built intents and member cache flags
+
+    Raises
+    ------
+    ValueError
+        Raised when no profile exists with the given name
+
+    """
+    try:
+        return INTENT_PROFILES[name]()
+    except KeyError:
+        msg = f'Unknown intents profile: {name}'
+        raise ValueError(msg) from None
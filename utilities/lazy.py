@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import importlib.util
+import sys
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from types import ModuleType
+
+__all__ = ('lazy_import',)
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Import a module the first time one of its attributes is accessed.
+
+    For type checkers to keep seeing the real module, import it normally under `TYPE_CHECKING`
+    and only use this in the `else` branch.
+
+    Parameters
+    ----------
+    name : str
+        The full name of the module. Parent packages of a submodule are imported right away.
+
+    Returns
+    -------
+    ModuleType
+        The module, which is only executed once it is used
+
+    Raises
+    ------
+    ModuleNotFoundError
+        Raised when the module can't be found
+
+    """
+    if module := sys.modules.get(name):
+        return module
+
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.loader is None:
+        msg = f'No module named {name!r}'
+        raise ModuleNotFoundError(msg, name=name)
+
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+
+    parent, _, child = name.rpartition('.')
+    if parent:
+        setattr(sys.modules[parent], child, module)
+
+    return module
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import bisect
+import math
+
+__all__ = ('TopK', 'wilson_lower_bound')
+
+WILSON_Z = 1.96  # 95% confidence, the same constant as the wilson_lower_bound function in the schema
+
+
+def wilson_lower_bound(positive: int, total: int) -> float:
+    """
+    Get the lower bound of the Wilson score interval, so a ratio from a handful of votes does not rank first.
+
+    Parameters
+    ----------
+    positive : int
+        The positive votes
+    total : int
+        Every vote
+
+    Returns
+    -------
+    float
+        The lower bound, between 0 and 1. 0 when there are no votes.
+
+    """
+    if not total:
+        return 0.0
+
+    p = positive / total
+    z2 = WILSON_Z * WILSON_Z
+    return (p + z2 / (2 * total) - WILSON_Z * math.sqrt((p * (1 - p) + z2 / (4 * total)) / total)) / (1 + z2 / total)
+
+
+class TopK:
+    """
+    The highest scoring items, kept in order as their scores change.
+
+    It holds more items than are ever read, so an item falling down the ranking has a replacement to fall behind.
+    Items which fall out can only come back with a new score, so the ranking is best reloaded every now and then.
+    """
+
+    def __init__(self, size: int, *, spare: int | None = None) -> None:
+        self.size = size
+        self.capacity = size + (size if spare is None else spare)
+
+        self._ranking: list[tuple[float, int]] = []  # (-score, item), so the best is first and ties go to the lowest ID
+        self._scores: dict[int, float] = {}
+
+        super().__init__()
+
+    def __len__(self) -> int:
+        return len(self._ranking)
+
+    def update(self, item: int, score: float) -> None:
+        if (previous := self._scores.pop(item, None)) is not None:
+            del self._ranking[bisect.bisect_left(self._ranking, (-previous, item))]
+
+        entry = (-score, item)
+        if len(self._ranking) >= self.capacity and entry >= self._ranking[-1]:
+            return
+
+        bisect.insort(self._ranking, entry)
+        self._scores[item] = score
+        if len(self._ranking) > self.capacity:
+            _, evicted = self._ranking.pop()
+            del self._scores[evicted]
+
+    def replace(self, items: list[tuple[int, float]]) -> None:
+        self._ranking = sorted((-score, item) for item, score in items)[: self.capacity]
+        self._scores = {item: -score for score, item in self._ranking}
+
+    def top(self, limit: int | None = None) -> list[tuple[int, float]]:
+        return [(item, -score) for score, item in self._ranking[: min(limit or self.size, self.size)]]
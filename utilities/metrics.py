@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import bisect
+import logging
+import time
+from typing import TYPE_CHECKING
+
+import aiohttp
+from aiohttp import web
+
+if TYPE_CHECKING:
+    from types import SimpleNamespace
+
+    from yarl import URL
+
+__all__ = (
+    'Histogram',
+    'MetricsRegistry',
+    'MetricsServer',
+    'http_trace_config',
+)
+
+log = logging.getLogger(__name__)
+
+# Seconds. Wide enough for a 5ms query and a 30s upstream timeout alike.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+UPSTREAM_HOSTS = {
+    'danbooru.donmai.us': 'danbooru',
+    'safebooru.donmai.us': 'safebooru',
+    'mystb.in': 'mystbin',
+    'discord.com': 'discord',
+    'discordapp.com': 'discord',
+}
+
+type Labels = tuple[tuple[str, str], ...]
+
+
+class Histogram:
+    """A cumulative histogram in the shape Prometheus expects."""
+
+    __slots__ = ('buckets', 'count', 'counts', 'sum')
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # The extra slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        super().__init__()
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile from the buckets.
+
+        The estimate is the upper bound of the bucket the quantile falls in.
+
+        Parameters
+        ----------
+        q : float
+            The quantile, between 0 and 1
+
+        Returns
+        -------
+        float
+            The estimated value. Infinity when it falls past the last bucket.
+
+        """
+        if not self.count:
+            return 0.0
+
+        rank = q * self.count
+        seen = 0
+        for bound, bucket_count in zip(self.buckets, self.counts, strict=False):
+            seen += bucket_count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+
+class MetricsRegistry:
+    """Holds every histogram, gauge and counter the bot records."""
+
+    def __init__(self) -> None:
+        self.histograms: dict[str, dict[Labels, Histogram]] = {}
+        self.gauges: dict[str, dict[Labels, float]] = {}
+        self.counters: dict[str, dict[Labels, float]] = {}
+        self.descriptions: dict[str, str] = {}
+
+        super().__init__()
+
+    def describe(self, name: str, description: str) -> None:
+        self.descriptions[name] = description
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        family = self.histograms.setdefault(name, {})
+
+        histogram = family.get(key)
+        if histogram is None:
+            histogram = family[key] = Histogram()
+
+        histogram.observe(value)
+
+    def set_gauge(self, name: str, value: float, **labels: str) -> None:
+        self.gauges.setdefault(name, {})[tuple(sorted(labels.items()))] = value
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        family = self.counters.setdefault(name, {})
+        key = tuple(sorted(labels.items()))
+        family[key] = family.get(key, 0) + value
+
+    def render(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format.
+
+        Returns
+        -------
+        str
+            The rendered metrics
+
+        """
+        lines: list[str] = []
+
+        for name, family in self.histograms.items():
+            self._render_header(lines, name, 'histogram')
+            for labels, histogram in family.items():
+                cumulative = 0
+                for bound, bucket_count in zip((*histogram.buckets, float('inf')), histogram.counts, strict=True):
+                    cumulative += bucket_count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{name}_bucket{_format_labels((*labels, ("le", le)))} {cumulative}')
+                lines.extend((
+                    f'{name}_sum{_format_labels(labels)} {histogram.sum}',
+                    f'{name}_count{_format_labels(labels)} {histogram.count}',
+                ))
+
+        for name, family in self.gauges.items():
+            self._render_header(lines, name, 'gauge')
+            lines.extend(f'{name}{_format_labels(labels)} {value}' for labels, value in family.items())
+
+        for name, family in self.counters.items():
+            self._render_header(lines, name, 'counter')
+            lines.extend(f'{name}{_format_labels(labels)} {value}' for labels, value in family.items())
+
+        return '\n'.join(lines) + '\n'
+
+    def _render_header(self, lines: list[str], name: str, metric_type: str) -> None:
+        if description := self.descriptions.get(name):
+            lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} {metric_type}')
+
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape_label(v)}"' for k, v in labels) + '}'
+
+
+def _upstream(url: URL) -> str:
+    host = url.host or ''
+    for suffix, upstream in UPSTREAM_HOSTS.items():
+        if host == suffix or host.endswith('.' + suffix):
+            return upstream
+    return 'other'
+
+
+def http_trace_config(metrics: MetricsRegistry) -> aiohttp.TraceConfig:
+    """
+    Create a trace config recording the latency of every request per upstream.
+
+    Parameters
+    ----------
+    metrics : MetricsRegistry
+        The registry the latencies are recorded in
+
+    Returns
+    -------
+    aiohttp.TraceConfig
+        The trace config to be given to a ClientSession
+
+    """
+    metrics.describe('http_request_seconds', 'Latency of outgoing HTTP requests per upstream')
+
+    async def on_request_start(_: aiohttp.ClientSession, ctx: SimpleNamespace, __: aiohttp.TraceRequestStartParams) -> None:
+        ctx.start = time.perf_counter()
+
+    async def on_request_end(_: aiohttp.ClientSession, ctx: SimpleNamespace, params: aiohttp.TraceRequestEndParams) -> None:
+        metrics.observe(
+            'http_request_seconds',
+            time.perf_counter() - ctx.start,
+            upstream=_upstream(params.url),
+            method=params.method,
+            status=str(params.response.status),
+        )
+
+    async def on_request_exception(
+        _: aiohttp.ClientSession, ctx: SimpleNamespace, params: aiohttp.TraceRequestExceptionParams
+    ) -> None:
+        metrics.observe(
+            'http_request_seconds',
+            time.perf_counter() - ctx.start,
+            upstream=_upstream(params.url),
+            method=params.method,
+            status='error',
+        )
+
+    trace = aiohttp.TraceConfig()
+    trace.on_request_start.append(on_request_start)
+    trace.on_request_end.append(on_request_end)
+    trace.on_request_exception.append(on_request_exception)
+    return trace
+
+
+class MetricsServer:
+    """Serves the registry at /metrics for a local Prometheus scraper."""
+
+    def __init__(self, metrics: MetricsRegistry, *, host: str = '127.0.0.1', port: int) -> None:
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+
+        app = web.Application()
+        app.router.add_get('/metrics', self.handle_metrics)
+        self.runner = web.AppRunner(app, access_log=None)
+
+        super().__init__()
+
+    async def handle_metrics(self, _: web.Request) -> web.Response:
+        return web.Response(text=self.metrics.render(), content_type='text/plain', charset='utf-8')
+
+    async def start(self) -> None:
+        await self.runner.setup()
+        await web.TCPSite(self.runner, self.host, self.port).start()
+        log.info('Serving metrics on http://%s:%s/metrics', self.host, self.port)
+
+    async def close(self) -> None:
+        await self.runner.cleanup()
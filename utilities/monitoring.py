@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
+import heapq
+import logging
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from asyncio import AbstractEventLoop
+
+    from utilities.metrics import MetricsRegistry
+
+__all__ = ('LagMonitor', 'LagSpan')
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(order=True)
+class LagSpan:
+    lag: float
+    when: datetime.datetime = field(compare=False)
+
+
+class LagMonitor:
+    """
+    Measure how late the event loop wakes up a sleeping task.
+
+    Any lag above the threshold means something held the loop for that long.
+    The worst spans are kept so blocking regressions show up after the fact.
+    """
+
+    def __init__(
+        self,
+        loop: AbstractEventLoop,
+        *,
+        interval: float = 0.5,
+        threshold: float = 0.1,
+        keep: int = 10,
+        metrics: MetricsRegistry | None = None,
+    ) -> None:
+        self.loop = loop
+        self.metrics = metrics
+        self.interval = interval
+        self.threshold = threshold
+        self.keep = keep
+
+        self.latest: float = 0.0
+        self._worst: list[LagSpan] = []  # Min-heap, the smallest of the worst spans gets replaced first
+
+        self.task = self.loop.create_task(self.measure())
+
+        super().__init__()
+
+    async def measure(self) -> None:
+        while True:
+            start = self.loop.time()
+            await asyncio.sleep(self.interval)
+            self.latest = lag = max(0.0, self.loop.time() - start - self.interval)
+
+            if self.metrics:
+                self.metrics.observe('event_loop_lag_seconds', lag)
+
+            if lag >= self.threshold:
+                self.record(lag)
+
+    def record(self, lag: float) -> None:
+        span = LagSpan(lag, datetime.datetime.now(tz=datetime.UTC))
+
+        if len(self._worst) < self.keep:
+            heapq.heappush(self._worst, span)
+        elif span > self._worst[0]:
+            heapq.heapreplace(self._worst, span)
+
+        log.warning('Event loop was blocked for %.3fs', lag)
+
+    @property
+    def worst(self) -> list[LagSpan]:
+        """
+        Return the worst recorded blocking spans.
+
+        Returns
+        -------
+        list[LagSpan]
+            The spans, longest first
+
+        """
+        return sorted(self._worst, reverse=True)
+
+    def close(self) -> None:
+        self.task.cancel()
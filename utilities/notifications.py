@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from typing import TYPE_CHECKING, Any
+
+import asyncpg
+
+if TYPE_CHECKING:
+    from asyncio import AbstractEventLoop
+    from collections.abc import Callable, Coroutine
+
+    from utilities.database import MafuPool
+
+__all__ = ('CHANNEL', 'NotificationListener')
+
+log = logging.getLogger(__name__)
+
+CHANNEL = 'mafuyu_sync'
+RECONNECT_DELAY = 5.0
+
+type Handler = Callable[[dict[str, Any]], Coroutine[Any, Any, None]]
+
+
+class NotificationListener:
+    """
+    Keeps per-process caches in sync through postgres LISTEN/NOTIFY.
+
+    Every process running the bot listens on one channel. Publishing sends an event to every other process,
+    the sender is expected to have updated its own state already.
+    """
+
+    def __init__(
+        self,
+        loop: AbstractEventLoop,
+        *,
+        dsn: str,
+        pool: MafuPool | None = None,
+        origin: str | None = None,
+    ) -> None:
+        self.loop = loop
+        self.dsn = dsn
+        self.pool = pool
+        self.origin = origin or str(os.getpid())
+
+        self.handlers: dict[str, list[Handler]] = {}
+        self._pending: set[asyncio.Task[None]] = set()
+
+        self.task = self.loop.create_task(self.listen())
+
+        super().__init__()
+
+    async def listen(self) -> None:
+        while True:
+            try:
+                con: asyncpg.Connection[asyncpg.Record] = await asyncpg.connect(self.dsn)
+            except (OSError, asyncpg.PostgresError) as error:
+                log.warning('Could not connect to listen for notifications, retrying: %s', error)
+                await asyncio.sleep(RECONNECT_DELAY)
+                continue
+
+            lost = asyncio.Event()
+            con.add_termination_listener(lambda _, lost=lost: lost.set())
+            try:
+                await con.add_listener(CHANNEL, self._on_notification)
+                await lost.wait()
+                log.warning('Notification connection was lost, reconnecting')
+            finally:
+                await con.close()
+
+    def _on_notification(self, _: object, __: int, ___: str, payload: object, /) -> None:
+        message = json.loads(str(payload))
+        if message.get('origin') == self.origin:
+            return
+
+        for handler in self.handlers.get(message['event'], []):
+            task = self.loop.create_task(handler(message))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+    def subscribe(self, event: str, handler: Handler) -> None:
+        self.handlers.setdefault(event, []).append(handler)
+
+    def unsubscribe(self, event: str, handler: Handler) -> None:
+        handlers = self.handlers.get(event, [])
+        if handler in handlers:
+            handlers.remove(handler)
+
+    async def publish(self, event: str, **payload: Any) -> None:
+        """
+        Send an event to every other process.
+
+        Parameters
+        ----------
+        event : str
+            The name of the event
+        **payload : Any
+            JSON serialisable data sent along with the event
+
+        Raises
+        ------
+        RuntimeError
+            Raised when the listener was created without a pool to publish through
+
+        """
+        if self.pool is None:
+            msg = 'This listener was created without a pool and can only receive events.'
+            raise RuntimeError(msg)
+
+        message = json.dumps({'event': event, 'origin': self.origin, **payload})
+        await self.pool.execute('SELECT pg_notify($1, $2)', CHANNEL, message)
+
+    def close(self) -> None:
+        self.task.cancel()
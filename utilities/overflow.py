@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import asyncio
+import enum
+import io
+import logging
+from typing import TYPE_CHECKING, Any
+
+import discord
+from discord.ext import menus
+
+from utilities.pagination import Paginator
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from utilities.bases.context import MafuContext
+
+__all__ = ('MESSAGE_LIMIT', 'Overflow', 'TextPageSource', 'content_file', 'send_overflow', 'split_bounds', 'split_content')
+
+log = logging.getLogger(__name__)
+
+MESSAGE_LIMIT = 1990  # 2000 sounds a bit extreme to edge, safe at 1990
+PAGE_LIMIT = 1900  # Leaves room for a page number or a note below the text
+
+# Sent with every chunk, anything else like the view or the embeds only goes on the last one
+CHUNK_KWARGS = frozenset({'ephemeral', 'allowed_mentions', 'silent', 'suppress_embeds', 'delete_after'})
+
+_uploads: set[asyncio.Task[None]] = set()
+
+
+class Overflow(enum.Enum):
+    """What to do with content too long for a single message."""
+
+    FILE = 'file'
+    CHUNKS = 'chunks'
+    PAGINATE = 'paginate'
+    PASTE = 'paste'
+
+
+def split_bounds(content: str, limit: int = MESSAGE_LIMIT) -> Iterator[tuple[int, int]]:
+    """
+    Find where to split content into pieces no longer than the limit, preferring line breaks and then spaces.
+
+    Parameters
+    ----------
+    content : str
+        The content to split
+    limit : int, optional
+        The longest a piece may be, by default MESSAGE_LIMIT
+
+    Yields
+    ------
+    tuple[int, int]
+        The start and end of every piece, so pieces are only sliced out once they are needed
+
+    """
+    start = 0
+    while len(content) - start > limit:
+        end = content.rfind('\n', start, start + limit)
+        if end <= start:
+            end = content.rfind(' ', start, start + limit)
+        if end <= start:
+            end = start + limit
+
+        yield start, end
+        start = end + 1 if content[end] in '\n ' else end
+
+    yield start, len(content)
+
+
+def split_content(content: str, limit: int = MESSAGE_LIMIT) -> list[str]:
+    return [content[start:end] for start, end in split_bounds(content, limit)]
+
+
+def content_file(content: str, filename: str = 'response.txt') -> discord.File:
+    # BytesIO shares the encoded bytes until something writes to it, so the content is only copied by encoding
+    return discord.File(io.BytesIO(content.encode()), filename=filename)
+
+
+class TextPageSource(menus.ListPageSource):
+    """Pages of one long text, where only the page being shown is ever sliced out."""
+
+    def __init__(self, content: str, *, limit: int = PAGE_LIMIT) -> None:
+        self.content = content
+        super().__init__(list(enumerate(split_bounds(content, limit))), per_page=1)
+
+    async def format_page(self, _: Paginator, entry: tuple[int, tuple[int, int]]) -> str:
+        # The page number comes with the entry, as pages are also rendered ahead of being shown
+        page, (start, end) = entry
+        return f'{self.content[start:end]}\n-# Page {page + 1}/{self.get_max_pages()}'
+
+
+async def send_overflow(ctx: MafuContext, content: str, overflow: Overflow, **kwargs: Any) -> discord.Message:
+    """
+    Send content too long for a single message.
+
+    Parameters
+    ----------
+    ctx : MafuContext
+        The context to send to
+    content : str
+        The content
+    overflow : Overflow
+        How to send it
+    **kwargs : Any
+        Passed on to the message which carries the view, embeds and files. Not used when paginating.
+        When sending chunks, the first chunk gets the reference and every chunk is sent ephemeral,
+        silent and with the allowed mentions when those are given.
+
+    Returns
+    -------
+    discord.Message
+        The message which was sent last, or the paginator's message
+
+    """
+    if overflow is Overflow.PAGINATE:
+        paginator = Paginator(TextPageSource(content), ctx=ctx)
+        await paginator.start(ephemeral=kwargs.get('ephemeral', False))
+        assert paginator.message is not None
+        return paginator.message
+
+    if overflow is Overflow.CHUNKS:
+        *chunks, last = split_content(content)
+        shared = {key: value for key, value in kwargs.items() if key in CHUNK_KWARGS}
+        reference = kwargs.pop('reference', None)
+        for chunk in chunks:
+            await ctx.send(chunk, reference=reference, **shared)
+            reference = None  # Only the first chunk replies
+        return await ctx.send(last, reference=reference, **kwargs)
+
+    if overflow is Overflow.PASTE:
+        preview = split_content(content, PAGE_LIMIT)[0]
+        message = await ctx.send(f'{preview}\n-# Uploading the full response to MystBin...', **kwargs)
+        task = asyncio.create_task(_upload_paste(ctx, message, preview, content))
+        _uploads.add(task)
+        task.add_done_callback(_uploads.discard)
+        return message
+
+    files: list[discord.File] = list(kwargs.pop('files', []))
+    if file := kwargs.pop('file', None):
+        files.append(file)
+    files.append(content_file(content))
+    return await ctx.send('The response was too long for a message, so it is attached as a file.', files=files, **kwargs)
+
+
+async def _upload_paste(ctx: MafuContext, message: discord.Message, preview: str, content: str) -> None:
+    try:
+        paste = await ctx.create_paste(f'Requested by {ctx.author}', content=content)
+    # Whatever went wrong, the message should not keep saying an upload is coming
+    except Exception:
+        log.warning('Could not upload a response to MystBin', exc_info=True)
+        note = '-# The full response could not be uploaded to MystBin.'
+    else:
+        note = f'-# Full response: {paste.url}'
+
+    await message.edit(content=f'{preview}\n{note}')
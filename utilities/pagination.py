@@ -1,17 +1,116 @@
 from __future__ import annotations
 
+import abc
+import asyncio
+import math
+from collections import OrderedDict
 from typing import TYPE_CHECKING, Any, Self
 
 import discord
+from discord.ext import menus
 
 from .view import BaseView
 
 if TYPE_CHECKING:
-    from discord.ext import menus
-
     from utilities.bases.context import MafuContext
 
-__all__ = ('Paginator',)
+__all__ = ('KeysetPageSource', 'Paginator')
+
+RENDERED_PAGES = 5  # Rendered pages a paginator keeps around for going back and forth
+CACHED_PAGES = 4
+MAX_CURSORS = 256
+
+
+class KeysetPageSource[EntryT, KeyT](menus.PageSource, abc.ABC):
+    """
+    A page source which fetches one page at a time, instead of needing every entry up front.
+
+    Pages are fetched with keyset queries, continuing after the key of the last entry of the page before.
+    The keys where pages start are remembered, so a page nobody has visited yet is fetched with an offset from the
+    closest one before it. Only a few pages of entries and keys are kept at once.
+
+    Subclasses implement `count`, `fetch` and `key`.
+    """
+
+    def __init__(self, *, per_page: int = 1) -> None:
+        self.per_page = per_page
+        self.total: int | None = None
+
+        self._cursors: OrderedDict[int, KeyT] = OrderedDict()  # Page number to the key of the entry right before it
+        self._pages: OrderedDict[int, list[EntryT]] = OrderedDict()
+
+        super().__init__()
+
+    @abc.abstractmethod
+    async def count(self) -> int: ...
+
+    @abc.abstractmethod
+    async def fetch(self, after: KeyT | None, *, offset: int, limit: int) -> list[EntryT]:
+        """
+        Fetch the entries of a page.
+
+        Parameters
+        ----------
+        after : KeyT | None
+            The key the entries come after, or None to start from the first entry
+        offset : int
+            How many entries to skip after that key
+        limit : int
+            How many entries to fetch
+
+        Returns
+        -------
+        list[EntryT]
+            The entries, in order
+
+        """
+
+    @abc.abstractmethod
+    def key(self, entry: EntryT) -> KeyT: ...
+
+    async def prepare(self) -> None:
+        if self.total is None:
+            self.total = await self.count()
+
+    async def refresh(self) -> None:
+        """Forget every fetched page and count the entries again, after some were added or removed."""
+        self._cursors.clear()
+        self._pages.clear()
+        self.total = await self.count()
+
+    def is_paginating(self) -> bool:
+        return (self.total or 0) > self.per_page
+
+    def get_max_pages(self) -> int:
+        return max(math.ceil((self.total or 0) / self.per_page), 1)
+
+    async def get_page(self, page_number: int) -> EntryT | list[EntryT]:
+        if (entries := self._pages.get(page_number)) is None:
+            if not 0 <= page_number < self.get_max_pages():
+                raise IndexError(page_number)
+
+            start = max((page for page in self._cursors if page <= page_number), default=0)
+            entries = await self.fetch(
+                self._cursors.get(start),
+                offset=(page_number - start) * self.per_page,
+                limit=self.per_page,
+            )
+            if not entries:
+                raise IndexError(page_number)
+
+            self._remember(self._cursors, page_number + 1, self.key(entries[-1]), MAX_CURSORS)
+            self._remember(self._pages, page_number, entries, CACHED_PAGES)
+        else:
+            self._pages.move_to_end(page_number)
+
+        return entries[0] if self.per_page == 1 else entries
+
+    @staticmethod
+    def _remember[K, V](cache: OrderedDict[K, V], key: K, value: V, size: int) -> None:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > size:
+            cache.popitem(last=False)
 
 
 class SkipToModal(discord.ui.Modal, title='Skip to page...'):
@@ -55,6 +154,10 @@ class Paginator(BaseView):
         self.message: discord.Message | None = None
         self.current_page: int = 0
         self.compact: bool = compact
+
+        self._rendered: OrderedDict[int, dict[str, Any]] = OrderedDict()
+        self._rendering: dict[int, asyncio.Task[dict[str, Any]]] = {}
+
         self.clear_items()
         self.fill_items()
 
@@ -80,12 +183,71 @@ class Paginator(BaseView):
             return {'embed': value, 'content': None}
         return {}
 
-    async def show_page(self, interaction: discord.Interaction, page_number: int) -> None:
+    async def _render_page(self, page_number: int) -> dict[str, Any]:
         page: Any = await self.source.get_page(page_number)  # pyright: ignore[reportUnknownMemberType]
+        return await self._get_kwargs_from_page(page)
+
+    def _render(self, page_number: int) -> asyncio.Task[dict[str, Any]]:
+        # Showing a page which is still being prefetched waits on the same task instead of rendering it twice
+        if (task := self._rendering.get(page_number)) is None:
+            task = self._rendering[page_number] = asyncio.create_task(self._render_page(page_number))
+            task.add_done_callback(lambda task: self._rendered_page(page_number, task))
+        return task
+
+    def _rendered_page(self, page_number: int, task: asyncio.Task[dict[str, Any]]) -> None:
+        self._rendering.pop(page_number, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+
+        self._rendered[page_number] = task.result()
+        while len(self._rendered) > RENDERED_PAGES:
+            self._rendered.popitem(last=False)
+
+    async def get_page_kwargs(self, page_number: int) -> dict[str, Any]:
+        """
+        Render a page, or return it from the pages rendered recently.
+
+        Parameters
+        ----------
+        page_number : int
+            The page to render
+
+        Returns
+        -------
+        dict[str, Any]
+            The content and embed to send the page with
+
+        """
+        if (kwargs := self._rendered.get(page_number)) is not None:
+            self._rendered.move_to_end(page_number)
+            return kwargs
+        return await self._render(page_number)
+
+    def prefetch(self, page_number: int) -> None:
+        """Start rendering a page in the background, while the current one is being read."""
+        max_pages = self.source.get_max_pages()
+        if page_number < 0 or (max_pages is not None and page_number >= max_pages):
+            return
+        if page_number not in self._rendered:
+            self._render(page_number)
+
+    def invalidate(self) -> None:
+        """Forget every rendered page, after the entries of the source changed."""
+        for task in self._rendering.values():
+            task.cancel()
+        self._rendering.clear()
+        self._rendered.clear()
+
+    def stop(self) -> None:
+        self.invalidate()
+        super().stop()
+
+    async def show_page(self, interaction: discord.Interaction, page_number: int) -> None:
+        kwargs = await self.get_page_kwargs(page_number)
 
         self.current_page = page_number
-        kwargs = await self._get_kwargs_from_page(page)
         self._update_labels(page_number)
+        self.prefetch(page_number + 1)
         if kwargs:
             if interaction.response.is_done():
                 if self.message:
@@ -139,10 +301,10 @@ class Paginator(BaseView):
 
     async def start(self, *, ephemeral: bool = False, message: discord.Message | None = None) -> None:
         await self.source.prepare()
-        page: Any = await self.source.get_page(0)  # pyright: ignore[reportUnknownMemberType]
-        kwargs = await self._get_kwargs_from_page(page)
+        kwargs = await self.get_page_kwargs(0)
 
         self._update_labels(0)
+        self.prefetch(1)
 
         if message is None:
             self.message = await self.ctx.send(**kwargs, view=self, ephemeral=ephemeral)
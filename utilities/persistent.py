@@ -0,0 +1,73 @@
+"""
+State for views which keep working across restarts.
+
+Buttons of such views are `discord.ui.DynamicItem`s, whose `custom_id` carries the little state they need, like
+the ID of a row. Custom IDs are limited to 100 characters, so anything larger is kept in a `ViewStateStore` under
+a key the custom ID can rebuild, and loaded again from its source whenever the store no longer has it.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Hashable
+
+__all__ = ('ViewStateStore',)
+
+VIEW_STATES = 256
+
+
+class ViewStateStore:
+    """
+    The state of the most recently used views, evicting the least recently used past a fixed number of entries.
+
+    A view holds a key into the store rather than the state itself, so however many views are active only the
+    latest few states stay in memory.
+    """
+
+    def __init__(self, *, size: int = VIEW_STATES) -> None:
+        self.size = size
+        self._states: OrderedDict[Hashable, Any] = OrderedDict()
+
+        super().__init__()
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def get(self, key: Hashable) -> Any | None:  # noqa: ANN401
+        if (state := self._states.get(key)) is not None:
+            self._states.move_to_end(key)
+        return state
+
+    def put(self, key: Hashable, state: Any) -> None:  # noqa: ANN401
+        self._states[key] = state
+        self._states.move_to_end(key)
+        while len(self._states) > self.size:
+            self._states.popitem(last=False)
+
+    def discard(self, key: Hashable) -> None:
+        self._states.pop(key, None)
+
+    async def get_or_load[T](self, key: Hashable, load: Callable[[], Awaitable[T]]) -> T:
+        """
+        Get the state under a key, loading it again if it was evicted or the bot restarted since.
+
+        Parameters
+        ----------
+        key : Hashable
+            The key of the state
+        load : Callable[[], Awaitable[T]]
+            Loads the state from its source
+
+        Returns
+        -------
+        T
+            The state
+
+        """
+        if (state := self.get(key)) is None:
+            state = await load()
+            self.put(key, state)
+        return state
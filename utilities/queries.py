@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import asyncpg
+
+if TYPE_CHECKING:
+    from asyncpg.pool import PoolConnectionProxy
+
+    from utilities.metrics import MetricsRegistry
+
+__all__ = (
+    'CLOSEST_TIMER',
+    'GACHA_PULL_INSERT',
+    'GACHA_USER_UPSERT',
+    'HOT_QUERIES',
+    'WAIFU_PASS',
+    'WAIFU_SMASH',
+    'WAIFU_SNAPSHOT',
+    'Query',
+    'StatementRegistry',
+)
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class Query:
+    name: str
+    sql: str
+
+
+GACHA_PULL_INSERT = Query(
+    'gacha_pull_insert',
+    """
+    INSERT INTO
+        GachaPulledCards (user_id, message_id, card_id, card_name, rarity)
+    VALUES
+        ($1, $2, $3, $4, $5)
+    """,
+)
+
+GACHA_USER_UPSERT = Query(
+    'gacha_user_upsert',
+    """
+    INSERT INTO
+        GachaData (user_id)
+    VALUES
+        ($1)
+    ON CONFLICT (user_id) DO
+    UPDATE
+    SET
+        user_id = GachaData.user_id
+    RETURNING
+        *
+    """,
+)
+
+WAIFU_SMASH = Query(
+    'waifu_smash',
+    """
+    INSERT INTO
+        Waifus (id, smashes, nsfw)
+    VALUES
+        ($1, 1, $2)
+    ON CONFLICT (id) DO
+    UPDATE
+    SET
+        smashes = Waifus.smashes + 1
+    RETURNING
+        id, smashes, passes, nsfw
+    """,
+)
+
+WAIFU_PASS = Query(
+    'waifu_pass',
+    """
+    INSERT INTO
+        Waifus (id, passes, nsfw)
+    VALUES
+        ($1, 1, $2)
+    ON CONFLICT (id) DO
+    UPDATE
+    SET
+        passes = Waifus.passes + 1
+    RETURNING
+        id, smashes, passes, nsfw
+    """,
+)
+
+# Danbooru leaves out the file URL of some posts, like banned ones, so whatever was snapshotted before is kept
+WAIFU_SNAPSHOT = Query(
+    'waifu_snapshot',
+    """
+    UPDATE
+        Waifus
+    SET
+        file_url = COALESCE($2, file_url),
+        characters = COALESCE($3, characters),
+        copyright = COALESCE($4, copyright),
+        rating = COALESCE($5, rating),
+        synced_at = CURRENT_TIMESTAMP
+    WHERE
+        id = $1
+    """,
+)
+
+CLOSEST_TIMER = Query(
+    'closest_timer',
+    """
+    SELECT
+        *
+    FROM
+        Timers
+    WHERE
+        expires < (CURRENT_TIMESTAMP + $1::interval)
+    ORDER BY
+        expires
+    LIMIT
+        1
+    """,
+)
+
+HOT_QUERIES = (GACHA_PULL_INSERT, GACHA_USER_UPSERT, WAIFU_SMASH, WAIFU_PASS, WAIFU_SNAPSHOT, CLOSEST_TIMER)
+
+# Connections get recycled, so the oldest entries are dropped once this many are tracked
+MAX_TRACKED_CONNECTIONS = 64
+
+
+class StatementRegistry:
+    """
+    Prepares the hot statements on every new pool connection.
+
+    The statements land in asyncpg's own per-connection statement cache, so running a Query afterwards
+    skips the parse and plan round trip. A statement which was not prepared up front, like one whose
+    table did not exist yet when the connection opened, is counted as a miss the first time it runs.
+    """
+
+    def __init__(self, queries: tuple[Query, ...] = HOT_QUERIES, *, metrics: MetricsRegistry) -> None:
+        self.queries = queries
+        self.metrics = metrics
+        self.misses = 0
+
+        self._prepared: dict[int, set[str]] = {}  # Backend PID to the statements prepared on it
+
+        metrics.describe('db_connection_init_seconds', 'Time spent preparing hot statements on a new connection')
+        metrics.describe('db_prepared_statement_misses', 'Hot statements which were not prepared before first use')
+
+        super().__init__()
+
+    async def prepare(self, con: asyncpg.Connection[asyncpg.Record]) -> None:
+        """
+        Prepare every hot statement on a connection. Used as the pool's `init` hook.
+
+        Parameters
+        ----------
+        con : asyncpg.Connection
+            The newly opened connection
+
+        """
+        start = time.perf_counter()
+        prepared: set[str] = set()
+
+        for query in self.queries:
+            try:
+                # With no arguments nothing gets executed, the statement is only prepared and cached
+                await con.executemany(query.sql, ())
+            except asyncpg.PostgresError as error:
+                log.debug('Could not prepare %s: %s', query.name, error)
+            else:
+                prepared.add(query.name)
+
+        # Finish on a complete simple query. Connections left right after a bare prepare were seen hanging on close.
+        await con.execute('SELECT 1')
+
+        if len(self._prepared) >= MAX_TRACKED_CONNECTIONS:
+            del self._prepared[next(iter(self._prepared))]
+        self._prepared[con.get_server_pid()] = prepared
+
+        self.metrics.observe('db_connection_init_seconds', time.perf_counter() - start)
+
+    def check(self, con: PoolConnectionProxy[asyncpg.Record], query: Query) -> None:
+        prepared = self._prepared.setdefault(con.get_server_pid(), set())
+        if query.name in prepared:
+            return
+
+        # asyncpg caches the statement while running it, so the next run on this connection is a hit
+        prepared.add(query.name)
+        self.misses += 1
+        self.metrics.set_gauge('db_prepared_statement_misses', self.misses)
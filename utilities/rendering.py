@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import multiprocessing
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from io import BytesIO
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from utilities.lazy import lazy_import
+
+if TYPE_CHECKING:
+    from PIL import Image, ImageDraw, ImageFont, ImageOps
+
+    from utilities.metrics import MetricsRegistry
+else:
+    Image = lazy_import('PIL.Image')
+    ImageDraw = lazy_import('PIL.ImageDraw')
+    ImageFont = lazy_import('PIL.ImageFont')
+    ImageOps = lazy_import('PIL.ImageOps')
+
+__all__ = ('MAX_LINES', 'Card', 'CardRenderer', 'render_card')
+
+ASSETS = Path(__file__).parent.parent / 'assets'
+TITLE_FONT = ASSETS / 'fonts' / 'DejaVuSans-Bold.ttf'
+BODY_FONT = ASSETS / 'fonts' / 'DeterminationMonoWebRegular-Z5oq.ttf'
+TEMPLATE = ASSETS / 'images' / 'Live_Report.png'
+
+# Positions on the Live Report template. The text starts right of the asterisk already drawn in its box.
+TEXT_BOX = (84, 36, 596, 148)
+SCREEN_BOX = (242, 176, 399, 309)
+LINE_HEIGHT = 22
+MAX_LINES = 4
+
+CACHE_BYTES = 32 * 1024 * 1024
+
+# Fonts and the template are loaded once per worker process, by the pool's initializer
+_fonts: dict[str, ImageFont.FreeTypeFont] = {}
+_templates: dict[str, Image.Image] = {}
+
+
+@dataclass(frozen=True, slots=True)
+class Card:
+    """Everything drawn on a card. It is sent to a worker process, so it only holds plain data."""
+
+    title: str
+    lines: tuple[str, ...]
+    avatar: bytes | None = None
+
+    def key(self) -> str:
+        digest = hashlib.blake2b(repr((self.title, self.lines)).encode())
+        digest.update(self.avatar or b'')
+        return digest.hexdigest()
+
+
+def load_assets() -> None:
+    _fonts['title'] = ImageFont.truetype(str(TITLE_FONT), 18)
+    _fonts['body'] = ImageFont.truetype(str(BODY_FONT), 22)
+
+    with Image.open(TEMPLATE) as template:
+        _templates['live_report'] = template.convert('RGBA')
+
+
+def _fit(text: str, font: ImageFont.FreeTypeFont, width: int) -> str:
+    if font.getlength(text) <= width:
+        return text
+
+    while text and font.getlength(f'{text}…') > width:
+        text = text[:-1]
+    return f'{text}…'
+
+
+def render_card(card: Card) -> bytes:
+    """
+    Draw a card onto the Live Report template.
+
+    This is CPU heavy and meant to run in a worker process through `CardRenderer`.
+
+    Parameters
+    ----------
+    card : Card
+        What to draw
+
+    Returns
+    -------
+    bytes
+        The card, encoded as PNG
+
+    """
+    if not _templates:
+        load_assets()  # Outside of the pool, like in the benchmark
+
+    image = _templates['live_report'].copy()
+    draw = ImageDraw.Draw(image)
+    left, top, right, _ = TEXT_BOX
+    width = right - left
+
+    draw.text((left, top), _fit(card.title, _fonts['title'], width), font=_fonts['title'], fill='white')
+    for index, line in enumerate(card.lines[:MAX_LINES], start=1):
+        draw.text((left, top + index * LINE_HEIGHT), _fit(line, _fonts['body'], width), font=_fonts['body'], fill='white')
+
+    if card.avatar:
+        screen_left, screen_top, screen_right, screen_bottom = SCREEN_BOX
+        with Image.open(BytesIO(card.avatar)) as avatar:
+            fitted = ImageOps.fit(avatar.convert('RGBA'), (screen_right - screen_left, screen_bottom - screen_top))
+        image.paste(fitted, (screen_left, screen_top), fitted)
+
+    buffer = BytesIO()
+    image.save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+class CardRenderer:
+    """
+    Renders cards in worker processes so compositing never holds up the event loop.
+
+    Rendered cards are kept by a hash of their content until the cache goes over its byte budget,
+    then the least recently used ones are dropped.
+    """
+
+    def __init__(self, *, workers: int = 2, cache_bytes: int = CACHE_BYTES, metrics: MetricsRegistry | None = None) -> None:
+        self.metrics = metrics
+        self.cache_bytes = cache_bytes
+
+        # Spawned rather than forked, forking a process with a running event loop and threads is not safe
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=load_assets,
+        )
+
+        self.renders = 0
+        self.hits = 0
+
+        self._cache: OrderedDict[str, bytes] = OrderedDict()
+        self._cache_size = 0
+
+        if metrics:
+            metrics.describe('card_renders', 'Cards rendered, by whether they came from the cache')
+            metrics.describe('card_render_seconds', 'Time taken to render a card in a worker process')
+            metrics.describe('card_render_cache_bytes', 'Bytes of rendered cards kept in the cache')
+
+        super().__init__()
+
+    async def render(self, card: Card) -> bytes:
+        """
+        Render a card, or return it from the cache.
+
+        Parameters
+        ----------
+        card : Card
+            What to draw
+
+        Returns
+        -------
+        bytes
+            The card, encoded as PNG
+
+        """
+        key = card.key()
+        if (data := self._cache.get(key)) is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            if self.metrics:
+                self.metrics.set_gauge('card_renders', self.hits, cached='true')
+            return data
+
+        start = time.perf_counter()
+        data = await asyncio.get_running_loop().run_in_executor(self.executor, render_card, card)
+        self._store(key, data)
+
+        self.renders += 1
+        if self.metrics:
+            self.metrics.observe('card_render_seconds', time.perf_counter() - start)
+            self.metrics.set_gauge('card_renders', self.renders, cached='false')
+        return data
+
+    def _store(self, key: str, data: bytes) -> None:
+        if key in self._cache or len(data) > self.cache_bytes:
+            return
+
+        self._cache[key] = data
+        self._cache_size += len(data)
+        while self._cache_size > self.cache_bytes:
+            _, evicted = self._cache.popitem(last=False)
+            self._cache_size -= len(evicted)
+
+        if self.metrics:
+            self.metrics.set_gauge('card_render_cache_bytes', self._cache_size)
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
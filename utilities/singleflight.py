@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Hashable
+
+    from utilities.metrics import MetricsRegistry
+
+__all__ = ('SingleFlight',)
+
+
+class SingleFlight[T]:
+    """
+    Coalesces identical calls made while one of them is still running.
+
+    The first call under a key runs, every call under the same key made before it finishes waits on it instead and
+    gets the same result or exception. Nothing is kept once the call finished, this is not a cache.
+    """
+
+    def __init__(self, name: str, *, metrics: MetricsRegistry | None = None) -> None:
+        self.name = name
+        self.metrics = metrics
+
+        self.calls = 0
+        self.shared = 0
+        self._flights: dict[Hashable, asyncio.Task[T]] = {}
+
+        if metrics:
+            metrics.describe('coalesced_calls', 'Calls which waited on an identical call already running')
+
+        super().__init__()
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run a call, or wait on the identical one already running.
+
+        Parameters
+        ----------
+        key : Hashable
+            What makes two calls identical
+        call : Callable[[], Awaitable[T]]
+            The call, only made when nothing is running under the key
+
+        Returns
+        -------
+        T
+            The result of the call
+
+        """
+        self.calls += 1
+        if (flight := self._flights.get(key)) is not None:
+            self.shared += 1
+            if self.metrics:
+                self.metrics.set_gauge('coalesced_calls', self.shared, client=self.name)
+        else:
+            flight = self._flights[key] = asyncio.ensure_future(call())
+            flight.add_done_callback(lambda flight: self._landed(key, flight))
+
+        # A caller giving up must not cancel the call for everyone else waiting on it
+        return await asyncio.shield(flight)
+
+    def _landed(self, key: Hashable, flight: asyncio.Task[T]) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not flight.cancelled():
+            flight.exception()  # Retrieved, even if every caller was cancelled before it finished
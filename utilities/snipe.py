@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict, deque
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import discord
+
+__all__ = ('SnipeStore', 'SnipedMessage')
+
+PER_CHANNEL = 10
+MAX_BYTES = 32 * 1024 * 1024
+MAX_AGE = 60 * 60.0  # Seconds a sniped message is kept for
+RECORD_OVERHEAD = 256  # Rough size of a record and its ints and floats, on top of the text it holds
+
+
+class SnipedMessage:
+    __slots__ = (
+        'attachments',
+        'author_id',
+        'author_name',
+        'content',
+        'created_at',
+        'edited',
+        'message_id',
+        'size',
+        'sniped_at',
+    )
+
+    def __init__(  # noqa: PLR0913
+        self,
+        *,
+        message_id: int,
+        author_id: int,
+        author_name: str,
+        content: str,
+        attachments: tuple[str, ...],
+        created_at: float,
+        edited: bool,
+    ) -> None:
+        self.message_id = message_id
+        self.author_id = author_id
+        self.author_name = author_name
+        self.content = content
+        self.attachments = attachments
+        self.created_at = created_at
+        self.edited = edited
+
+        self.sniped_at = time.monotonic()
+        self.size = RECORD_OVERHEAD + len(content) + len(author_name) + sum(map(len, attachments))
+
+        super().__init__()
+
+    @classmethod
+    def from_message(cls, message: discord.Message, *, edited: bool = False) -> SnipedMessage:
+        return cls(
+            message_id=message.id,
+            author_id=message.author.id,
+            author_name=str(message.author),
+            content=message.content,
+            attachments=tuple(attachment.url for attachment in message.attachments),
+            created_at=message.created_at.timestamp(),
+            edited=edited,
+        )
+
+
+class SnipeStore:
+    """
+    The last few deleted and edited messages of every channel, only ever kept in memory.
+
+    Every channel gets a ring buffer of its latest messages. When the store goes over its memory budget the
+    channels which were sniped into least recently lose their oldest messages first.
+    """
+
+    def __init__(self, *, per_channel: int = PER_CHANNEL, max_bytes: int = MAX_BYTES, max_age: float = MAX_AGE) -> None:
+        self.per_channel = per_channel
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+        self.size = 0
+        self._channels: OrderedDict[int, deque[SnipedMessage]] = OrderedDict()  # Least recently written first
+
+        super().__init__()
+
+    def __len__(self) -> int:
+        return sum(len(buffer) for buffer in self._channels.values())
+
+    def add(self, channel_id: int, message: SnipedMessage) -> None:
+        buffer = self._channels.get(channel_id)
+        if buffer is None:
+            buffer = self._channels[channel_id] = deque(maxlen=self.per_channel)
+        else:
+            self._channels.move_to_end(channel_id)
+
+        if len(buffer) == buffer.maxlen:
+            self.size -= buffer[0].size  # Pushed out of the ring by the append below
+        buffer.append(message)
+        self.size += message.size
+
+        while self.size > self.max_bytes:
+            oldest_id, oldest = next(iter(self._channels.items()))
+            self.size -= oldest.popleft().size
+            if not oldest:
+                del self._channels[oldest_id]
+
+    def get(self, channel_id: int, *, edited: bool | None = None, index: int = 0) -> SnipedMessage | None:
+        """
+        Get one of the latest messages sniped in a channel.
+
+        Parameters
+        ----------
+        channel_id : int
+            The channel the message was in
+        edited : bool | None, optional
+            Only look at edited messages when True or deleted ones when False, by default both
+        index : int, optional
+            How many matching messages to skip from the latest, by default 0
+
+        Returns
+        -------
+        SnipedMessage | None
+            The message, or None when there aren't that many
+
+        """
+        buffer = self._channels.get(channel_id)
+        if not buffer:
+            return None
+
+        cutoff = time.monotonic() - self.max_age
+        matching = (
+            message
+            for message in reversed(buffer)
+            if message.sniped_at >= cutoff and (edited is None or message.edited is edited)
+        )
+        for position, message in enumerate(matching):
+            if position == index:
+                return message
+        return None
+
+    def expire(self) -> int:
+        """
+        Drop every message older than the maximum age.
+
+        Returns
+        -------
+        int
+            How many messages were dropped
+
+        """
+        cutoff = time.monotonic() - self.max_age
+        dropped = 0
+
+        for channel_id in list(self._channels):
+            buffer = self._channels[channel_id]
+            while buffer and buffer[0].sniped_at < cutoff:
+                self.size -= buffer.popleft().size
+                dropped += 1
+            if not buffer:
+                del self._channels[channel_id]
+
+        return dropped
+
+    def clear(self, channel_id: int) -> None:
+        if buffer := self._channels.pop(channel_id, None):
+            self.size -= sum(message.size for message in buffer)
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING
+
+import psutil
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable
+
+    from utilities.metrics import MetricsRegistry
+
+__all__ = ('StartupTimeline',)
+
+
+class StartupTimeline:
+    """
+    Records when each point of startup was reached and how long each stage took.
+
+    Every mark is in seconds since the process was created, so interpreter start and imports are included.
+    """
+
+    def __init__(self, *, metrics: MetricsRegistry | None = None) -> None:
+        self.metrics = metrics
+        self.origin = psutil.Process().create_time()
+
+        self.marks: dict[str, float] = {}
+        self.stages: dict[str, float] = {}
+        self.shards: dict[int, float] = {}
+
+        if metrics:
+            metrics.describe('startup_stage_seconds', 'Duration of each startup stage')
+            metrics.describe('shard_ready_seconds', 'Seconds from process start until each shard was ready')
+
+        super().__init__()
+
+    def elapsed(self) -> float:
+        return time.time() - self.origin
+
+    def mark(self, name: str) -> None:
+        # Only the first time a point is reached counts
+        if name not in self.marks:
+            self.marks[name] = self.elapsed()
+
+    async def stage[T](self, name: str, coro: Awaitable[T]) -> T:
+        """
+        Await a startup stage and record how long it took.
+
+        Parameters
+        ----------
+        name : str
+            The name of the stage
+        coro : Awaitable[T]
+            The stage itself
+
+        Returns
+        -------
+        T
+            Whatever the stage returned
+
+        """
+        start = time.perf_counter()
+        try:
+            return await coro
+        finally:
+            self.stages[name] = duration = time.perf_counter() - start
+            if self.metrics:
+                self.metrics.set_gauge('startup_stage_seconds', duration, stage=name)
+
+    def shard_ready(self, shard_id: int) -> None:
+        if shard_id in self.shards:
+            return  # Reconnects are not part of startup
+
+        self.shards[shard_id] = elapsed = self.elapsed()
+        if self.metrics:
+            self.metrics.set_gauge('shard_ready_seconds', elapsed, shard=str(shard_id))
+
+    def report(self) -> list[str]:
+        # Marks are only ever added in the order they are reached
+        lines = [f'{name}: {at:.2f}s' for name, at in self.marks.items()]
+
+        if self.stages:
+            lines.extend(('', 'Stages:'))
+            lines.extend(f'  {name}: {duration:.2f}s' for name, duration in self.stages.items())
+
+        if self.shards:
+            lines.extend(('', 'Shards ready:'))
+            lines.extend(f'  {shard_id}: {at:.2f}s' for shard_id, at in sorted(self.shards.items()))
+
+        return lines
@@ -9,6 +9,8 @@ from typing import TYPE_CHECKING, Any, Self
 import asyncpg
 import discord
 
+from utilities.queries import CLOSEST_TIMER
+
 if TYPE_CHECKING:
     from utilities.bases.bot import Mafuyu
 
@@ -30,6 +32,7 @@ class Timer:
         self.user_id: int = data['user_id']
         self.reserved_type: int | None = data['reserved_type']
         self.expires: datetime.datetime = data['expires']
+        self.data: dict[str, Any] | None = data['data']
 
         super().__init__()
 
@@ -122,24 +125,21 @@ class TimerManager:
         return await self.fetch_closest_timer()  # pyright: ignore[reportReturnType]
 
     async def fetch_closest_timer(self) -> asyncpg.Record | None:
-        query = """
-                SELECT
-                    *
-                FROM
-                    Timers
-                WHERE
-                    expires < (CURRENT_TIMESTAMP + $1::interval)
-                ORDER BY
-                    expires
-                LIMIT
-                    1;
-                """
-        return await self.bot.pool.fetchrow(query, datetime.timedelta(days=40))
+        return await self.bot.pool.fetchrow(CLOSEST_TIMER, datetime.timedelta(days=40))
 
     async def call_timer(self, timer: Timer) -> None:
-        self.bot.dispatch('timer_expire', timer)
-
-        await self.bot.pool.execute('DELETE FROM Timers WHERE id = $1', timer.id)
+        # Every process runs its own manager, whoever deletes the timer first is the one to dispatch it
+        deleted = await self.bot.pool.fetchval('DELETE FROM Timers WHERE id = $1 RETURNING id', timer.id)
+        if deleted is not None:
+            self.bot.dispatch('timer_expire', timer)
+
+    async def on_timers_changed(self, payload: dict[str, Any]) -> None:
+        # Another process created a timer, which might be due before the one being waited on
+        expires = datetime.datetime.fromisoformat(payload['expires'])
+        if self.current is None:
+            self._have_data.set()
+        elif expires < self.current.expires:
+            self.restart_task()
 
     async def create_timer(
         self,
@@ -176,6 +176,8 @@ class TimerManager:
         if self.current and when < self.current.expires:
             self.restart_task()
 
+        await self.bot.notifications.publish('timers', expires=when.isoformat())
+
         return timer
 
     async def cancel_timer(
@@ -26,6 +26,7 @@ class WaifuResult:
     copyright: str
     name: str | None = None
     source: str | None = None
+    rating: str | None = None
 
     def parse_string_lists(self, lists: str) -> list[str]:
         objs = lists.split(' ')
@@ -38,3 +39,4 @@ class WaifuFavouriteEntry:
     user_id: discord.User
     nsfw: bool
     tm: datetime
+    post: WaifuResult | None = None  # Snapshot of the post, None until it was first synced
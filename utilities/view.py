@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import contextlib
+from io import BytesIO
 from typing import TYPE_CHECKING, Self
 
 import discord
@@ -10,18 +11,20 @@ from utilities.embed import Embed
 from utilities.functions import fmt_str
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable
+    from collections.abc import Callable, Coroutine, Iterable
+    from typing import Any
 
     from utilities.bases.bot import Mafuyu
     from utilities.bases.context import MafuContext
+    from utilities.rendering import Card
 
-__all__ = ('BaseView', 'PermissionView')
+__all__ = ('BaseView', 'PermissionView', 'ShareCardButton')
 
 
 class BaseView(discord.ui.View):
     message: discord.Message | None
 
-    def __init__(self, *, timeout: float = 180.0) -> None:
+    def __init__(self, *, timeout: float | None = 180.0) -> None:
         super().__init__(timeout=timeout)
 
     async def on_timeout(self) -> None:
@@ -31,6 +34,26 @@ class BaseView(discord.ui.View):
         self.stop()
 
 
+class ShareCardButton(discord.ui.Button[BaseView]):
+    """Posts an image card of whatever the view shows, for sharing outside of the bot. Only its author can press it."""
+
+    def __init__(self, card: Callable[[], Coroutine[Any, Any, Card]], *, author: discord.abc.User) -> None:
+        self.card = card
+        self.author = author
+        super().__init__(label='Share card', emoji='\U0001f5bc', style=discord.ButtonStyle.grey)
+
+    async def interaction_check(self, interaction: discord.Interaction[Mafuyu]) -> bool:
+        if interaction.user.id == self.author.id:
+            return True
+        await interaction.response.send_message('Only the command initiator can share this card.', ephemeral=True)
+        return False
+
+    async def callback(self, interaction: discord.Interaction[Mafuyu]) -> None:
+        await interaction.response.defer(thinking=True)
+        data = await interaction.client.renderer.render(await self.card())
+        await interaction.followup.send(file=discord.File(BytesIO(data), filename='card.png'))
+
+
 PERMISSIONS_STRUCTURE = {
     'general': [
         'view_channels',